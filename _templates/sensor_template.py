@@ -21,13 +21,13 @@ example config:
 }
 """
 
-__updated__ = "2019-03-26"
-__version__ = "0.7"
+__updated__ = "2026-10-18"
+__version__ = "0.8"
 
 from pysmartnode import config
 from pysmartnode.utils.wrappers.async_wrapper import async_wrapper as _async_wrapper
 from pysmartnode import logging
-import uasyncio as asyncio
+from pysmartnode.utils import scheduler
 import gc
 
 ####################
@@ -72,13 +72,7 @@ class MySensor:
         background_loop = self.tempHumid
         ##############################
         gc.collect()
-        asyncio.get_event_loop().create_task(self._loop(background_loop, interval))
-
-    @staticmethod
-    async def _loop(gen, interval):
-        while True:
-            await gen()
-            await asyncio.sleep(interval)
+        scheduler.add(background_loop, interval)
 
     async def _read(self, coro, prec, offs, publish=True):
         if coro is None:
@@ -0,0 +1,325 @@
+# Author: Kevin Köck
+# Copyright Kevin Köck 2019 Released under the MIT license
+# Created on 2026-10-18
+
+__updated__ = "2026-10-18"
+__version__ = "0.1"
+
+"""
+Runs the tests of _testing on CPython if no micropython unix port is available, by approximating it:
+- sources of the repository are transformed like micropython compiles them: "async def" becomes a
+  generator function and "await x" becomes "yield from x", so the uasyncio of the repository can run them
+- every generator is wrapped in Gen which implements pend_throw() with the micropython semantics:
+  the pending value is reset whenever the generator yields, a pending non-None value is thrown on
+  resume and pend_throw() on a generator that did not run yet raises TypeError
+- firmware modules (utime, utimeq, ucollections, uselect, usocket, uerrno, micropython, machine, network, ...)
+  are replaced by small CPython versions, gc.mem_free() returns a constant
+Timings and RAM are not comparable to a device, only the behaviour is tested.
+
+Run from the repository root:
+python3 _testing/cpython.py _testing/duty_cycle_simulation.py
+"""
+
+import ast, sys, os, time as _time, heapq, collections, builtins, functools, importlib.machinery, types
+
+REPO = os.getcwd()
+
+
+class Gen:
+    __slots__ = ("g", "pend", "started", "__weakref__")
+
+    def __init__(self, g):
+        self.g = g
+        self.pend = None
+        self.started = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self.send(None)
+
+    def _resume(self, fn, arg):
+        try:
+            r = fn(arg)
+        finally:
+            self.started = True
+        self.pend = None  # MicroPython resets the pending slot on every yield
+        return r
+
+    def send(self, v):
+        p = self.pend
+        if self.started and p is not None:
+            self.pend = None
+            if p is False:
+                raise AssertionError("parked task resumed without pend_throw(None): %r" % self.g)
+            return self._resume(self.g.throw, p)
+        if not self.started and v is not None:
+            raise TypeError("can't send non-None value to a just-started generator")
+        return self._resume(self.g.send, v)
+
+    def throw(self, *a):
+        self.pend = None
+        exc = a[0] if len(a) == 1 else a[1]
+        return self._resume(self.g.throw, exc)
+
+    def close(self):
+        return self.g.close()
+
+    def pend_throw(self, v):
+        if not self.started:
+            raise TypeError("can't pend throw to just-started generator")
+        prev = self.pend
+        self.pend = v
+        return prev
+
+    def __repr__(self):
+        return "<Gen %s>" % getattr(self.g, "__name__", self.g)
+
+
+def _mp_gen(f):
+    @functools.wraps(f)
+    def w(*a, **k):
+        return Gen(f(*a, **k))
+    return w
+
+
+def _mp_await(x):
+    a = getattr(type(x), "__await__", None)
+    return x.__await__() if a is not None else x
+
+
+builtins._mp_gen = _mp_gen
+builtins._mp_await = _mp_await
+
+
+class _HasYield(ast.NodeVisitor):
+    def __init__(self):
+        self.found = False
+
+    def visit_Yield(self, n):
+        self.found = True
+
+    visit_YieldFrom = visit_Yield
+
+    def visit_FunctionDef(self, n):
+        pass
+
+    visit_AsyncFunctionDef = visit_Lambda = visit_ClassDef = visit_FunctionDef
+
+
+def _has_yield(body):
+    v = _HasYield()
+    for n in (body if isinstance(body, list) else [body]):
+        v.visit(n)
+    return v.found
+
+
+class _T(ast.NodeTransformer):
+    def _dec(self):
+        return ast.Name("_mp_gen", ast.Load())
+
+    def visit_AsyncFunctionDef(self, n):
+        self.generic_visit(n)
+        body = n.body + [ast.If(ast.Constant(False), [ast.Expr(ast.Yield(None))], [])]
+        f = ast.FunctionDef(n.name, n.args, body, n.decorator_list + [self._dec()], n.returns, n.type_comment)
+        return ast.copy_location(f, n)
+
+    def visit_FunctionDef(self, n):
+        y = _has_yield(n.body)
+        self.generic_visit(n)
+        if y:
+            n.decorator_list = n.decorator_list + [self._dec()]
+        return n
+
+    def visit_Lambda(self, n):
+        y = _has_yield(n.body)
+        self.generic_visit(n)
+        if y:
+            return ast.copy_location(ast.Call(self._dec(), [n], []), n)
+        return n
+
+    def visit_Await(self, n):
+        self.generic_visit(n)
+        return ast.copy_location(ast.YieldFrom(ast.Call(ast.Name("_mp_await", ast.Load()), [n.value], [])), n)
+
+
+class Loader(importlib.machinery.SourceFileLoader):
+    def get_code(self, fullname):
+        path = self.get_filename(fullname)
+        if not os.path.abspath(path).startswith(REPO):
+            return super().get_code(fullname)
+        return self.source_to_code(self.get_data(path), path)  # never uses bytecode cached by CPython
+
+    def source_to_code(self, data, path, *, _optimize=-1):
+        if not os.path.abspath(path).startswith(REPO):
+            return super().source_to_code(data, path)
+        try:
+            src = data.decode("utf-8")
+        except UnicodeDecodeError:
+            src = data.decode("iso-8859-15")
+        if path.endswith("uasyncio/core.py"):
+            # micropython: bool is not a subclass of int, "yield False" must not be taken as a delay
+            src = src.replace("elif isinstance(ret, int):", "elif type(ret) is int:")
+        tree = ast.fix_missing_locations(_T().visit(ast.parse(src, path)))
+        return compile(tree, path, "exec", dont_inherit=True)
+
+
+import importlib._bootstrap_external as _be
+_loaders = [(Loader if l is importlib.machinery.SourceFileLoader else l, s)
+            for l, s in _be._get_supported_file_loaders()]
+sys.path_hooks.insert(0, importlib.machinery.FileFinder.path_hook(*_loaders))
+sys.path_importer_cache.clear()
+
+
+def _mod(name, **kw):
+    m = types.ModuleType(name)
+    m.__dict__.update(kw)
+    sys.modules[name] = m
+    return m
+
+
+_MAXT = 1 << 30
+_t0 = _time.monotonic()
+ticks_ms = lambda: int((_time.monotonic() - _t0) * 1000) & (_MAXT - 1)
+ticks_add = lambda a, b: (a + b) & (_MAXT - 1)
+
+
+def ticks_diff(a, b):
+    return ((a - b + _MAXT // 2) & (_MAXT - 1)) - _MAXT // 2
+
+
+_mod("utime", ticks_ms=ticks_ms, ticks_add=ticks_add, ticks_diff=ticks_diff,
+     sleep_ms=lambda ms: _time.sleep(ms / 1000), sleep=_time.sleep, time=_time.time, localtime=_time.localtime)
+for k in ("ticks_ms", "ticks_add", "ticks_diff"):
+    setattr(_time, k, globals()[k])
+_time.sleep_ms = lambda ms: _time.sleep(ms / 1000)
+_time.ticks_us = lambda: int((_time.monotonic() - _t0) * 1000000) & (_MAXT - 1)
+
+
+class utimeq:
+    def __init__(self, n):
+        self.n = n
+        self.h = []
+        self.c = 0
+        self.maxlen = 0
+
+    def push(self, t, cb, args):
+        if len(self.h) >= self.n:
+            raise IndexError("queue overflow")
+        self.c += 1
+        heapq.heappush(self.h, (ticks_diff(t, ticks_ms()), self.c, t, cb, args))
+        self.maxlen = max(self.maxlen, len(self.h))
+
+    def peektime(self):
+        return min(self.h)[2]
+
+    def pop(self, l):
+        e = heapq.heappop(self.h)
+        l[0], l[1], l[2] = e[2], e[3], e[4]
+
+    def __len__(self):
+        return len(self.h)
+
+
+_mod("utimeq", utimeq=utimeq)
+
+
+class deque(collections.deque):
+    def __init__(self, it, maxlen, flags=0):
+        super().__init__(it)
+        self._n = maxlen
+        self.maxlen_seen = 0
+
+    def append(self, x):
+        if len(self) >= self._n:
+            raise IndexError("full")
+        super().append(x)
+        self.maxlen_seen = max(self.maxlen_seen, len(self))
+
+
+_mod("ucollections", deque=deque, OrderedDict=collections.OrderedDict, namedtuple=collections.namedtuple)
+
+
+class _Poll:
+    def register(self, *a):
+        pass
+
+    def unregister(self, *a):
+        pass
+
+    def ipoll(self, delay, flags=0):
+        if delay < 0:
+            raise AssertionError("loop idle forever, deadlock")  # no sockets are polled in the tests
+        _time.sleep(delay / 1000)
+        return None
+
+
+import select as _select, errno as _errno, socket as _socket, json as _json, os as _os, gc as _gc, io as _io
+
+_mod("uselect", poll=_Poll, POLLIN=1, POLLOUT=4, POLLHUP=16, POLLERR=8)
+_mod("usocket", **{k: getattr(_socket, k) for k in dir(_socket) if not k.startswith("__")})
+_mod("uerrno", **{k: getattr(_errno, k) for k in dir(_errno) if not k.startswith("__")})
+sys.modules["ujson"] = _json
+sys.modules["uos"] = _os
+sys.modules["uio"] = _io
+import binascii as _binascii, hashlib as _hashlib, struct as _struct, zlib as _zlib, re as _re
+sys.modules["ubinascii"] = _binascii
+sys.modules["uhashlib"] = _hashlib
+sys.modules["ustruct"] = _struct
+sys.modules["ure"] = _re
+_gc.mem_free = lambda: 30000
+_gc.mem_alloc = lambda: 10000
+_scheduled = []
+
+
+def _schedule(f, a):
+    if len(_scheduled) >= 8:
+        raise RuntimeError("schedule queue full")
+    _scheduled.append((f, a))
+
+
+def run_scheduled():
+    while _scheduled:
+        f, a = _scheduled.pop(0)
+        f(a)
+
+
+_mod("micropython", const=lambda x: x, schedule=_schedule, alloc_emergency_exception_buf=lambda n: None,
+     mem_info=lambda *a: None, run_scheduled=run_scheduled)
+builtins.const = lambda x: x
+
+
+class _RTC:
+    _memory = b""
+
+    def memory(self, data=None):
+        if data is None:
+            return _RTC._memory
+        _RTC._memory = bytes(data)
+
+
+_mod("machine", unique_id=lambda: b"\x01\x02\x03\x04", RTC=_RTC, reset=lambda: None, reset_cause=lambda: 0,
+     DEEPSLEEP=4, DEEPSLEEP_RESET=4, freq=lambda *a: 80000000)
+_mod("network", WLAN=lambda *a: None, STA_IF=0, AP_IF=1)
+
+sys.path.insert(0, REPO)
+_orig_import = builtins.__import__
+
+
+def _import(*a, **k):
+    # micropython has no cache of directory listings, files created at runtime are importable
+    try:
+        return _orig_import(*a, **k)
+    except ModuleNotFoundError:
+        importlib.invalidate_caches()
+        return _orig_import(*a, **k)
+
+
+builtins.__import__ = _import
+if __name__ == "__main__":
+    script = sys.argv[1]
+    sys.argv = sys.argv[1:]
+    if not os.path.abspath(script).startswith(REPO):
+        raise ValueError("only scripts of the repository can be run")
+    importlib.import_module(os.path.splitext(os.path.relpath(script, REPO))[0].replace(os.sep, "."))
@@ -0,0 +1,273 @@
+# Author: Kevin Köck
+# Copyright Kevin Köck 2019 Released under the MIT license
+# Created on 2026-10-18
+
+__updated__ = "2026-10-18"
+__version__ = "0.3"
+
+"""
+Simulation of the duty cycle boot path (pysmartnode/dutyCycle.py) on the unix port.
+The device runs in a temporary directory with its own config.py and components.json, which are loaded by
+the real pysmartnode.config, loadComponentsFile and registerComponents on every boot.
+Only the hardware and the network are replaced by stubs: the modules machine, pysmartnode.logging and
+the mqtt client (pysmartnode.networking.mqtt_direct). The RTC memory survives the simulated deep sleeps,
+deep sleep ends the boot and the mqtt client only records publishes and subscriptions.
+Every boot forgets all modules of pysmartnode and the event loop like a real wake-up and checks that:
+- only the configured components are registered, their init and subscription tasks run and
+  the scheduler does not run their periodic jobs
+- one message is published per cycle with the sampled values, the cycle number and the awake times
+- the cycle counter and the awake time of the previous cycle are restored from the RTC memory
+- a cycle that can't publish goes back to sleep and is reported as failed by the next cycle
+
+Run from the repository root:
+micropython -c "import _testing.duty_cycle_simulation"
+or without the unix port: python3 _testing/cpython.py _testing/duty_cycle_simulation.py
+It is also run by _testing/run_tests.py.
+"""
+
+import sys
+import os
+
+REPO = os.getcwd()
+TMP = "/tmp/pysmartnode_duty_cycle"
+sys.path.insert(0, REPO + "/external_modules")  # uasyncio of this repository
+sys.path.insert(0, REPO)  # the device runs in TMP
+sys.path.insert(0, TMP)  # config.py of the device
+
+import json
+import time
+import uasyncio as asyncio
+from uasyncio import core
+
+CYCLES = 5
+UNREACHABLE = 3  # cycle in which the broker can't be reached
+SLEEP = 300
+TIMEOUT = 1
+
+DUTY_CYCLE = {"sleep": SLEEP, "sensors": {"htu": "tempHumid"}, "components": ["i2c"], "timeout": TIMEOUT}
+CONFIG = """
+MQTT_TYPE = 0
+MQTT_HOME = "home"
+MQTT_RECEIVE_CONFIG = True
+DEBUG = False
+LIGTWEIGHT_LOG = True
+INTERVAL_SEND_SENSOR = 600
+DUTY_CYCLE = {!r}
+""".format(DUTY_CYCLE)
+PACKAGE = "_testing.duty_cycle_simulation"
+COMPONENTS = {
+    "_order": ["i2c", "led", "htu", "switch"],
+    "i2c": {"package": PACKAGE, "component": "Component"},
+    "led": {"package": PACKAGE, "component": "Component"},
+    "htu": {"package": PACKAGE, "component": "Sensor", "constructor_args": {"i2c": "i2c"},
+            "init_function": "init", "call_function_regularly": "publish", "call_interval": 60},
+    "switch": {"package": PACKAGE, "component": "Component"},
+}
+
+
+class DeepSleep(Exception):
+    pass
+
+
+class RTC:
+    ALARM0 = 0
+    _memory = b""  # class attribute survives the simulated deep sleep
+    alarm_ms = None
+
+    def memory(self, data=None):
+        if data is None:
+            return RTC._memory
+        RTC._memory = bytes(data)
+
+    def irq(self, trigger, wake):
+        pass
+
+    def alarm(self, alarm, ms):
+        RTC.alarm_ms = ms
+
+
+class machine:
+    DEEPSLEEP = 4
+    RTC = RTC
+
+    @staticmethod
+    def deepsleep(ms=None):
+        raise DeepSleep()
+
+    @staticmethod
+    def unique_id():
+        return b"\x01\x02\x03\x04"
+
+
+class Logger:
+    def _log(self, message, level, local_only=False):
+        print("[{!s}] {}".format(level, message))
+
+    def critical(self, message, local_only=False):
+        self._log(message, "critical")
+
+    def error(self, message, local_only=False):
+        self._log(message, "error")
+
+    def warn(self, message, local_only=False):
+        self._log(message, "warn")
+
+    def info(self, message, local_only=False):
+        self._log(message, "info")
+
+    def debug(self, message, local_only=False):
+        self._log(message, "debug")
+
+    async def asyncLog(self, level, message):
+        self._log(message, level)
+
+
+class logging:
+    @staticmethod
+    def getLogger(name):
+        return Logger()
+
+
+class MQTTHandler:
+    published = []
+    subscribed = []
+    reachable = True
+
+    def __init__(self, receive_config=False):
+        assert receive_config is False, "configuration must not be requested in duty cycle mode"
+
+    @staticmethod
+    def getDeviceTopic(attrib, is_request=False):
+        return "home/sim/" + attrib + ("/set" if is_request else "")
+
+    async def publish(self, topic, msg, qos=0, retain=False):
+        while not MQTTHandler.reachable:
+            await asyncio.sleep_ms(100)  # mqtt_as waits for the connection
+        await asyncio.sleep_ms(20)
+        MQTTHandler.published.append((topic, msg))
+
+    async def subscribe(self, topic, callback_coro, qos=0, check_retained_state_topic=True):
+        MQTTHandler.subscribed.append(topic)
+
+    def scheduleSubscribe(self, topic, callback_coro, qos=0, check_retained_state_topic=True):
+        asyncio.get_event_loop().create_task(self.subscribe(topic, callback_coro, qos, check_retained_state_topic))
+
+
+class mqtt_direct:
+    MQTTHandler = MQTTHandler
+    Lock = object
+
+
+class Component:
+    pass
+
+
+class Sensor:
+    initialized = 0
+    jobs = 0
+
+    def __init__(self, i2c):
+        assert type(i2c) == Component
+        self._ready = False
+        from pysmartnode import config
+        mqtt = config.getMQTT()
+        mqtt.scheduleSubscribe(mqtt.getDeviceTopic("htu", is_request=True), self._set)
+        asyncio.get_event_loop().create_task(self._start())
+
+    async def _start(self):
+        await asyncio.sleep_ms(10)  # e.g. waking up the sensor
+        self._ready = True
+
+    def init(self):
+        asyncio.get_event_loop().create_task(self._init())
+
+    async def _init(self):
+        Sensor.initialized += 1
+
+    async def _set(self, topic, msg, retain):
+        pass
+
+    async def publish(self):
+        Sensor.jobs += 1  # periodic job, has to be skipped in duty cycle mode
+
+    async def tempHumid(self, publish=True):
+        assert publish is False
+        while not self._ready:
+            await asyncio.sleep_ms(5)
+        await asyncio.sleep_ms(50)
+        return 21.5, 48.0
+
+
+sys.modules["machine"] = machine
+sys.modules["pysmartnode.logging"] = logging
+sys.modules["pysmartnode.logging.logging_light"] = logging
+sys.modules["pysmartnode.networking.mqtt_direct"] = mqtt_direct
+STUBS = ("pysmartnode.logging", "pysmartnode.logging.logging_light", "pysmartnode.networking.mqtt_direct")
+
+
+def setup():
+    """creates the filesystem of the device"""
+    try:
+        os.mkdir(TMP)
+    except OSError:
+        pass  # already there
+    os.chdir(TMP)
+    for file in ("components.json", "components.bin"):
+        try:
+            os.remove(file)
+        except OSError:
+            pass
+    with open("config.py", "w") as f:
+        f.write(CONFIG)
+    with open("components.json", "w") as f:
+        f.write(json.dumps(COMPONENTS))
+
+
+def boot():
+    """one wake-up from deep sleep, returns the awake time in ms"""
+    for name in [name for name in sys.modules]:
+        if (name == "config" or name.startswith("pysmartnode")) and name not in STUBS:
+            del sys.modules[name]  # RAM is lost during deep sleep
+    core._event_loop = None
+    st = time.ticks_ms()
+    from pysmartnode import config
+    from pysmartnode.utils import sys_vars
+    sys_vars.hasFilesystem = lambda: True  # os.statvfs("") is not supported by the unix port
+    from pysmartnode import dutyCycle
+    try:
+        asyncio.get_event_loop().run_until_complete(dutyCycle.run())
+    except DeepSleep:
+        assert sorted(config.COMPONENTS) == ["htu", "i2c", "mqtt"], config.COMPONENTS
+        return time.ticks_diff(time.ticks_ms(), st)
+    raise AssertionError("Node did not go to deep sleep")
+
+
+def main():
+    setup()
+    for cycle in range(1, CYCLES + 1):
+        MQTTHandler.reachable = cycle != UNREACHABLE
+        published = len(MQTTHandler.published)
+        awake = boot()
+        print("Cycle", cycle, "awake", awake, "ms, RTC memory", len(RTC._memory), "B")
+        assert Sensor.initialized == cycle, "init function did not run"
+        assert MQTTHandler.subscribed == ["home/sim/htu/set"] * cycle, MQTTHandler.subscribed
+        assert Sensor.jobs == 0, "periodic job of a sensor was run"
+        assert RTC.alarm_ms == SLEEP * 1000
+        assert RTC._memory.startswith(b"PSS")
+        if cycle == UNREACHABLE:
+            assert len(MQTTHandler.published) == published
+            assert awake >= TIMEOUT * 1000
+            continue
+        assert len(MQTTHandler.published) == published + 1
+        topic, msg = MQTTHandler.published[-1]
+        print(topic, msg)
+        assert topic == "home/sim/duty_cycle"
+        assert msg["cycle"] == cycle
+        assert tuple(msg["values"]["htu"]) == (21.5, 48.0)
+        assert msg["failed"] == (1 if cycle == UNREACHABLE + 1 else 0)
+        assert (msg["last_awake"] is None) == (cycle == 1)
+    os.chdir(REPO)
+    print("Duty cycle simulation passed")
+
+
+main()
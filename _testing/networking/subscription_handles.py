@@ -0,0 +1,189 @@
+# Author: Kevin Köck
+# Copyright Kevin Köck 2019 Released under the MIT license
+# Created on 2026-10-18
+
+__updated__ = "2026-10-18"
+__version__ = "0.1"
+
+"""
+Test of the subscription handles of both mqtt backends (pysmartnode/networking/mqtt_direct.py and
+pysmartnode/networking/mqtt_iot.py): subscribe() returns a handle and unsubscribe(handle) removes only
+the callback of this handle, also for device topics.
+The mqtt client libraries are replaced by stubs recording the subscriptions sent to the broker.
+
+Run from the repository root on the unix port:
+micropython -c "import _testing.networking.subscription_handles"
+"""
+
+import sys
+
+sys.path.insert(0, "external_modules")  # uasyncio of this repository
+
+import uasyncio as asyncio
+
+broker = []  # subscriptions sent to the broker, same for both backends
+
+
+class config:
+    id = "dev"
+    MQTT_HOME = "home"
+    MQTT_HOST = "localhost"
+    DEBUG = False
+
+
+class Logger:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+    async def asyncLog(self, level, message):
+        pass
+
+
+class logging:
+    @staticmethod
+    def getLogger(name):
+        return Logger()
+
+
+class machine:
+    class Pin:
+        OUT = 1
+
+        def __init__(self, *args, **kwargs):
+            pass
+
+    @staticmethod
+    def unique_id():
+        return b"\x01\x02\x03\x04"
+
+
+class MQTTClient:
+    async def subscribe(self, topic, qos=0):
+        broker.append(("sub", topic))
+
+    async def unsubscribe(self, topic):
+        broker.append(("unsub", topic))
+
+
+class mqtt_as:
+    MQTTClient = MQTTClient
+    Lock = object
+
+
+class Mqtt:
+    """app of micropython_iot_generic, stores the callbacks of every topic itself"""
+
+    def __init__(self, *args):
+        self.callbacks = {}
+
+    async def subscribe(self, topic, callback_coro, qos=0, check_retained_state_topic=True):
+        if topic not in self.callbacks:
+            self.callbacks[topic] = []
+            broker.append(("sub", topic))
+        if callback_coro not in self.callbacks[topic]:
+            self.callbacks[topic].append(callback_coro)
+
+    async def unsubscribe(self, topic, callback=None):
+        if topic not in self.callbacks:
+            raise AttributeError(topic)
+        if callback is not None:
+            self.callbacks[topic].remove(callback)
+            if self.callbacks[topic]:
+                return
+        del self.callbacks[topic]
+        broker.append(("unsub", topic))
+
+
+class micropython_iot_generic:
+    class client:
+        class apphandler:
+            class AppHandler:
+                def __init__(self, *args, **kwargs):
+                    pass
+
+        class apps:
+            class mqtt:
+                Mqtt = Mqtt
+
+
+class micropython_iot:
+    Lock = object
+    Event = object
+
+
+sys.modules["pysmartnode.config"] = config
+sys.modules["pysmartnode.logging"] = logging
+sys.modules["machine"] = machine
+sys.modules["micropython_mqtt_as"] = mqtt_as
+sys.modules["micropython_mqtt_as.mqtt_as"] = mqtt_as
+sys.modules["micropython_mqtt_as.mqtt_as_minimal"] = mqtt_as
+sys.modules["micropython_iot"] = micropython_iot
+sys.modules["micropython_iot_generic"] = micropython_iot_generic
+sys.modules["micropython_iot_generic.client"] = micropython_iot_generic.client
+sys.modules["micropython_iot_generic.client.apphandler"] = micropython_iot_generic.client.apphandler
+sys.modules["micropython_iot_generic.client.apps"] = micropython_iot_generic.client.apps
+sys.modules["micropython_iot_generic.client.apps.mqtt"] = micropython_iot_generic.client.apps.mqtt
+
+from pysmartnode.networking import mqtt_direct, mqtt_iot
+from pysmartnode.utils.subscriptionHandlers.subscription import SubscriptionHandler
+
+
+class Direct(mqtt_direct.MQTTHandler):
+    def __init__(self):
+        self.mqtt_home = config.MQTT_HOME
+        self.client_id = config.id
+        self._state = None
+        self._state_topics = set()
+        self._subscriptions = SubscriptionHandler()
+
+    def subscribed(self, topic):
+        try:
+            return self._subscriptions.getFunctions(topic)
+        except IndexError:
+            return []
+
+
+class IoT(mqtt_iot.MQTTHandler):
+    def __init__(self):
+        self.mqtt_home = config.MQTT_HOME
+        self.client_id = config.id
+        Mqtt.__init__(self)
+
+    def subscribed(self, topic):
+        if self._isDeviceTopic(topic):
+            topic = self.getRealTopic(topic)
+        return self.callbacks.get(topic, [])
+
+
+async def first(topic, msg, retain):
+    pass
+
+
+async def second(topic, msg, retain):
+    pass
+
+
+async def test(mqtt, topic):
+    del broker[:]
+    real = mqtt.getRealTopic(topic) if mqtt._isDeviceTopic(topic) else topic
+    h1 = await mqtt.subscribe(topic, first, check_retained_state_topic=False)
+    h2 = await mqtt.subscribe(topic, second, check_retained_state_topic=False)
+    assert type(h1) == tuple and type(h2) == tuple, (h1, h2)
+    assert list(mqtt.subscribed(topic)) == [first, second], mqtt.subscribed(topic)
+    await mqtt.unsubscribe(h1)
+    assert list(mqtt.subscribed(topic)) == [second], mqtt.subscribed(topic)
+    assert ("unsub", real) not in broker, broker
+    await mqtt.unsubscribe(h2)
+    assert list(mqtt.subscribed(topic)) == [], mqtt.subscribed(topic)
+    assert broker[-1] == ("unsub", real), broker
+
+
+async def main():
+    for mqtt in (Direct(), IoT()):
+        for topic in ("home/other/switch", mqtt.getDeviceTopic("switch", is_request=True)):
+            await test(mqtt, topic)
+        print(type(mqtt).__name__, "OK")
+
+
+asyncio.get_event_loop().run_until_complete(main())
+print("subscription handles: OK")
@@ -0,0 +1,52 @@
+# Author: Kevin Köck
+# Copyright Kevin Köck 2019 Released under the MIT license
+# Created on 2026-10-18
+
+__updated__ = "2026-10-18"
+__version__ = "0.1"
+
+"""
+Runs all tests of _testing that check their results, each in its own process.
+Tests for the device are run on the micropython unix port if it is installed, otherwise on CPython
+using _testing/cpython.py. Host tools are tested with CPython.
+
+Run from the repository root:
+python3 _testing/run_tests.py
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+
+DEVICE_TESTS = ("_testing/utils/event.py", "_testing/utils/wakeableSleep.py",
+                "_testing/networking/subscription_handles.py", "_testing/duty_cycle_simulation.py")
+HOST_TESTS = ("_testing/tools/freeze_manifest.py",)
+
+
+def _module(test):
+    return os.path.splitext(test)[0].replace("/", ".")
+
+
+def main():
+    micropython = shutil.which("micropython")
+    failed = []
+    for test in DEVICE_TESTS + HOST_TESTS:
+        if test in HOST_TESTS:
+            cmd = [sys.executable, "-m", _module(test)]
+        elif micropython is not None:
+            cmd = [micropython, "-c", "import " + _module(test)]
+        else:
+            cmd = [sys.executable, "_testing/cpython.py", test]
+        res = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        print("{!s} {!s}".format("OK    " if res.returncode == 0 else "FAILED", test))
+        if res.returncode != 0:
+            print(res.stdout.decode(errors="replace"))
+            failed.append(test)
+    print("{!s} of {!s} tests passed".format(len(DEVICE_TESTS + HOST_TESTS) - len(failed),
+                                              len(DEVICE_TESTS + HOST_TESTS)))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+# Author: Kevin Köck
+# Copyright Kevin Köck 2019 Released under the MIT license
+# Created on 2026-10-18
+
+__updated__ = "2026-10-18"
+__version__ = "0.1"
+
+"""
+Test of tools/freeze_manifest.py: the manifest of a sample configuration contains the modules needed
+for booting, also those only imported by name with transient.acquire() and the platform specific
+wifi modules.
+
+Run from the repository root on the host:
+python3 -m _testing.tools.freeze_manifest
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, "tools")
+
+import freeze_manifest
+
+CONFIG = {
+    "i2c": {"package": ".machine.i2c", "component": "I2C", "constructor_args": {"SCL": "D6", "SDA": "D5"}},
+    "htu": {"package": ".sensors.htu21d", "component": "HTU21D", "constructor_args": {"i2c": "i2c"}},
+}
+
+REQUIRED = ("main", "pysmartnode.config", "pysmartnode.main", "pysmartnode.utils.transient",
+            "pysmartnode.utils.registerComponents", "pysmartnode.utils.loadComponentsFile",
+            "pysmartnode.utils.componentsCache", "pysmartnode.utils.dependencies",
+            "pysmartnode.utils.jsonStream", "pysmartnode.utils.deflate", "pysmartnode.utils.files",
+            "pysmartnode.utils.pacing", "pysmartnode.networking.wifi",
+            "pysmartnode.networking.mqtt_receive_config", "pysmartnode.components.machine.i2c",
+            "pysmartnode.components.sensors.htu21d")
+PLATFORM_WIFI = ("pysmartnode.networking.wifi_esp8266", "pysmartnode.networking.wifi_esp32",
+                 "pysmartnode.networking.wifi_esp32_lobo")
+
+
+def modules(manifest):
+    names = set()
+    for line in manifest.splitlines():
+        line = line.strip()
+        if line.startswith("'") and line.endswith("',"):
+            rel = line[1:-2]
+            if rel.endswith("/__init__.py"):
+                rel = rel[:-len("/__init__.py")]
+            names.add(rel[:-3] if rel.endswith(".py") else rel)
+    return set(name.replace("/", ".") for name in names)
+
+
+def run(*args):
+    with tempfile.TemporaryDirectory() as tmp:
+        components = os.path.join(tmp, "components.json")
+        output = os.path.join(tmp, "manifest.py")
+        with open(components, "w") as f:
+            json.dump(CONFIG, f)
+        freeze_manifest.main(["--components", components, "-o", output, "--mpy-cross", ""] + list(args))
+        with open(output) as f:
+            return modules(f.read())
+
+
+found = run()
+for name in REQUIRED + PLATFORM_WIFI:
+    assert name in found, name
+
+found = run("--platform", "esp8266")
+for name in REQUIRED:
+    assert name in found, name
+assert "pysmartnode.networking.wifi_esp8266" in found
+assert "pysmartnode.networking.wifi_esp32" not in found
+assert "pysmartnode.networking.wifi_esp32_lobo" not in found
+
+print("freeze_manifest: OK")
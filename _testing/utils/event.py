@@ -0,0 +1,104 @@
+# Author: Kevin Köck
+# Copyright Kevin Köck 2019 Released under the MIT license
+# Created on 2026-10-18
+
+__updated__ = "2026-10-18"
+__version__ = "0.1"
+
+"""
+Test of pysmartnode/utils/event.py: waiting tasks are parked and only woken by set(), a timeout or
+a cancellation, also if these happen before the task is parked.
+
+Run from the repository root on the unix port:
+micropython -c "import _testing.utils.event"
+"""
+
+import sys
+
+sys.path.insert(0, "external_modules")  # uasyncio of this repository
+
+import uasyncio as asyncio
+from pysmartnode.utils.event import Event
+
+loop = asyncio.get_event_loop()
+log = []
+
+
+async def waiter(ev, name, timeout=None):
+    # awaits the event in the first step of the task, before it yielded once
+    try:
+        if timeout is None:
+            await ev
+        else:
+            await asyncio.wait_for(ev, timeout)
+        log.append((name, "set", ev.value()))
+    except asyncio.TimeoutError:
+        log.append((name, "timeout"))
+    except asyncio.CancelledError:
+        log.append((name, "cancelled"))
+
+
+async def setBeforePark(ev):
+    loop.call_soon(ev.set, 1)  # runs before the task is parked
+    await ev
+    log.append(("early_set", "set", ev.value()))
+
+
+async def cancelBeforePark(ev):
+    loop.call_soon(asyncio.cancel, loop.cur_task)
+    try:
+        await ev
+        log.append(("early_cancel", "set"))
+    except asyncio.CancelledError:
+        log.append(("early_cancel", "cancelled"))
+
+
+def check(expected):
+    global log
+    assert sorted(log) == sorted(expected), log
+    log = []
+
+
+async def main():
+    ev = Event()
+    loop.create_task(waiter(ev, "a"))
+    loop.create_task(waiter(ev, "b"))
+    await asyncio.sleep_ms(50)
+    assert len(ev._waiting) == 2 and not log, "waiters have to be parked"
+    ev.set(5)
+    await asyncio.sleep_ms(10)
+    check([("a", "set", 5), ("b", "set", 5)])
+
+    ev.clear()
+    loop.create_task(waiter(ev, "timeout", 0.1))
+    await asyncio.sleep_ms(200)
+    check([("timeout", "timeout")])
+    assert not ev._waiting
+
+    coro = waiter(ev, "cancel")
+    loop.create_task(coro)
+    await asyncio.sleep_ms(50)
+    asyncio.cancel(coro)
+    await asyncio.sleep_ms(10)
+    check([("cancel", "cancelled")])
+    assert not ev._waiting
+    ev.set(6)  # nobody waiting anymore
+    ev.clear()
+
+    loop.create_task(setBeforePark(ev))
+    await asyncio.sleep_ms(50)
+    check([("early_set", "set", 1)])
+    ev.clear()
+
+    loop.create_task(cancelBeforePark(ev))
+    await asyncio.sleep_ms(50)
+    check([("early_cancel", "cancelled")])
+    assert not ev._waiting
+
+    ev.set(7)  # already set, waiting returns immediately
+    await waiter(ev, "is_set")
+    check([("is_set", "set", 7)])
+    print("Event test passed")
+
+
+loop.run_until_complete(main())
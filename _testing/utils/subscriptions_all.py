@@ -13,26 +13,31 @@ def wrapResult(handler, expected, result):
 from pysmartnode.utils.subscriptionHandlers.tree import Tree
 from pysmartnode.utils.subscriptionHandlers.subscribe_file import SubscriptionHandler as SubscriptionHandler_File
 from pysmartnode.utils.subscriptionHandlers.subscription import SubscriptionHandler
+from pysmartnode.utils.subscriptionHandlers.subscription_sorted import \
+    SubscriptionHandler as SubscriptionHandler_Sorted
 
-for handler in [Tree, SubscriptionHandler, SubscriptionHandler_File]:
+for handler in [Tree, SubscriptionHandler, SubscriptionHandler_File, SubscriptionHandler_Sorted]:
     print(handler)
     if handler == Tree:
         t = Tree("home", ["Functions"])
     elif handler == SubscriptionHandler:
         t = SubscriptionHandler()
+    elif handler == SubscriptionHandler_Sorted:
+        t = SubscriptionHandler_Sorted()
     else:
         t = SubscriptionHandler_File()
 
+    # the mqtt subscription backends return the list of callbacks of a topic
+    wrap = (lambda cb: cb) if handler == Tree else (lambda cb: [cb])
+
     topic = "home/login/#"
     t.addObject(topic, "sendConfig")
-    wrapResult(handler, "sendConfig", t.getFunctions("home/login/test"))
-    wrapResult(handler, "sendConfig", t.getFunctions("home/login"))
+    wrapResult(handler, wrap("sendConfig"), t.getFunctions("home/login/test"))
+    wrapResult(handler, wrap("sendConfig"), t.getFunctions("home/login"))
 
     topic = "home/login"
     t.addObject(topic, "nothing")
-    wrapResult(handler, "sendConfig", t.getFunctions("home/login/test"))
-    wrapResult(handler, "nothing", t.getFunctions("home/login"))
-    if handler == SubscriptionHandler:
-        print("This test fails because the wildcard was subscribed first and will be found first")
+    wrapResult(handler, wrap("sendConfig"), t.getFunctions("home/login/test"))
+    wrapResult(handler, wrap("nothing"), t.getFunctions("home/login"))
 
 print("\nTests done\n")
@@ -0,0 +1,180 @@
+# Author: Kevin Köck
+# Copyright Kevin Köck 2019 Released under the MIT license
+# Created on 2026-10-18
+
+__updated__ = "2026-10-18"
+__version__ = "0.1"
+
+"""
+Benchmark and memory footprint of all subscription backends.
+Runs every backend with 10/50/200 topics and different ratios of wildcard subscriptions,
+measures the latency of add, lookup hit, lookup miss and remove and the heap used per subscription.
+Every result is checked against a reference MQTT topic matcher.
+
+Run on the unix port (or a device) from the repository root:
+micropython -c "import _testing.utils.subscriptions_benchmark"
+"""
+
+import gc
+import os
+import time
+
+try:
+    ticks_us = time.ticks_us
+    ticks_diff = time.ticks_diff
+except AttributeError:  # CPython, only for development
+    ticks_us = lambda: int(time.perf_counter() * 1000000)
+    ticks_diff = lambda a, b: a - b
+
+from pysmartnode.utils.subscriptionHandlers.tree import Tree
+from pysmartnode.utils.subscriptionHandlers.subscription import SubscriptionHandler
+from pysmartnode.utils.subscriptionHandlers.subscribe_file import SubscriptionHandler as SubscriptionHandler_File
+from pysmartnode.utils.subscriptionHandlers.subscription_sorted import \
+    SubscriptionHandler as SubscriptionHandler_Sorted
+
+SIZES = (10, 50, 200)
+WILDCARD_RATIOS = (0, 0.1, 0.3)
+MAX_LOOKUPS = 50  # lookups per measurement, the file backend gets slow otherwise
+
+BACKENDS = (("tree", lambda: Tree("home", ["Functions"])),
+            ("list", SubscriptionHandler),
+            ("file", SubscriptionHandler_File),
+            ("sorted", SubscriptionHandler_Sorted))
+
+
+def mqttMatch(topic, subscription):
+    """Reference matcher following the MQTT specification, supports "+" and "#"."""
+    t = topic.split("/")
+    s = subscription.split("/")
+    for i in range(len(s)):
+        if s[i] == "#":
+            return True
+        if i >= len(t) or s[i] != "+" and s[i] != t[i]:
+            return False
+    return len(t) == len(s)
+
+
+def _memFree():
+    gc.collect()
+    return gc.mem_free() if hasattr(gc, "mem_free") else None
+
+
+def _callbacks(res):
+    return res if type(res) in (list, tuple) else (res,)
+
+
+def generate(size, wildcard_ratio):
+    """
+    Returns (subscriptions, hit topics, miss topics).
+    subscriptions is a list of (topic, callback), every device has its own level
+    and a part of them is subscribed by a wildcard instead of exact topics.
+    """
+    subs = []
+    hits = []
+    wildcards = int(size * wildcard_ratio)
+    for i in range(wildcards):
+        subs.append(("home/{!s}/dev{!s}/#".format(size, i), "cb{!s}".format(len(subs))))
+        hits.append("home/{!s}/dev{!s}/sensor/{!s}".format(size, i, i))
+    for i in range(size - wildcards):
+        topic = "home/{!s}/dev{!s}/value{!s}".format(size, i % 7 + wildcards, i)
+        subs.append((topic, "cb{!s}".format(len(subs))))
+        hits.append(topic)
+    misses = ["home/{!s}/other{!s}/value".format(size, i) for i in range(min(size, MAX_LOOKUPS))]
+    # interleave so wildcards are not always added first
+    subs = subs[wildcards:] + subs[:wildcards] if wildcards % 2 else subs
+    return subs, hits[:MAX_LOOKUPS], misses
+
+
+def expected(topic, subs):
+    """Callbacks that are a correct result for topic, exact subscription has priority"""
+    cbs = [cb for sub, cb in subs if sub == topic]
+    if cbs:
+        return cbs
+    return [cb for sub, cb in subs if mqttMatch(topic, sub)]
+
+
+def check(handler, topic, subs):
+    exp = expected(topic, subs)
+    try:
+        res = handler.getFunctions(topic)
+    except IndexError:
+        return len(exp) == 0
+    if res is None:
+        return len(exp) == 0
+    for cb in _callbacks(res):
+        if cb not in exp:
+            return False
+    return len(exp) > 0
+
+
+def _timeOps(func, items):
+    t = ticks_us()
+    for item in items:
+        func(item)
+    return ticks_diff(ticks_us(), t) / max(len(items), 1)
+
+
+def _lookup(handler):
+    def lookup(topic):
+        try:
+            handler.getFunctions(topic)
+        except IndexError:
+            pass
+
+    return lookup
+
+
+def run(name, create, size, wildcard_ratio):
+    subs, hits, misses = generate(size, wildcard_ratio)
+    gc.collect()
+    mem = _memFree()
+    handler = create()
+    t_add = _timeOps(lambda sub: handler.addObject(sub[0], sub[1]), subs)
+    mem_after = _memFree()
+    bytes_per_sub = (mem - mem_after) / size if mem is not None else None
+    t_hit = _timeOps(_lookup(handler), hits)
+    t_miss = _timeOps(_lookup(handler), misses)
+    errors = 0
+    for topic in hits + misses:
+        if not check(handler, topic, subs):
+            errors += 1
+    # remove half and check that the other half is still correct
+    removed = subs[::2]
+    remaining = subs[1::2]
+    t_remove = _timeOps(lambda sub: handler.removeObject(sub[0]), removed)
+    for topic in hits:
+        if not check(handler, topic, remaining):
+            errors += 1
+    for sub in remaining:
+        handler.removeObject(sub[0])
+    del handler
+    gc.collect()
+    return t_add, t_hit, t_miss, t_remove, bytes_per_sub, errors
+
+
+def _fmt(value):
+    if value is None:
+        return "{:>8s}".format("n/a")
+    return "{:8.1f}".format(value)
+
+
+def benchmark(sizes=SIZES, wildcard_ratios=WILDCARD_RATIOS, backends=BACKENDS):
+    print("backend  topics wildcard   add[us]   hit[us]  miss[us] remove[us] B/sub  errors")
+    results = []
+    for name, create in backends:
+        for size in sizes:
+            for ratio in wildcard_ratios:
+                res = run(name, create, size, ratio)
+                results.append((name, size, ratio) + res)
+                print("{:8s} {:6d} {:7d}% {!s}  {!s}  {!s}  {!s}  {!s} {:6d}".format(
+                    name, size, int(ratio * 100), _fmt(res[0]), _fmt(res[1]), _fmt(res[2]), _fmt(res[3]),
+                    _fmt(res[4]), res[5]))
+    try:
+        os.remove("_subscriptions.txt")
+    except OSError:
+        pass
+    return results
+
+
+benchmark()
+print("\nBenchmark done\n")
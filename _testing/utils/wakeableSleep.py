@@ -0,0 +1,125 @@
+# Author: Kevin Köck
+# Copyright Kevin Köck 2019 Released under the MIT license
+# Created on 2026-10-18
+
+__updated__ = "2026-10-18"
+__version__ = "0.2"
+
+"""
+Test of pysmartnode/utils/wakeableSleep.py: sleep until the deadline, wake(), reschedule(),
+cancellation and timeouts of a sleeping task and the length of the uasyncio waitq when the
+deadline is moved many times.
+
+Run from the repository root on the unix port:
+micropython -c "import _testing.utils.wakeableSleep"
+"""
+
+import sys
+
+sys.path.insert(0, "external_modules")  # uasyncio of this repository
+
+import time
+import uasyncio as asyncio
+from pysmartnode.utils.wakeableSleep import WakeableSleep
+
+TOLERANCE = 30  # ms
+
+loop = asyncio.get_event_loop()
+result = {}
+
+
+def near(duration, expected):
+    # the sleeper starts a little after the task measuring the time it reschedules at
+    return abs(duration - expected) < TOLERANCE
+
+
+async def sleeper(s, name, ms=None):
+    st = time.ticks_ms()
+    try:
+        await s.sleep_ms(ms)
+        result[name] = time.ticks_diff(time.ticks_ms(), st)
+    except asyncio.CancelledError:
+        result[name] = "cancelled"
+
+
+async def wakeBeforePark(s):
+    loop.call_soon(s.wake)  # runs before the task is parked
+    await sleeper(s, "early_wake", 1000)
+
+
+async def main():
+    s = WakeableSleep()
+    assert s.wake() is False and s.reschedule(10) is False, "nobody sleeping"
+
+    await sleeper(s, "plain", 100)
+    assert near(result["plain"], 100), result
+    assert not s.sleeping()
+
+    await sleeper(s, "zero", 0)
+    assert result["zero"] < TOLERANCE, result
+
+    loop.create_task(sleeper(s, "wake", 1000))
+    await asyncio.sleep_ms(50)
+    assert s.sleeping()
+    assert s.wake() is True
+    assert s.wake() is False, "already woken"
+    await asyncio.sleep_ms(10)
+    assert near(result["wake"], 50), result
+
+    loop.create_task(sleeper(s, "longer", 100))
+    await asyncio.sleep_ms(50)
+    s.reschedule(200)
+    await asyncio.sleep_ms(300)
+    assert near(result["longer"], 250), result
+
+    loop.create_task(sleeper(s, "shorter", 500))
+    await asyncio.sleep_ms(50)
+    s.reschedule(50)
+    await asyncio.sleep_ms(100)
+    assert near(result["shorter"], 100), result
+
+    loop.create_task(sleeper(s, "reschedule_0", 500))
+    await asyncio.sleep_ms(50)
+    s.reschedule(0)
+    await asyncio.sleep_ms(10)
+    assert near(result["reschedule_0"], 50), result
+
+    loop.create_task(sleeper(s, "forever"))
+    await asyncio.sleep_ms(200)
+    assert "forever" not in result
+    s.wake()
+    await asyncio.sleep_ms(10)
+    assert near(result["forever"], 200), result
+
+    coro = sleeper(s, "cancel", 1000)
+    loop.create_task(coro)
+    await asyncio.sleep_ms(50)
+    asyncio.cancel(coro)
+    await asyncio.sleep_ms(10)
+    assert result["cancel"] == "cancelled" and not s.sleeping(), result
+
+    st = time.ticks_ms()
+    try:
+        await asyncio.wait_for(s.sleep_ms(1000), 0.1)
+        raise AssertionError("no timeout")
+    except asyncio.TimeoutError:
+        assert near(time.ticks_diff(time.ticks_ms(), st), 100)
+    assert not s.sleeping()
+
+    await wakeBeforePark(s)
+    assert result["early_wake"] < TOLERANCE, result
+
+    # moving the deadline later reuses the pending loop callback, the waitq does not fill up
+    await asyncio.sleep_ms(1100)  # callbacks of the cancelled sleeps fired
+    loop.create_task(sleeper(s, "extended", 20))
+    await asyncio.sleep_ms(0)
+    for i in range(100):
+        s.reschedule(20 + i)
+        assert len(loop.waitq) <= 2, len(loop.waitq)  # sleep_ms(1) of this task and the callback
+        await asyncio.sleep_ms(1)
+    await asyncio.sleep_ms(150)
+    assert "extended" in result, result
+    print("WakeableSleep test passed")
+
+
+loop.run_until_complete(main())
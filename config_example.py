@@ -12,10 +12,15 @@ MQTT_PASSWORD = ""
 MQTT_KEEPALIVE = const(60)
 MQTT_HOME = "home"
 MQTT_RECEIVE_CONFIG = True
+MQTT_RECEIVE_CONFIG_HASH = False  # send hash of local config on login, server can answer "UNCHANGED"
+MQTT_RECEIVE_CONFIG_CHUNKED = False  # receive config as one message per component, needs server support
+MQTT_RECEIVE_CONFIG_TIMEOUT = const(10)  # seconds to wait for the config, doubles after every unanswered request
+MQTT_RECEIVE_CONFIG_BACKOFF_MAX = const(600)  # maximum seconds between config requests
 MQTT_TYPE = const(0)  # 0 = mqtt client, 1 = miropython_iot as proxy (experimental)
 # RECEIVE_CONFIG: Only use if you run the "SmartServer" in your environment which
 # sends the configuration of a device over mqtt
 # If you do not run it, you have to configure the components locally on each microcontroller
+SUBSCRIPTION_BACKEND = None  # "sorted", "list" or "file"; None uses "file" on esp8266 with filesystem, else "list"
 
 if platform == "esp32_LoBo":
     MDNS_ACTIVE = True
@@ -35,6 +40,7 @@ elif platform == "esp8266":
     MQTT_MINIMAL_VERSION = True  # saves ~200B if used as frozen bytecode
     USE_SOFTWARE_WATCHDOG = False  # uses ~700B of RAM, started with timeout=2xMQTT_KEEPALIVE, use if you experience outages
     RTC_SYNC_ACTIVE = False  # uses ~600B additional RAM on esp8266
+    SUBSCRIPTION_CACHE_SIZE = const(4)  # topics cached in RAM when subscriptions are stored in a file, ~60B each, 0 disables
     RTC_TIMEZONE_OFFSET = 2  # offset from GMT timezone as ntptime on esp8266 does not support timezones
 
 # 10min, Interval sensors send a new value if not specified by specific configuration
@@ -43,3 +49,12 @@ INTERVAL_SEND_SENSOR = const(600)
 # Does not need to be changed normally
 DEBUG = False
 DEBUG_STOP_AFTER_EXCEPTION = False
+BOOT_PROFILE = False  # publishes time and RAM needed by each component once per boot
+BOOT_PROFILE_BLOCKS = False  # also measures the largest free block, makes the boot profile slower
+IMPORT_TRACE = False  # publishes time and RAM needed by each module imported until the first publish
+SCHEDULER_STAGGER = 5  # seconds between periodic jobs with the same interval, e.g. sensor publications
+SCHEDULER_JOB_TIMEOUT = 1  # seconds the scheduler waits for a job before running the next ones, slow jobs keep running
+STATE_PERSIST = False  # restore the last states of /set topics at boot instead of waiting for retained messages
+DUTY_CYCLE = None  # e.g. {"sleep": 300, "sensors": {"htu": "tempHumid"}, "components": ["i2c"]} for battery nodes
+LOG_LOCAL_ONLY = False  # logs are only printed, not published
+COMPONENT_LIFECYCLE = False  # components can be started/stopped/replaced at runtime using mqtt
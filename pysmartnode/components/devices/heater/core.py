@@ -34,15 +34,17 @@ Short documentation:
 - therefore if internal sensor fails, no mode or plugin will be checked and heater shuts down (after 3 failed readings)
 - heater reacts to target temperature or mode change immediately
 - heater reacts to temperature change every REACTION_TIME seconds and waits xxx_CYCLES before starting/shutting down heater
+- with STATE_PERSIST the last mode and target temperature are restored at boot and the heater starts after 1s instead of 10s
 """
 
-__updated__ = "2019-01-03"
-__version__ = "0.9"
+__updated__ = "2026-10-18"
+__version__ = "1.1"
 
 from pysmartnode import config
 from pysmartnode import logging
 import uasyncio as asyncio
 from pysmartnode.utils.event import Event
+from pysmartnode.utils.wakeableSleep import WakeableSleep
 import gc
 import time
 
@@ -87,7 +89,9 @@ class Heater:
         self.__event = Event()
         self.__cycles_target_reached = -2  # will immediately react to current temperature
         self.__loop_started = False
+        self.__restored = False  # mode or target temp restored before the loop started
         self.__timer_time = 0  # has to be object variable so that _watch can update it too
+        self.__timer = WakeableSleep()  # woken when __timer_time changes
         self.__last_error = None
         self.__setHeaterPower = None  # coro of registered hardware
         self.__initializeHardware = None  # initialization coro if hardware requires it
@@ -116,6 +120,8 @@ class Heater:
         log.debug("Registering plugin {!s}".format(name), local_only=True)
         if coro not in self.__plugins:
             self.__plugins[name] = coro
+            if self.__loop_started:
+                self.__event.set()  # plugins registered after the start are used immediately
             return True
         else:
             log.warn("Plugin {!s} already registered")
@@ -204,6 +210,8 @@ class Heater:
                 await asyncio.sleep_ms(50)
         log.debug("setMode {!s}".format(msg), local_only=True)
         self.__active_mode = msg
+        if not self.__loop_started:
+            self.__restored = True
         self.__cycles_target_reached = -2 if retain else 0
         if self.__loop_started:
             self.__event.set()
@@ -221,6 +229,8 @@ class Heater:
             log.error("Error converting requested temp to float: {!r}".format(msg))
             return None
         self.__target_temp = temp
+        if not self.__loop_started:
+            self.__restored = True
         log.debug("requestTemp {!s}".format(temp), local_only=True)
         # await _mqtt.publish(self.__target_temp_topic[:-4], self.__target_temp, retain=True, qos=1)
         if self.__loop_started:
@@ -228,11 +238,17 @@ class Heater:
             self.__event.set()
         return True
 
+    def __setTimer(self, t):
+        self.__timer_time = t
+        self.__timer.wake()  # recalculates the remaining reaction time
+
     async def _timer(self):
         self.__timer_time = time.ticks_ms()
         while True:
-            while (time.ticks_ms() - self.__timer_time) < (self.__interval * 1000):
-                await asyncio.sleep(1)
+            wait = self.__interval * 1000 - time.ticks_diff(time.ticks_ms(), self.__timer_time)
+            if wait > 0:
+                await self.__timer.sleep_ms(int(wait))
+                continue
             self.__timer_time = time.ticks_ms()  # will also be set by _watch when resetting event
             log.debug("Reaction time reached", local_only=True)
             self.__event.set()
@@ -246,7 +262,10 @@ class Heater:
             raise TypeError("No supported temperature sensor API")
 
     async def _watch(self):
-        await asyncio.sleep(10)  # gives time to get retained values for targetTemp,Mode,Power,etc; and register plugins
+        # gives time to get retained values for targetTemp,Mode,Power,etc; and register plugins.
+        # If the state has already been restored from the local state store, retained values are only corrections.
+        restored = self.__restored and hasattr(config, "STATE_PERSIST") and config.STATE_PERSIST
+        await asyncio.sleep(1 if restored else 10)
         await self.__setHeaterPower(self.__target_power)
         # otherwise heater power would be floating or depending on how the hardware initializes
         self.__loop_started = True
@@ -264,7 +283,8 @@ class Heater:
                         log.critical("heater could not get temperature 3 times, shutting down heater")
                         self.__last_error = "NO_TEMP"
                         await self._setHeaterPower(0)
-                self.__timer_time = time.ticks_ms() - self.__interval / 2 * 1000  # wait only 1/2 reaction time
+                # wait only 1/2 reaction time
+                self.__setTimer(time.ticks_add(time.ticks_ms(), -int(self.__interval / 2 * 1000)))
                 do_update = False
             elif current_temp < self.__frost_temp and self.__target_power < 100:
                 if self.__last_error != "FROST":
@@ -308,7 +328,7 @@ class Heater:
             await self._updateMQTTStatus()
             await self.__event
             self.__event.clear()
-            self.__timer_time = time.ticks_ms()
+            self.__setTimer(time.ticks_ms())
         # in case of shutdown, code currently not reached anyways
         # await self._setHeaterPower(0)
 
@@ -19,8 +19,8 @@ example config:
 }
 """
 
-__updated__ = "2019-01-03"
-__version__ = "0.8"
+__updated__ = "2026-10-18"
+__version__ = "0.9"
 
 import gc
 from pysmartnode import config
@@ -103,9 +103,9 @@ class Bell:
         # print("timer",time.ticks_ms())
         if self.PIN_BELL_IRQ_DIRECTION == machine.Pin.IRQ_FALLING and self.pin_bell.value() == 0:
             self.last_activation = time.ticks_ms()
-            self.eventBell.set()
+            self.eventBell.irq_set()
         elif self.PIN_BELL_IRQ_DIRECTION == machine.Pin.IRQ_RISING and self.pin_bell.value() == 1:
             self.last_activation = time.ticks_ms()
-            self.eventBell.set()
+            self.eventBell.irq_set()
         self.timer_bell.deinit()
         self.timerLock.release()
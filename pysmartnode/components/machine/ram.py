@@ -16,27 +16,24 @@ example config:
 }
 """
 
-__updated__ = "2019-02-22"
-__version__ = "0.5"
+__updated__ = "2026-10-18"
+__version__ = "0.6"
 
 import gc
 
 from pysmartnode import config
-import uasyncio as asyncio
+from pysmartnode.utils import scheduler
 
 gc.collect()
 from pysmartnode import logging
 
 
-async def __ram(topic, interval):
-    await asyncio.sleep(12)
-    while True:
-        gc.collect()
-        logging.getLogger("RAM").info(gc.mem_free(), local_only=True)
-        await config.getMQTT().publish(topic, gc.mem_free())
-        await asyncio.sleep(interval)
+async def __ram(topic):
+    gc.collect()
+    logging.getLogger("RAM").info(gc.mem_free(), local_only=True)
+    await config.getMQTT().publish(topic, gc.mem_free())
 
 
 def ram(mqtt_topic=None, interval=600):
     mqtt_topic = mqtt_topic or config.getMQTT().getDeviceTopic("ram_free")
-    asyncio.get_event_loop().create_task(__ram(mqtt_topic, interval))
+    scheduler.add(lambda: __ram(mqtt_topic), interval, phase=12)
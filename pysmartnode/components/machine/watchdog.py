@@ -17,8 +17,8 @@ example config:
 }
 """
 
-__updated__ = "2018-10-19"
-__version__ = "1.1"
+__updated__ = "2026-10-18"
+__version__ = "1.2"
 
 import gc
 import uasyncio as asyncio
@@ -53,10 +53,10 @@ class WDT:
             except Exception as e:
                 logging.getLogger("WDT").error("Error saving to file: {!s}".format(e))
         elif use_rtc_memory and platform == "esp8266":
-            rtc = machine.RTC()
-            if rtc.memory() == b"WDT reset":
+            from pysmartnode.utils import rtcMemory  # shared with the state store
+            if rtcMemory.reason() == b"WDT reset":
                 logging.getLogger("WDT").critical("Reset reason: Watchdog")
-            rtc.memory(b"")
+            rtcMemory.setReason(b"")
 
     def _wdt(self, t):
         self._counter += self._timeout
@@ -68,8 +68,8 @@ class WDT:
                 except Exception as e:
                     print("Error saving to file: {!s}".format(e))
             elif self._use_rtc_memory and platform == "esp8266":
-                rtc = machine.RTC()
-                rtc.memory(b"WDT reset")
+                from pysmartnode.utils import rtcMemory
+                rtcMemory.setReason(b"WDT reset")
             machine.reset()
 
     def feed(self):
@@ -23,12 +23,13 @@ example config:
 }
 """
 
-__version__ = "0.1"
-__updated__ = "2018-08-18"
+__version__ = "0.2"
+__updated__ = "2026-10-18"
 
 from pysmartnode import config
 from pysmartnode import logging
 import uasyncio as asyncio
+from pysmartnode.utils import scheduler
 import gc
 import machine
 from pysmartnode.components.machine.pin import Pin
@@ -59,7 +60,9 @@ class Battery:
         gc.collect()
         self._event_low = None
         self._event_high = None
-        asyncio.get_event_loop().create_task(self._watch(interval, interval_watching))
+        self._interval = interval * 1000
+        self._t = time.ticks_ms()
+        scheduler.add(self._watch, interval_watching)
 
     def getVoltageMax(self):
         """Getter for consumers"""
@@ -87,37 +90,36 @@ class Battery:
     async def voltage(self, publish=True):
         return await self._read(publish=publish)
 
-    async def _watch(self, interval, interval_watching):
-        t = time.ticks_ms()
-        while True:
-            if time.ticks_ms() > t:
-                # publish interval
-                voltage = self._read()
-                t = time.ticks_ms() + interval
+    async def _watch(self):
+        if time.ticks_diff(time.ticks_ms(), self._t) >= 0:
+            # publish interval
+            voltage = await self._read()
+            self._t = time.ticks_add(time.ticks_ms(), self._interval)
+        else:
+            voltage = await self._read(publish=False)
+        if voltage is None:
+            return
+        if voltage > self._voltage_max:
+            if self._event_high is not None:
+                self._event_high.set(data=voltage)
+                # no log as consumer has to take care of logging or doing something
             else:
-                voltage = self._read(publish=False)
-            if voltage > self._voltage_max:
-                if self._event_high is not None:
-                    self._event_high.set(data=voltage)
-                    # no log as consumer has to take care of logging or doing something
-                else:
-                    _log.warn("Battery voltage of {!s} exceeds maximum of {!s}".format(voltage, self._voltage_max))
-            elif voltage < self._voltage_min:
-                if self._event_low is not None:
-                    self._event_low.set(data=voltage)
-                    # no log as consumer has to take care of logging or doing something
+                _log.warn("Battery voltage of {!s} exceeds maximum of {!s}".format(voltage, self._voltage_max))
+        elif voltage < self._voltage_min:
+            if self._event_low is not None:
+                self._event_low.set(data=voltage)
+                # no log as consumer has to take care of logging or doing something
+            else:
+                _log.warn("Battery voltage of {!s} lower than minimum of {!s}".format(voltage, self._voltage_min))
+            if self._cutoff_pin is not None:
+                if self._cutoff_pin.value() == 1:
+                    _log.critical("Cutting off power did not work!")
+                    self._cutoff_pin.value(0)  # trying again
+                    await asyncio.sleep(1)
                 else:
-                    _log.warn("Battery voltage of {!s} lower than minimum of {!s}".format(voltage, self._voltage_min))
-                if self._cutoff_pin is not None:
-                    if self._cutoff_pin.value() == 1:
-                        _log.critical("Cutting off power did not work!")
-                        self._cutoff_pin.value(0)  # trying again
-                        await asyncio.sleep(1)
-                    else:
-                        _log.warn("Cutting off power")
-                    await asyncio.sleep(5)  # time to send all logs and for consumers to get done
-                    self._cutoff_pin.value(1)
-            await asyncio.sleep(interval_watching)
+                    _log.warn("Cutting off power")
+                await asyncio.sleep(5)  # time to send all logs and for consumers to get done
+                self._cutoff_pin.value(1)
 
     def registerEventHigh(self, event):
         self._event_high = event
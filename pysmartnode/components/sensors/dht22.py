@@ -21,12 +21,13 @@ example config:
 }
 """
 
-__updated__ = "2018-08-31"
-__version__ = "0.3"
+__updated__ = "2026-10-18"
+__version__ = "0.4"
 
 from pysmartnode import config
 from pysmartnode import logging
 import uasyncio as asyncio
+from pysmartnode.utils import scheduler
 from pysmartnode.components.machine.pin import Pin
 import gc
 
@@ -67,12 +68,7 @@ class DHT22:
         background_loop = self.tempHumid
         ##############################
         gc.collect()
-        asyncio.get_event_loop().create_task(self._loop(background_loop, interval))
-
-    async def _loop(self, gen, interval):
-        while True:
-            await gen()
-            await asyncio.sleep(interval)
+        scheduler.add(background_loop, interval)
 
     async def _dht_read(self):
         try:
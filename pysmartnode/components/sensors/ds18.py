@@ -30,12 +30,13 @@ example config:
 }
 """
 
-__updated__ = "2019-04-21"
-__version__ = "1.1"
+__updated__ = "2026-10-18"
+__version__ = "1.2"
 
 from pysmartnode import config
 from pysmartnode import logging
 import uasyncio as asyncio
+from pysmartnode.utils import scheduler
 import gc
 from pysmartnode.components.machine.pin import Pin
 
@@ -76,17 +77,10 @@ class DS18(ds18x20.DS18X20):
         background_loop = self.temperature
         ##############################
         gc.collect()
-        asyncio.get_event_loop().create_task(self._loop(background_loop, interval))
+        scheduler.add(background_loop, interval, phase=1)
         global _ds18_controller
         _ds18_controller = self
 
-    @staticmethod
-    async def _loop(gen, interval):
-        await asyncio.sleep(1)
-        while True:
-            await gen()
-            await asyncio.sleep(interval)
-
     async def _read(self, prec, offs, publish=True) -> (list, list):
         roms = []
         for _ in range(3):
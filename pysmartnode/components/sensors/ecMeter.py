@@ -2,8 +2,8 @@
 # Copyright Kevin Köck 2019 Released under the MIT license
 # Created on 2019-03-25 
 
-__updated__ = "2019-03-26"
-__version__ = "0.1"
+__updated__ = "2026-10-18"
+__version__ = "0.2"
 
 """
 example config:
@@ -52,6 +52,7 @@ from pysmartnode import logging
 from pysmartnode.components.machine.adc import ADC
 from pysmartnode.components.machine.pin import Pin
 import uasyncio as asyncio
+from pysmartnode.utils import scheduler
 import gc
 import machine
 import time
@@ -88,13 +89,7 @@ class EC:
         self._ec25 = None
         self._ppm = None
         self._time = 0
-        asyncio.get_event_loop().create_task(self._loop(self._read, interval))
-
-    @staticmethod
-    async def _loop(gen, interval):
-        while True:
-            await gen()
-            await asyncio.sleep(interval)
+        scheduler.add(self._read, interval)
 
     async def _read(self, publish=True):
         if time.ticks_ms() - self._time < 5000:
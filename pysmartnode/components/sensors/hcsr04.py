@@ -2,8 +2,8 @@
 # Copyright Kevin Köck 2019 Released under the MIT license
 # Created on 2019-03-31
 
-__updated__ = "2019-04-09"
-__version__ = "0.1"
+__updated__ = "2026-10-18"
+__version__ = "0.2"
 
 """
 Datasheet: https://www.mpja.com/download/hc-sr04_ultrasonic_module_user_guidejohn.pdf
@@ -33,6 +33,7 @@ from pysmartnode.components.machine.pin import Pin
 from pysmartnode import config
 from pysmartnode import logging
 import uasyncio as asyncio
+from pysmartnode.utils.wakeableSleep import WakeableSleep
 import machine
 import time
 import gc
@@ -72,6 +73,7 @@ class HCSR04:
         self._topic = mqtt_topic or _mqtt.getDeviceTopic("hcsr04")
         self._topic_int = mqtt_topic_interval or _mqtt.getDeviceTopic("hcsr04/interval", is_request=True)
         self.interval = interval or config.INTERVAL_SEND_SENSOR  # can be changed anytime
+        self._sleep = WakeableSleep()
         asyncio.get_event_loop().create_task(self._loop(self.distance))
         _mqtt.scheduleSubscribe(self._topic_int, self._setInterval, check_retained_state_topic=True)
 
@@ -80,9 +82,11 @@ class HCSR04:
         while True:
             await gen()
             t = time.ticks_ms()
-            while time.ticks_diff(time.ticks_ms(), t) < self.interval:
-                # this way interval can be changed and sensor reacts within 1s
-                await asyncio.sleep(1)
+            while True:
+                wait = int(self.interval * 1000) - time.ticks_diff(time.ticks_ms(), t)
+                if wait <= 0:
+                    break
+                await self._sleep.sleep_ms(wait)  # woken early if the interval is changed
 
     async def _setInterval(self, topic, message, retained):
         """
@@ -94,6 +98,7 @@ class HCSR04:
             await _log.asyncLog("error", "Can't convert interval {!s} to float: {!s}".format(message, e))
             return
         self.interval = message
+        self._sleep.wake()
         return True  # will publish the new interval
 
     def _pulse(self) -> int:
@@ -21,14 +21,14 @@ example config:
 }
 """
 
-__updated__ = "2018-09-29"
-__version__ = "1.1"
+__updated__ = "2026-10-18"
+__version__ = "1.2"
 
 import gc
 from pysmartnode import config
 from pysmartnode import logging
 from pysmartnode.libraries.htu21d.htu21d_async import HTU21D as htu
-import uasyncio as asyncio
+from pysmartnode.utils import scheduler
 
 _component_name = "HTU"
 
@@ -64,12 +64,7 @@ class HTU21D(htu):
         ##############################
 
         gc.collect()
-        asyncio.get_event_loop().create_task(self._loop(background_loop, interval))
-
-    async def _loop(self, gen, interval):
-        while True:
-            await gen()
-            await asyncio.sleep(interval)
+        scheduler.add(background_loop, interval)
 
     async def _read(self, coro, prec, offs, publish=True):
         if coro is None:
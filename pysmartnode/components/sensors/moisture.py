@@ -23,14 +23,15 @@ example config:
 }
 """
 
-__updated__ = "2019-03-01"
-__version__ = "0.9"
+__updated__ = "2026-10-18"
+__version__ = "1.0"
 
 import machine
 from pysmartnode.components.machine.pin import Pin
 from pysmartnode.components.machine.adc import ADC as ADCpy
 from pysmartnode import config
 import uasyncio as asyncio
+from pysmartnode.utils import scheduler
 import gc
 from pysmartnode import logging
 
@@ -78,12 +79,7 @@ class Moisture:
         interval = interval or config.INTERVAL_SEND_SENSOR
         self._lock = Lock()
         gc.collect()
-        asyncio.get_event_loop().create_task(self._loop(self.humidity, interval))
-
-    async def _loop(self, gen, interval):
-        while True:
-            await gen()
-            await asyncio.sleep(interval)
+        scheduler.add(self.humidity, interval)
 
     def _getConverted(self, sensor_type, voltage):
         if voltage is None:
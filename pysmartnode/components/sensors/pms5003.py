@@ -25,12 +25,12 @@ example config:
 Sensor can only be used with esp32 as esp8266 has only 1 uart at 115200 (9600 needed) 
 """
 
-__updated__ = "2018-08-31"
-__version__ = "1.2"
+__updated__ = "2026-10-18"
+__version__ = "1.3"
 
 from pysmartnode import config
 from pysmartnode import logging
-import uasyncio as asyncio
+from pysmartnode.utils import scheduler
 import gc
 import machine
 
@@ -67,12 +67,7 @@ class PMS5003(sensorModule.PMS5003):
         else:
             # possible to have different timings in passive_read and publish interval
             # useful if other components use readings of sensor too
-            asyncio.get_event_loop().create_task(self._loop(self.airQuality(), interval))
-
-    async def _loop(self, gen, interval):
-        while True:
-            await gen()
-            await asyncio.sleep(interval)
+            scheduler.add(self.airQuality, interval)
 
     ##############################
     # remove or add functions below depending on the values of your sensor
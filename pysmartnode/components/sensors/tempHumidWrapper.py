@@ -4,8 +4,8 @@ Created on 14.04.2018
 @author: Kevin Kck
 '''
 
-__updated__ = "2018-05-20"
-__version__ = "0.4"
+__updated__ = "2026-10-18"
+__version__ = "0.5"
 
 """
 This module wraps around every sensor that has a temperature and/or humidity function or coroutine
@@ -42,7 +42,7 @@ from pysmartnode import config
 
 _mqtt = config.getMQTT()
 from pysmartnode import logging
-import uasyncio as asyncio
+from pysmartnode.utils import scheduler
 import gc
 
 gc.collect()
@@ -117,12 +117,7 @@ class SensorWrapper:
         self.topic = mqtt_topic or _mqtt.getDeviceTopic(component_name)
         self.log = logging.getLogger(component_name)
         self.component_name = component_name
-        asyncio.get_event_loop().create_task(self._loop(gen, interval))
-
-    async def _loop(self, gen, interval):
-        while True:
-            await gen()
-            await asyncio.sleep(interval)
+        scheduler.add(gen, interval)
 
     async def _read(self, coro, prec, offs, publish=True):
         if coro is None:
@@ -2,8 +2,8 @@
 # Copyright Kevin Köck 2019 Released under the MIT license
 # Created on 2019-04-10 
 
-__updated__ = "2019-04-23"
-__version__ = "0.4"
+__updated__ = "2026-10-18"
+__version__ = "0.5"
 
 """
 Simple water sensor using 2 wires in water. As soon as some conductivity is possible, the sensor will hit.
@@ -21,9 +21,8 @@ Simple water sensor using 2 wires in water. As soon as some conductivity is poss
     }
 } 
 Will publish on any state change and in the given interval. State changes are detected in the interval_reading.
-Only the polling interval of the first initialized sensor is used.
-The publish interval is unique to each sensor. 
-This is to use only one uasyncio task for all sensors to prevent a uasyncio queue overflow.
+All sensors are polled by the central scheduler (pysmartnode/utils/scheduler.py), sensors with the same
+interval_reading are staggered.
 
 ** How to connect:
 Put a Resistor (~10kR) between the power pin (or permanent power) and the adc pin.
@@ -34,14 +33,13 @@ from pysmartnode import config
 from pysmartnode import logging
 from pysmartnode.components.machine.adc import ADC
 from pysmartnode.components.machine.pin import Pin
-import uasyncio as asyncio
+from pysmartnode.utils import scheduler
 import gc
 import machine
 import time
 
 _component_name = "WaterSensor"
 _count = 0
-_instances = []
 
 _log = logging.getLogger(_component_name)
 _mqtt = config.getMQTT()
@@ -56,34 +54,20 @@ class WaterSensor:
         self._adc = ADC(adc)
         self._ppin = Pin(power_pin, machine.Pin.OUT) if power_pin is not None else None
         self._cv = cutoff_voltage or self._adc.maxVoltage()
-        global _instances
-        if len(_instances) == 0:  # prevent loop queue overflow from multiple instances
-            asyncio.get_event_loop().create_task(self._loop(interval_reading))
-        _instances.append(self)
         global _count
         self._t = topic or _mqtt.getDeviceTopic("waterSensor/{!s}".format(_count))
         _count += 1
         self._lv = None
         self._tm = time.ticks_ms()
         self._int = interval * 1000
+        scheduler.add(self._poll, interval_reading)
 
-    @staticmethod
-    async def _loop(interval_reading):
-        interval_reading = interval_reading - 0.05 * len(_instances)
-        if interval_reading < 0:
-            interval_reading = 0
-            # still has 100ms after every read
-        while True:
-            for inst in _instances:
-                a = time.ticks_us()
-                await inst.water()
-                b = time.ticks_us()
-                if WaterSensor.DEBUG:
-                    print("Water measurement took", (b - a) / 1000, "ms")
-                await asyncio.sleep_ms(50)
-                # using multiple sensors connected to Arduinos it would result in long blocking calls
-                # because a single call to a pin takes ~17ms
-            await asyncio.sleep(interval_reading)
+    async def _poll(self):
+        a = time.ticks_us()
+        await self.water()
+        if WaterSensor.DEBUG:
+            print("Water measurement took", time.ticks_diff(time.ticks_us(), a) / 1000, "ms")
+            # using multiple sensors connected to Arduinos a single call to a pin takes ~17ms
 
     async def _read(self, publish=True):
         p = self._ppin
@@ -7,11 +7,37 @@ Created on 09.03.2018
 # Configuration management file
 ##
 
-__updated__ = "2018-09-18"
+__updated__ = "2026-10-18"
 
 from config import *
 from sys import platform
 
+try:
+    IMPORT_TRACE
+except NameError:
+    IMPORT_TRACE = False
+if IMPORT_TRACE:
+    from pysmartnode.utils import importTrace
+
+    importTrace.install()
+else:
+    importTrace = None
+
+try:
+    DUTY_CYCLE
+except NameError:
+    DUTY_CYCLE = None
+try:
+    LOG_LOCAL_ONLY
+except NameError:
+    LOG_LOCAL_ONLY = False
+if DUTY_CYCLE:
+    LOG_LOCAL_ONLY = True  # no time to publish logs between two deep sleeps
+    try:
+        STATE_BACKEND
+    except NameError:
+        STATE_BACKEND = "rtc"  # state of the duty cycle is kept in the RTC memory
+
 # General
 VERSION = const(411)
 print("PySmartNode version {!s} started".format(VERSION))
@@ -39,6 +65,10 @@ import uasyncio as asyncio
 LEN_ASYNC_QUEUE = 16 if platform == "esp8266" else 32
 loop = asyncio.get_event_loop(runq_len=LEN_ASYNC_QUEUE, waitq_len=LEN_ASYNC_QUEUE)
 
+from pysmartnode.utils.event import Event
+
+wifiConnected = Event()  # set while the wifi is connected, components needing the network can await it
+
 gc.collect()
 __printRAM(_mem, "Imported uasyncio")
 
@@ -52,62 +82,92 @@ _log = logging.getLogger("config")
 gc.collect()
 __printRAM(_mem, "Imported logging")
 
-if MQTT_TYPE == 1:
-    from pysmartnode.networking.mqtt_iot import MQTTHandler, Lock
-else:  # 0 and wrong configuration options
-    from pysmartnode.networking.mqtt_direct import MQTTHandler, Lock  # Lock possibly needed by other modules
+from pysmartnode.utils import transient
 
-gc.collect()
-__printRAM(_mem, "Imported MQTTHandler")
+try:
+    BOOT_PROFILE
+except NameError:
+    BOOT_PROFILE = False
+if BOOT_PROFILE:
+    from pysmartnode.utils import bootProfile
+else:
+    bootProfile = None
 
 COMPONENTS = {}
-COMPONENTS["mqtt"] = MQTTHandler(MQTT_RECEIVE_CONFIG)
-gc.collect()
-__printRAM(_mem, "Created MQTT")
 
 
-async def registerComponentsAsync(data):
+def _mqttModule():
+    # the module of the mqtt client is only imported when it is needed, so it is not compiled before the
+    # wifi connection is started
+    if MQTT_TYPE == 1:
+        from pysmartnode.networking import mqtt_iot
+        return mqtt_iot
+    # 0 and wrong configuration options
+    from pysmartnode.networking import mqtt_direct
+    return mqtt_direct
+
+
+def Lock(*args):
+    """Lock of the mqtt library, possibly needed by other modules"""
+    return _mqttModule().Lock(*args)
+
+
+async def _registerComponentsAsync(data):
     _log.debug("RAM before import registerComponents: {!s}".format(gc.mem_free()), local_only=True)
-    import pysmartnode.utils.registerComponents
-    gc.collect()
-    _log.debug("RAM after import registerComponents: {!s}".format(gc.mem_free()), local_only=True)
-    await pysmartnode.utils.registerComponents.registerComponentsAsync(data, _log)
-    _log.debug("RAM before deleting registerComponents: {!s}".format(gc.mem_free()), local_only=True)
-    del pysmartnode.utils.registerComponents
-    del sys.modules["pysmartnode.utils.registerComponents"]
-    gc.collect()
-    _log.debug("RAM after deleting registerComponents: {!s}".format(gc.mem_free()), local_only=True)
-
-
-async def loadComponentsFile():
+    module = transient.acquire("pysmartnode.utils.registerComponents")
+    try:
+        await module.registerComponentsAsync(data, _log)
+    finally:
+        del module
+        transient.release("pysmartnode.utils.registerComponents")
+    _log.debug("RAM after registerComponents: {!s}".format(gc.mem_free()), local_only=True)
+
+
+async def registerComponentsAsync(data):
+    await _registerComponentsAsync(data)
+    if bootProfile:
+        await bootProfile.publish()
+
+
+def _registerOnly(names):
+    async def register(data):
+        order = [c for c in data["_order"] if c in names]
+        if order:
+            tmp = {"_order": order}
+            for c in order:
+                if c in data:
+                    tmp[c] = data[c]
+            await _registerComponentsAsync(tmp)
+
+    return register
+
+
+async def loadComponentsFile(names=None):
+    """names: list of components, only these are registered (e.g. in duty cycle mode)"""
+    register = _registerComponentsAsync if names is None else _registerOnly(names)
     _log.debug("RAM before import loadComponentsFile: {!s}".format(gc.mem_free()), local_only=True)
-    import pysmartnode.utils.loadComponentsFile
-    gc.collect()
-    _log.debug("RAM after import loadComponentsFile: {!s}".format(gc.mem_free()), local_only=True)
-    data = await pysmartnode.utils.loadComponentsFile.loadComponentsFile(_log, registerComponentsAsync)
-    _log.debug("RAM before deleting loadComponentsFile: {!s}".format(gc.mem_free()), local_only=True)
-    del pysmartnode.utils.loadComponentsFile
-    del sys.modules["pysmartnode.utils.loadComponentsFile"]
-    gc.collect()
-    _log.debug("RAM after deleting loadComponentsFile: {!s}".format(gc.mem_free()), local_only=True)
+    module = transient.acquire("pysmartnode.utils.loadComponentsFile")
+    try:
+        data = await module.loadComponentsFile(_log, register)
+    finally:
+        del module
+        transient.release("pysmartnode.utils.loadComponentsFile")
+    _log.debug("RAM after loadComponentsFile: {!s}".format(gc.mem_free()), local_only=True)
     if type(data) == dict:
-        _log.debug("RAM before import registerComponents: {!s}".format(gc.mem_free()), local_only=True)
-        import pysmartnode.utils.registerComponents
-        gc.collect()
-        _log.debug("RAM after import registerComponents: {!s}".format(gc.mem_free()), local_only=True)
-        await pysmartnode.utils.registerComponents.registerComponentsAsync(data, _log)
-        _log.debug("RAM before deleting registerComponents: {!s}".format(gc.mem_free()), local_only=True)
-        del pysmartnode.utils.registerComponents
-        del sys.modules["pysmartnode.utils.registerComponents"]
-        gc.collect()
-        _log.debug("RAM after deleting registerComponents: {!s}".format(gc.mem_free()), local_only=True)
-        return True
+        await register(data)
+        data = True
+    if bootProfile and data is True:
+        await bootProfile.publish()
     return data  # data is either True or False
 
 
 def getComponent(name):
     if name in COMPONENTS:
-        return COMPONENTS[name]
+        obj = COMPONENTS[name]
+        lazy = sys.modules.get("pysmartnode.utils.lazy")  # only imported if there are lazy components
+        if lazy is not None and isinstance(obj, lazy.LazyComponent):
+            return obj.materialize()  # first access of a lazy component
+        return obj
     else:
         return None
 
@@ -118,7 +178,21 @@ def addComponent(name, obj):
     COMPONENTS[name] = obj
 
 
+try:
+    COMPONENT_LIFECYCLE
+except NameError:
+    COMPONENT_LIFECYCLE = False
+
+
 def getMQTT():
-    if "mqtt" in COMPONENTS:
-        return COMPONENTS["mqtt"]
-    return None
+    """returns the mqtt client, it is created on the first call (by main after starting the wifi connection)"""
+    if "mqtt" not in COMPONENTS:
+        _mem = gc.mem_free()
+        COMPONENTS["mqtt"] = _mqttModule().MQTTHandler(MQTT_RECEIVE_CONFIG and not DUTY_CYCLE)
+        gc.collect()
+        __printRAM(_mem, "Created MQTT")
+        if COMPONENT_LIFECYCLE:
+            from pysmartnode.utils import lifecycle
+
+            lifecycle.install()
+    return COMPONENTS["mqtt"]
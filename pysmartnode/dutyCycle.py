@@ -0,0 +1,86 @@
+'''
+Created on 2026-10-18
+
+@author: Kevin Köck
+'''
+
+__version__ = "0.3"
+__updated__ = "2026-10-18"
+
+"""
+Boot path for battery powered nodes that spend most of the time in deep sleep, used if DUTY_CYCLE is
+configured in config.py:
+DUTY_CYCLE = {
+    "sleep": 300,                      # seconds of deep sleep between two cycles
+    "sensors": {"htu": "tempHumid"},   # component name: coroutine of the component returning the value
+    "components": ["i2c"],             # optional, other components needed by the sensors
+    "timeout": 20,                     # optional, seconds to wait for each sample and for publishing
+}
+On every wake-up only these components of the local configuration are registered (the scheduler does
+not run their periodic jobs, tasks of their init and subscriptions run), every sensor is sampled once and
+all values are published in one message to <home>/<device-id>/duty_cycle before the node goes back
+to deep sleep:
+{"values": {sensor: value}, "cycle": number of the cycle, "awake": ms from boot to publishing,
+ "last_awake": ms the previous cycle was awake in total, "failed": previous cycles that could not publish}
+The configuration is not requested from the server, logs are not published and no device stats are sent.
+The cycle counter and awake times are kept in the state store (pysmartnode/utils/state.py) which uses
+the RTC memory unless STATE_BACKEND is configured.
+"""
+
+import time
+import uasyncio as asyncio
+from pysmartnode import config
+from pysmartnode import logging
+from pysmartnode.utils import state
+
+_log = logging.getLogger("dutyCycle")
+
+
+async def _register(names, sensors):
+    """registers the components, returns the sensor components"""
+    await config.loadComponentsFile(names)
+    return [config.getComponent(name) for name in sensors]  # lazy components get created now
+
+
+async def _sample(component, name, method, timeout):
+    if component is None:
+        _log.error("Sensor {!s} not registered".format(name))
+        return None
+    try:
+        return await asyncio.wait_for(getattr(component, method)(publish=False), timeout)
+    except asyncio.TimeoutError:
+        _log.error("Sensor {!s} timed out".format(name))
+    except Exception as e:
+        _log.error("Sensor {!s}: {!s}".format(name, e))
+    return None
+
+
+async def run():
+    settings = config.DUTY_CYCLE
+    timeout = settings["timeout"] if "timeout" in settings else 20
+    sensors = settings["sensors"]
+    names = list(sensors) + (settings["components"] if "components" in settings else [])
+    failed = state.get("dc_failed", 0)
+    try:
+        components = await _register(names, sensors)
+        values = {}
+        for i, name in enumerate(sensors):
+            values[name] = await _sample(components[i], name, sensors[name], timeout)
+        mqtt = config.getMQTT()
+        msg = {"values": values, "cycle": state.get("dc_cycle", 0) + 1, "awake": time.ticks_ms(),
+               "last_awake": state.get("dc_awake"), "failed": failed}
+        await asyncio.wait_for(mqtt.publish(mqtt.getDeviceTopic("duty_cycle"), msg, qos=1), timeout)
+        failed = 0
+    except asyncio.TimeoutError:
+        _log.error("Could not publish within {!s}s".format(timeout))
+        failed += 1
+    except Exception as e:
+        _log.error("Duty cycle error: {!s}".format(e))
+        failed += 1
+    # a node that can't publish still goes back to sleep to save the battery
+    state.set("dc_cycle", state.get("dc_cycle", 0) + 1)
+    state.set("dc_failed", failed)
+    state.set("dc_awake", time.ticks_ms())
+    state.flush()
+    from pysmartnode.components.machine.deepsleep import deepsleep
+    await deepsleep(settings["sleep"])
@@ -4,8 +4,8 @@ Created on 19.07.2017
 @author: Kevin Kck
 '''
 
-__updated__ = "2018-09-28"
-__version__ = "2.5"
+__updated__ = "2026-10-18"
+__version__ = "2.6"
 
 # TODO: Add possibility to use real logging module on esp32_lobo and save logs locally or to sdcard
 
@@ -19,6 +19,8 @@ import time
 
 
 async def asyncLog(name, message, level):
+    if config.LOG_LOCAL_ONLY:
+        return  # already printed by log()
     if config.getMQTT() is not None:
         base_topic = "{!s}/log/{!s}/{!s}".format(config.MQTT_HOME, "{!s}", sys_vars.getDeviceID())
         # if level is before id other clients can subscribe to e.g. all critical logs
@@ -39,7 +41,7 @@ def log(name, message, level, local_only=False, return_only=False):
         print("[{!s}] [{!s}] {}".format(name, level, message))
     if return_only:
         return
-    if local_only is False:
+    if local_only is False and not config.LOG_LOCAL_ONLY:
         asyncio.get_event_loop().create_task(asyncLog(name, message, level))
 
 
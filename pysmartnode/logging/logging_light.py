@@ -4,8 +4,8 @@ Created on 10.03.2018
 @author: Kevin Kck
 '''
 
-__updated__ = "2018-09-28"
-__version__ = "2.2"
+__updated__ = "2026-10-18"
+__version__ = "2.3"
 
 import gc
 from pysmartnode.utils import sys_vars
@@ -23,7 +23,7 @@ class Logging:
 
     def _log(self, message, level, local_only=False):
         print("[{!s}] {}".format(level, message))
-        if config.getMQTT() is not None and local_only is False:
+        if config.getMQTT() is not None and local_only is False and not config.LOG_LOCAL_ONLY:
             asyncio.get_event_loop().create_task(
                 config.getMQTT().publish(self.base_topic.format(level), "{}".format(message)))
 
@@ -44,7 +44,7 @@ class Logging:
 
     async def asyncLog(self, level, message):
         print("[{!s}] {}".format(level, message))
-        if config.getMQTT() is not None:
+        if config.getMQTT() is not None and not config.LOG_LOCAL_ONLY:
             await config.getMQTT().publish(self.base_topic.format(level), "{}".format(message))
 
 
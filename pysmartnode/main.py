@@ -4,7 +4,7 @@ Created on 10.08.2017
 @author: Kevin Kck
 '''
 
-__updated__ = "2018-10-01"
+__updated__ = "2026-10-18"
 
 import gc
 import time
@@ -21,6 +21,8 @@ import machine
 _log = logging.getLogger("pysmartnode")
 gc.collect()
 rtc = machine.RTC()
+if sys.platform == "esp8266":
+    from pysmartnode.utils import rtcMemory
 
 loop = asyncio.get_event_loop()
 
@@ -28,9 +30,10 @@ loop = asyncio.get_event_loop()
 async def _resetReason():
     # may be empty if eps8266 resets during reboot because of various reasons
     # (e.g. some of mine often keep rebooting 5 times until the start correctly and rtc.memory is empty then)
-    if sys.platform == "esp8266" and rtc.memory() != b"":
-        await _log.asyncLog("critical", "Reset reason: {!s}".format(rtc.memory().decode()))
-        rtc.memory(b"")
+    # the RTC memory is shared with the state store (pysmartnode/utils/rtcMemory.py)
+    if sys.platform == "esp8266" and rtcMemory.reason() != b"":
+        await _log.asyncLog("critical", "Reset reason: {!s}".format(rtcMemory.reason().decode()))
+        rtcMemory.setReason(b"")
     elif sys.platform == "esp32_LoBo" and rtc.read_string() != "":
         await _log.asyncLog("critical", "Reset reason: {!s}".format(rtc.memory()))
         rtc.write_string("")
@@ -39,13 +42,21 @@ async def _resetReason():
 
 
 def main():
-    loop.create_task(_resetReason())
     print("free ram {!r}".format(gc.mem_free()))
-    import pysmartnode.networking.wifi
-    pysmartnode.networking.wifi.connect()
-    del pysmartnode.networking.wifi
-    del sys.modules["pysmartnode.networking.wifi"]
-    gc.collect()
+    from pysmartnode.utils import transient
+    # wifi connects in the background while components are registered, mqtt waits for config.wifiConnected
+    try:
+        transient.acquire("pysmartnode.networking.wifi").connect()
+    finally:
+        transient.release("pysmartnode.networking.wifi")
+    config.getMQTT()  # created after starting the wifi connection, connects once config.wifiConnected is set
+    if config.DUTY_CYCLE:
+        # no watchdog as the node is only awake for a few seconds
+        from pysmartnode import dutyCycle
+        loop.create_task(dutyCycle.run())
+        _run()
+        return
+    loop.create_task(_resetReason())
 
     if hasattr(config, "USE_SOFTWARE_WATCHDOG") and config.USE_SOFTWARE_WATCHDOG:
         from pysmartnode.components.machine.watchdog import WDT
@@ -55,7 +66,10 @@ def main():
 
     if config.MQTT_RECEIVE_CONFIG is False:
         loop.create_task(config.loadComponentsFile())
+    _run()
+
 
+def _run():
     print("Starting uasyncio loop")
     if config.DEBUG_STOP_AFTER_EXCEPTION:
         # want to see the exception trace in debug mode
@@ -68,7 +82,7 @@ def main():
             # may fail due to memory allocation error
             if sys.platform == "esp8266":
                 try:
-                    rtc.memory("{!s}".format(e).encode())
+                    rtcMemory.setReason("{!s}".format(e).encode())
                 except Exception as e:
                     print(e)
                 print("{!s}".format(e).encode())
@@ -4,8 +4,8 @@ Created on 17.02.2018
 @author: Kevin Köck
 '''
 
-__version__ = "3.4"
-__updated__ = "2019-01-03"
+__version__ = "4.5"
+__updated__ = "2026-10-18"
 
 import gc
 import json
@@ -17,6 +17,7 @@ from pysmartnode import config
 from sys import platform
 from pysmartnode import logging
 from pysmartnode.utils import sys_vars
+from pysmartnode.utils import transient
 
 if platform == "esp8266" and (hasattr(config, "MQTT_MINIMAL_VERSION") is False or config.MQTT_MINIMAL_VERSION is True):
     print("Minimal MQTTClient")
@@ -26,7 +27,6 @@ else:
     from micropython_mqtt_as.mqtt_as import MQTTClient, Lock
 gc.collect()
 import uasyncio as asyncio
-import os
 import sys
 
 _log = logging.getLogger("MQTT")
@@ -42,7 +42,17 @@ class MQTTHandler(MQTTClient):
             this also saves RAM as the module "subscription" is used as a backend 
             to store subscriptions instead of the module "tree" which is bigger
         """
-        if platform == "esp8266" and sys_vars.hasFilesystem():
+        backend = config.SUBSCRIPTION_BACKEND if hasattr(config, "SUBSCRIPTION_BACKEND") else None
+        frozen = None
+        if backend == "sorted":
+            try:
+                # precompiled subscription table frozen into the firmware, see tools/compile_subscriptions.py
+                import _subscriptions_frozen
+                frozen = _subscriptions_frozen.TOPICS
+                del sys.modules["_subscriptions_frozen"]
+            except ImportError:
+                pass
+        if backend == "file" or backend is None and platform == "esp8266" and sys_vars.hasFilesystem():
             """ esp8266 has very limited RAM so choosing a module that writes subscribed topics 
             to a file if filesystem is enabled, else uses Subscription module.
             - less feature and less general
@@ -51,13 +61,24 @@ class MQTTHandler(MQTTClient):
             + saves at least 1kB with a few subscriptions
             """
             from pysmartnode.utils.subscriptionHandlers.subscribe_file import SubscriptionHandler
+            gc.collect()
+            self._subscriptions = SubscriptionHandler(config.SUBSCRIPTION_CACHE_SIZE if hasattr(
+                config, "SUBSCRIPTION_CACHE_SIZE") else 4)
+        elif backend == "sorted":
+            """
+            Sorted list of topics with binary search, less RAM per subscription and faster
+            lookups than the Subscription module, recommended for nodes with many subscriptions.
+            """
+            from pysmartnode.utils.subscriptionHandlers.subscription_sorted import SubscriptionHandler
+            gc.collect()
+            self._subscriptions = SubscriptionHandler(frozen)
         else:
             """ 
             For esp32 and esp8266 with no filesystem (which saves ~6kB) Subscription module is used
             """
             from pysmartnode.utils.subscriptionHandlers.subscription import SubscriptionHandler
-        gc.collect()
-        self._subscriptions = SubscriptionHandler()
+            gc.collect()
+            self._subscriptions = SubscriptionHandler()
         self.payload_on = ("ON", True, "True")
         self.payload_off = ("OFF", False, "False")
         self.client_id = config.id
@@ -74,16 +95,37 @@ class MQTTHandler(MQTTClient):
                          clean=False,
                          ssid=config.WIFI_SSID,
                          wifi_pw=config.WIFI_PASSPHRASE)
-        asyncio.get_event_loop().create_task(self.connect())
+        asyncio.get_event_loop().create_task(self._connect())
         self.__receive_config = receive_config
         # True=receive config, None=config received
-        self._awaiting_config = False
+        self._first_publish = None  # ms from boot to the first publish
+        self._state = None
+        if hasattr(config, "STATE_PERSIST") and config.STATE_PERSIST:
+            from pysmartnode.utils import state
+            self._state = state  # last applied states of /set topics
+            self._state_topics = set()  # state topics of subscribed /set topics
+        self._local = None
+        if receive_config is True and sys_vars.hasFilesystem():
+            # boot the last known configuration while the configuration is requested from the server
+            from pysmartnode.utils.event import Event
+            self._local = Event()
+            asyncio.get_event_loop().create_task(self._bootLocal())
+
+    async def _connect(self):
+        await config.wifiConnected  # wifi is connected by networking/wifi.py while components are registered
+        await self.connect()
 
     async def _wifiChanged(self, state):
+        if state:
+            config.wifiConnected.set()
+        else:
+            config.wifiConnected.clear()
         if config.DEBUG:
             _log.info("WIFI state {!s}".format(state), local_only=True)
 
     async def _connected(self, client):
+        if config.DUTY_CYCLE:
+            return  # only one publish before going back to deep sleep, no stats or subscriptions
         await self._publishDeviceStats()
         await self._subscribeTopics()
         if self.__receive_config is True:
@@ -91,45 +133,16 @@ class MQTTHandler(MQTTClient):
 
     async def _receiveConfig(self):
         self.__receive_config = None
-        while True:
-            gc.collect()
-            _log.debug("RAM before receiveConfig import: {!s}".format(gc.mem_free()), local_only=True)
-            import pysmartnode.networking.mqtt_receive_config
-            gc.collect()
-            _log.debug("RAM after receiveConfig import: {!s}".format(gc.mem_free()), local_only=True)
-            result = await pysmartnode.networking.mqtt_receive_config.requestConfig(config, self, _log)
-            if result is False:
-                _log.info("Using local components.json/py", local_only=True)
-                gc.collect()
-                _log.debug("RAM before receiveConfig deletion: {!s}".format(gc.mem_free()), local_only=True)
-                del pysmartnode.networking.mqtt_receive_config
-                del sys.modules["pysmartnode.networking.mqtt_receive_config"]
-                gc.collect()
-                _log.debug("RAM after receiveConfig deletion: {!s}".format(gc.mem_free()), local_only=True)
-                local_works = await config.loadComponentsFile()
-                if local_works is True:
-                    return True
-            else:
-                gc.collect()
-                _log.debug("RAM before receiveConfig deletion: {!s}".format(gc.mem_free()), local_only=True)
-                del pysmartnode.networking.mqtt_receive_config
-                del sys.modules["pysmartnode.networking.mqtt_receive_config"]
-                gc.collect()
-                _log.debug("RAM after receiveConfig deletion: {!s}".format(gc.mem_free()), local_only=True)
-                result = json.loads(result)
-                loop = asyncio.get_event_loop()
-                if platform == "esp8266":
-                    # on esp8266 components are split in small files and loaded after each other
-                    # to keep RAM requirements low, only if filesystem is enabled
-                    if sys_vars.hasFilesystem():
-                        loop.create_task(config.loadComponentsFile())
-                    else:
-                        loop.create_task(config.registerComponentsAsync(result))
-                else:
-                    # on esp32 components are registered directly but async to let logs run between registrations
-                    loop.create_task(config.registerComponentsAsync(result))
-                return True
-            await asyncio.sleep(60)  # if connection not stable or broker unreachable, try again in 60s
+        module = transient.acquire("pysmartnode.networking.mqtt_receive_config")
+        try:
+            await module.receiveConfig(config, self, _log, self._local)
+        finally:
+            del module
+            transient.release("pysmartnode.networking.mqtt_receive_config")
+        _log.debug("RAM after receiveConfig: {!s}".format(gc.mem_free()), local_only=True)
+
+    async def _bootLocal(self):
+        self._local.set(await config.loadComponentsFile())
 
     async def _subscribeTopics(self):
         for obj, topic in self._subscriptions.__iter__(with_path=True):
@@ -148,68 +161,107 @@ class MQTTHandler(MQTTClient):
         return False
 
     async def unsubscribe(self, topic, callback=None):
-        if callback is None:
-            _log.debug("unsubscribing topic {}".format(topic), local_only=True)
-            self._subscriptions.removeObject(topic)
-            if self._isDeviceTopic(topic):
-                topic = self.getRealTopic(topic)
-            await super().unsubscribe(topic)
-        else:
+        """
+        topic: topic or subscription handle returned by subscribe()
+        callback: if given, only this callback is removed from topic
+        """
+        if type(topic) == tuple:
+            topic, cbs, callback = topic  # subscription handle, no lookup needed
+        elif callback is not None:
             try:
                 cbs = self._subscriptions.getFunctions(topic)
-                if type(cbs) not in (tuple, list):
-                    self._subscriptions.removeObject(topic)
-                    _log.debug("unsubscribing topic {}".format(topic), local_only=True)
-                    if self._isDeviceTopic(topic):
-                        topic = self.getRealTopic(topic)
-                    await super().unsubscribe(topic)
-                    return
-                try:
-                    cbs = list(cbs)
-                    cbs.remove(callback)
-                    _log.debug("unsubscribing callback from topic {}".format(topic), local_only=True)
-                except ValueError:
-                    _log.warn("Callback to topic {!s} not subscribed".format(topic), local_only=True)
-                    return
-                self._subscriptions.setFunctions(topic, cbs)
-            except ValueError:
+            except IndexError:
                 _log.warn("Topic {!s} does not exist".format(topic))
+                return
+        if callback is not None:
+            try:
+                cbs.remove(callback)
+            except ValueError:
+                _log.warn("Callback to topic {!s} not subscribed".format(topic), local_only=True)
+                return
+            if len(cbs) > 0:
+                _log.debug("unsubscribing callback from topic {}".format(topic), local_only=True)
+                return
+        _log.debug("unsubscribing topic {}".format(topic), local_only=True)
+        self._subscriptions.removeObject(topic)
+        if self._state is not None and topic.endswith("/set"):
+            self._state_topics.discard(self._stateKey(topic[:-4]))
+        if self._isDeviceTopic(topic):
+            topic = self.getRealTopic(topic)
+        await super().unsubscribe(topic)
 
     def scheduleSubscribe(self, topic, callback_coro, qos=0, check_retained_state_topic=True):
         asyncio.get_event_loop().create_task(self.subscribe(topic, callback_coro, qos, check_retained_state_topic))
 
     async def subscribe(self, topic, callback_coro, qos=0, check_retained_state_topic=True):
+        """
+        Subscribing the same callback to a topic multiple times has no effect.
+        Returns a subscription handle that can be used to unsubscribe the callback.
+        """
         _log.debug("Subscribing to topic {}".format(topic), local_only=True)
         if type(callback_coro) is None:
             await _log.asyncLog("error", "Can't subscribe with callback of type None to topic {!s}".format(topic))
             return False
-        self._subscriptions.addObject(topic, callback_coro)
-        if check_retained_state_topic:
-            if topic.endswith("/set"):
-                # subscribe to topic without /set to get retained message for this topic state
-                # this is done additionally to the retained topic with /set in order to recreate
-                # the current state and then get new instructions in /set
-                state_topic = topic[:-4]
-                self._subscriptions.addObject(state_topic, callback_coro)
-                state_topic_new = state_topic
-                if self._isDeviceSubscription(state_topic):
-                    state_topic_new = self._convertToDeviceTopic(state_topic)
-                if self._isDeviceTopic(state_topic):
-                    state_topic_new = self.getRealTopic(state_topic)
-                await super().subscribe(state_topic_new, qos)
-                await asyncio.sleep_ms(500)
-                # gives retained state topic time to be received and processed before
-                # unsubscribing and adding /set subscription
-                await self.unsubscribe(state_topic, callback_coro)
-                # there might be more cbs regierstered by now so go the complex way
+        handle = (topic, self._subscriptions.addObject(topic, callback_coro), callback_coro)
+        if self._state is not None and topic.endswith("/set"):
+            self._state_topics.add(self._stateKey(topic[:-4]))
+        if check_retained_state_topic and topic.endswith("/set"):
+            if self._state is not None:
+                value = self._state.get(self._stateKey(topic[:-4]))
+                if value is not None:
+                    # restoring the last state immediately, the retained state is only a correction
+                    asyncio.get_event_loop().create_task(callback_coro(topic[:-4], value, True))
+                asyncio.get_event_loop().create_task(self._subscribeStateTopic(topic, callback_coro, qos))
+            else:
+                await self._subscribeStateTopic(topic, callback_coro, qos)
+            return handle
+        await self._subscribeTopic(topic, qos)
+        return handle
+
+    async def _subscribeStateTopic(self, topic, callback_coro, qos):
+        # subscribe to topic without /set to get retained message for this topic state
+        # this is done additionally to the retained topic with /set in order to recreate
+        # the current state and then get new instructions in /set
+        state_topic = topic[:-4]
+        try:
+            cbs = self._subscriptions.getFunctions(state_topic)
+            subscribed = callback_coro in cbs
+        except IndexError:
+            cbs, subscribed = None, False
+        state_handle = (state_topic, self._subscriptions.addObject(state_topic, callback_coro), callback_coro)
+        # addObject returns the same list if the callback is already subscribed to the state topic itself
+        # (not by a wildcard), then that subscription must not be removed
+        subscribed = subscribed and state_handle[1] is cbs
+        await self._subscribeTopic(state_topic, qos)
+        await asyncio.sleep_ms(500)
+        # gives retained state topic time to be received and processed before
+        # unsubscribing and adding /set subscription
+        if not subscribed:
+            await self.unsubscribe(state_handle)
+        await self._subscribeTopic(topic, qos)
+
+    async def _subscribeTopic(self, topic, qos):
         if self._isDeviceSubscription(topic):
             topic = self._convertToDeviceTopic(topic)
         if self._isDeviceTopic(topic):
             topic = self.getRealTopic(topic)
         await super().subscribe(topic, qos)
 
+    def _stateKey(self, topic):
+        return self._convertToDeviceTopic(topic) if self._isDeviceSubscription(topic) else topic
+
+    def _storeState(self, topic, value):
+        """stores the state applied by a callback of a /set topic or its retained state topic"""
+        if topic.endswith("/set"):
+            topic = topic[:-4]
+        elif topic not in self._state_topics:
+            return  # not the state topic of a /set topic
+        self._state.set(topic, value)
+
     async def _publishDeviceStats(self):
         await self.publish(self.getDeviceTopic("version"), config.VERSION, True, 1)
+        if self._first_publish is None:
+            await self._publishedFirst()
         await self.publish(self.getDeviceTopic("status"), "ONLINE", True, 1)
         if self.__receive_config is not None:
             # only log on first connection, not on reconnect as nothing has changed here
@@ -219,11 +271,18 @@ class MQTTHandler(MQTTClient):
                                    "{}-{:02d}-{:02d} {:02d}:{:02d}:{:02d}".format(t[0], t[1], t[2], t[3],
                                                                                   t[4],
                                                                                   t[5]), 1, True)
+                import os
                 _log.info(str(os.uname()))
                 _log.info("Client version: {!s}".format(config.VERSION))
         else:
             _log.debug("Reconnected")
 
+    async def _publishedFirst(self):
+        self._first_publish = time.ticks_ms()  # ticks start at boot
+        _log.info("First publish {!s}ms after boot".format(self._first_publish))
+        if config.importTrace:
+            await config.importTrace.publish(self._first_publish)
+
     def getDeviceTopic(self, attrib, is_request=False):
         if is_request:
             attrib += "/set"
@@ -246,20 +305,34 @@ class MQTTHandler(MQTTClient):
         topic = topic.decode()
         if topic.startswith("{!s}/{!s}/".format(self.mqtt_home, self.client_id)):
             topic = topic.replace("{!s}/{!s}/".format(self.mqtt_home, self.client_id), ".")
-        msg = msg.decode()
-        try:
-            msg = json.loads(msg)
-        except ValueError:
-            pass  # maybe not a json string, no way of knowing
+        compressed = False
+        if len(msg) > 2 and msg[0] & 0x0F == 8:
+            # might be a zlib header, deflate only imported then
+            from pysmartnode.utils import deflate
+            compressed = deflate.isCompressed(msg)
+            if compressed:
+                try:
+                    msg = deflate.loads(msg)
+                except Exception:
+                    compressed = False  # text that only looks like a zlib header
+        if not compressed:
+            msg = msg.decode()
+            try:
+                msg = json.loads(msg)
+            except ValueError:
+                pass  # maybe not a json string, no way of knowing
         _subscriptions = self._subscriptions
         try:
-            cb = _subscriptions.getFunctions(topic)
+            cbs = _subscriptions.getFunctions(topic)
         except IndexError:
             _log.warn("No callback found for topic {!s}".format(topic))
             return
-        for callback in cb if (type(cb) == list or type(cb) == tuple) else [cb]:
+        for callback in cbs if len(cbs) == 1 else tuple(cbs):
+            # copy if multiple callbacks as a callback could unsubscribe itself
             try:
                 res = await callback(topic, msg, retained)
+                if self._state is not None and res is not None and res is not False:
+                    self._storeState(topic, msg if res is True else res)
                 if not retained and topic.endswith("/set"):
                     # if a /set topic is found, send without /set, this is always retained:
                     if res is not None and res is not False:
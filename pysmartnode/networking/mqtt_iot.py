@@ -4,8 +4,8 @@ Created on 17.02.2018
 @author: Kevin Köck
 '''
 
-__version__ = "3.5"
-__updated__ = "2019-01-03"
+__version__ = "3.11"
+__updated__ = "2026-10-18"
 
 import gc
 import json
@@ -17,6 +17,7 @@ from pysmartnode import config
 from sys import platform
 from pysmartnode import logging
 from pysmartnode.utils import sys_vars
+from pysmartnode.utils import transient
 
 from micropython_iot_generic.client import apphandler
 from micropython_iot_generic.client.apps.mqtt import Mqtt
@@ -25,7 +26,6 @@ from machine import Pin
 
 gc.collect()
 import uasyncio as asyncio
-import os
 import sys
 
 _log = logging.getLogger("MQTT")
@@ -56,12 +56,23 @@ class MQTTHandler(Mqtt):
                          (self.getRealTopic(self.getDeviceTopic("status")), "ONLINE", 1, True))
         self.__receive_config = receive_config
         # True=receive config, None=config received
-        self._awaiting_config = False
+        self._first_publish = None  # ms from boot to the first publish
+        self._local = None
+        if receive_config is True and sys_vars.hasFilesystem():
+            # boot the last known configuration while the configuration is requested from the server
+            from pysmartnode.utils.event import Event
+            self._local = Event()
+            asyncio.get_event_loop().create_task(self._bootLocal())
 
     def concb(self, state):
         if config.DEBUG:
             _log.info("WIFI state {!s}".format(state), local_only=True)
         if state is True:
+            config.wifiConnected.set()
+        else:
+            config.wifiConnected.clear()
+        if state is True and not config.DUTY_CYCLE:
+            # in duty cycle mode only one publish is done before going back to deep sleep
             asyncio.get_event_loop().create_task(self._publishDeviceStats())
             if self.__receive_config is True:
                 asyncio.get_event_loop().create_task(self._receiveConfig())
@@ -69,45 +80,16 @@ class MQTTHandler(Mqtt):
 
     async def _receiveConfig(self):
         self.__receive_config = None
-        while True:
-            gc.collect()
-            _log.debug("RAM before receiveConfig import: {!s}".format(gc.mem_free()), local_only=True)
-            import pysmartnode.networking.mqtt_receive_config
-            gc.collect()
-            _log.debug("RAM after receiveConfig import: {!s}".format(gc.mem_free()), local_only=True)
-            result = await pysmartnode.networking.mqtt_receive_config.requestConfig(config, self, _log)
-            if result is False:
-                _log.info("Using local components.json/py", local_only=True)
-                gc.collect()
-                _log.debug("RAM before receiveConfig deletion: {!s}".format(gc.mem_free()), local_only=True)
-                del pysmartnode.networking.mqtt_receive_config
-                del sys.modules["pysmartnode.networking.mqtt_receive_config"]
-                gc.collect()
-                _log.debug("RAM after receiveConfig deletion: {!s}".format(gc.mem_free()), local_only=True)
-                local_works = await config.loadComponentsFile()
-                if local_works is True:
-                    return True
-            else:
-                gc.collect()
-                _log.debug("RAM before receiveConfig deletion: {!s}".format(gc.mem_free()), local_only=True)
-                del pysmartnode.networking.mqtt_receive_config
-                del sys.modules["pysmartnode.networking.mqtt_receive_config"]
-                gc.collect()
-                _log.debug("RAM after receiveConfig deletion: {!s}".format(gc.mem_free()), local_only=True)
-                result = json.loads(result)
-                loop = asyncio.get_event_loop()
-                if platform == "esp8266":
-                    # on esp8266 components are split in small files and loaded after each other
-                    # to keep RAM requirements low, only if filesystem is enabled
-                    if sys_vars.hasFilesystem():
-                        loop.create_task(config.loadComponentsFile())
-                    else:
-                        loop.create_task(config.registerComponentsAsync(result))
-                else:
-                    # on esp32 components are registered directly but async to let logs run between registrations
-                    loop.create_task(config.registerComponentsAsync(result))
-                return True
-            await asyncio.sleep(60)  # if connection not stable or broker unreachable, try again in 60s
+        module = transient.acquire("pysmartnode.networking.mqtt_receive_config")
+        try:
+            await module.receiveConfig(config, self, _log, self._local)
+        finally:
+            del module
+            transient.release("pysmartnode.networking.mqtt_receive_config")
+        _log.debug("RAM after receiveConfig: {!s}".format(gc.mem_free()), local_only=True)
+
+    async def _bootLocal(self):
+        self._local.set(await config.loadComponentsFile())
 
     def _convertToDeviceTopic(self, topic):
         if topic.startswith("{!s}/{!s}/".format(self.mqtt_home, self.client_id)):
@@ -120,6 +102,12 @@ class MQTTHandler(Mqtt):
         return False
 
     async def unsubscribe(self, topic, callback=None):
+        """
+        topic: topic or subscription handle returned by subscribe()
+        callback: if given, only this callback is removed from topic
+        """
+        if type(topic) == tuple:
+            topic, _, callback = topic  # subscription handle
         if self._isDeviceTopic(topic):
             topic = self.getRealTopic(topic)
         if callback is None:
@@ -135,19 +123,27 @@ class MQTTHandler(Mqtt):
         asyncio.get_event_loop().create_task(self.subscribe(topic, callback_coro, qos, check_retained_state_topic))
 
     async def subscribe(self, topic, callback_coro, qos=0, check_retained_state_topic=True):
+        """
+        Returns a subscription handle that can be used to unsubscribe the callback.
+        The subscriptions are stored by the app, so the handle has no callback list.
+        """
         _log.debug("Subscribing to topic {}".format(topic), local_only=True)
         if type(callback_coro) is None:
             await _log.asyncLog("error", "Can't subscribe with callback of type None to topic {!s}".format(topic))
             return False
+        handle = (topic, None, callback_coro)
         # if self._isDeviceSubscription(topic):
         #    topic = self._convertToDeviceTopic(topic)
         if self._isDeviceTopic(topic):
             topic = self.getRealTopic(topic)
         await super().subscribe(topic, callback_coro, qos, check_retained_state_topic)
+        return handle
 
     async def _publishDeviceStats(self):
         if self.__receive_config is not None:  # only works if not yielded before
             await self.publish(self.getDeviceTopic("version"), config.VERSION, 1, True)
+            if self._first_publish is None:
+                await self._publishedFirst()
             # only log on first connection, not on reconnect as nothing has changed here
             if hasattr(config, "RTC_SYNC_ACTIVE") and config.RTC_SYNC_ACTIVE:
                 t = time.localtime()
@@ -155,12 +151,19 @@ class MQTTHandler(Mqtt):
                                    "{}-{:02d}-{:02d} {:02d}:{:02d}:{:02d}".format(t[0], t[1], t[2], t[3],
                                                                                   t[4],
                                                                                   t[5]), 1, True)
+                import os
                 _log.info(str(os.uname()))
                 _log.info("Client version: {!s}".format(config.VERSION))
         else:
             await _log.asyncLog("debug", "Reconnected")
         await self.publish(self.getDeviceTopic("status"), "ONLINE", 1, True)
 
+    async def _publishedFirst(self):
+        self._first_publish = time.ticks_ms()  # ticks start at boot
+        _log.info("First publish {!s}ms after boot".format(self._first_publish))
+        if config.importTrace:
+            await config.importTrace.publish(self._first_publish)
+
     @staticmethod
     def getDeviceTopic(attrib, is_request=False):
         if is_request:
@@ -4,128 +4,332 @@ Created on 2018-09-21
 @author: Kevin Köck
 '''
 
-__version__ = "0.6"
-__updated__ = "2018-09-27"
+__version__ = "1.4"
+__updated__ = "2026-10-18"
+
+"""
+Receives the configuration of components from the server.
+If the device has a filesystem, the MQTTHandler boots the local configuration in parallel so the device
+starts working with its last known configuration immediately. A received configuration is only saved
+after the local boot finished. If it differs from the local one, the device is reset to boot it.
+Login requests are repeated with exponential backoff: the first answer is awaited
+MQTT_RECEIVE_CONFIG_TIMEOUT seconds (default 10), doubling after every unanswered request up to
+MQTT_RECEIVE_CONFIG_BACKOFF_MAX seconds (default 600). Once a local configuration is running,
+no more requests are sent after 3 unanswered ones.
+
+If MQTT_RECEIVE_CONFIG_CHUNKED is enabled, the login request announces that the configuration can be
+received in chunks, one message per component, so the size of the configuration is not limited by the RAM:
+{"seq": <n>, "name": <component name>, "component": {component configuration}} for every component,
+followed by the manifest {"seq": <n>, "_order": [component names], "count": <amount of components>}.
+The sequence number starts at 0 and is increased with every message. Changed components are written to
+components/<name>.json.new as they arrive (or collected if there is no filesystem). After the manifest
+has been verified, the files replace the stored components. A transfer with a missing message is
+discarded and requested again. While chunks arrive, the timeout is extended and no new login request
+is sent, as it would restart the transfer.
+"""
 
 import uasyncio as asyncio
-import time
 import json
+from pysmartnode.utils.event import Event
 
 _mqtt = None
 _log = None
-
-_awaiting_config = False
-_has_failed = False
-_has_succeeded = False
-_config = None
 _pyconfig = None
+_received = None  # Event, value is the received configuration or True if the local one is up to date
+_ATTEMPTS = 3
+_fs = False  # filesystem available
+_chunks = None  # chunked transfer: names of received components or dict of components without filesystem
+_chunks_changed = False
+_seq = 0
+_accepted = 0  # accepted chunks, a transfer is in progress as long as this increases
 
 
-async def requestConfig(config, mqtt, log):
-    global _log
+async def receiveConfig(config, mqtt, log, local=None):
+    """
+    Requests the configuration until one is registered or running.
+    local: Event set when the local configuration has been booted, value is the result of loadComponentsFile()
+    """
+    global _log, _mqtt, _pyconfig, _received, _fs, _chunks
     _log = log
-    global _mqtt
     _mqtt = mqtt
-    global _pyconfig
     _pyconfig = config
-    if _awaiting_config:
-        return
-    asyncio.get_event_loop().create_task(_receiveConfig(log))
+    _received = Event()  # module might stay loaded between requests
+    _chunks = None
+    from pysmartnode.utils import sys_vars
+    _fs = sys_vars.hasFilesystem()
+    timeout = _option("MQTT_RECEIVE_CONFIG_TIMEOUT", 10)
+    backoff_max = _option("MQTT_RECEIVE_CONFIG_BACKOFF_MAX", 600)
+    topic = "{!s}/login/{!s}".format(_mqtt.mqtt_home, _mqtt.client_id)
+    log.info("Receiving config", local_only=True)
+    await _mqtt.subscribe(topic, _awaitConfig, qos=1, check_retained_state_topic=False)
+    attempts = 0
+    while not _received.is_set():
+        log.debug("waiting for config", local_only=True)
+        if _sendHash() or _chunked():
+            msg = {"version": _pyconfig.VERSION}
+            if _sendHash():
+                msg["hash"] = _localHash()
+            if _chunked():
+                msg["chunked"] = True
+        else:
+            msg = _pyconfig.VERSION
+        await _mqtt.publish(topic + "/set", msg, qos=1)
+        del msg
+        if await _wait(timeout):
+            break
+        attempts += 1
+        timeout = min(timeout * 2, backoff_max)
+        if attempts >= _ATTEMPTS:
+            if local is None:
+                if await _bootLocal():  # no filesystem, components.py
+                    break
+            elif local.is_set() and local.value() is True:
+                break
+    await _mqtt.unsubscribe(topic, _awaitConfig)
+    result = _received.value()
+    _received = None
+    if type(result) != list:
+        _discardChunks()
+    if local is not None:
+        await local  # the local configuration might still be loading from the files
+    if result is None:
+        if local is not None:
+            log.info("No config received, using local configuration", local_only=True)
+    elif result is True:
+        log.info("Local configuration is up to date", local_only=True)
+        if local is not None and local.value() is not True:
+            log.error("Local configuration could not be loaded")
+    else:
+        log.info("Building components", local_only=True)
+        if type(result) == list:  # chunked transfer, components are stored in files
+            changed = _commitChunks(result)
+            result = None
+        else:
+            log.info("received config: {!s}".format(result), local_only=True)
+            changed = _saveComponentsFile(result)
+        if not changed:
+            log.debug("Stored configuration unchanged", local_only=True)
+        elif _fs:
+            _removeCache()  # modification times are not reliable without a synchronized clock
+        h = _localHash() if _sendHash() else None
+        if h is not None:
+            # hash of the saved configuration, the server answers "UNCHANGED" if the login contains it
+            await _mqtt.publish(_mqtt.getDeviceTopic("config_hash"), h, qos=1, retain=True)
+        del h
+        if local is None or local.value() is not True:
+            _register(result)
+        elif changed:
+            log.info("Received configuration differs from local one, resetting")
+            await asyncio.sleep(2)  # give the log some time to be published
+            import machine
+            machine.reset()
+
+
+async def _wait(timeout):
+    """waits for the configuration, returns False if no chunk was accepted within timeout"""
     while True:
-        await asyncio.sleep_ms(200)
-        if _has_failed:
-            return False
-        elif _has_succeeded:
-            global _config
-            tmp = _config
-            del _config
-            return tmp
+        accepted = _accepted
+        try:
+            await asyncio.wait_for(_received, timeout)
+            return True
+        except asyncio.TimeoutError:
+            if _chunks is None or _accepted == accepted:
+                return False
+
+
+async def _bootLocal():
+    _log.info("Using local components.json/py", local_only=True)
+    return await _pyconfig.loadComponentsFile() is True
+
+
+def _register(components):
+    """components: dict of components or None if they are stored in files"""
+    from sys import platform
+    loop = asyncio.get_event_loop()
+    if components is None or platform == "esp8266" and _fs:
+        # on esp8266 components are split in small files and loaded after each other
+        # to keep RAM requirements low, only if filesystem is enabled
+        loop.create_task(_pyconfig.loadComponentsFile())
+    else:
+        # components are registered directly but async to let logs run between registrations
+        loop.create_task(_pyconfig.registerComponentsAsync(components))
 
 
 async def _awaitConfig(topic, msg, retain):
-    _log.info("Building components", local_only=True)
-    await _mqtt.unsubscribe("{!s}/login/".format(_mqtt.mqtt_home) + _mqtt.client_id)
-    if type(msg) != dict:
-        _log.critical("Received config is no dict")
-        msg = None
-    if msg is None:
-        _log.error("Empty configuration received")
-        global _has_failed
-        _has_failed = True
+    if _received is None or _received.is_set():
         return
+    if msg == "UNCHANGED":
+        _received.set(True)
+    elif msg is None:
+        _log.error("Empty configuration received")
+    elif type(msg) != dict:
+        _log.critical("Received config is no dict")
+    elif "seq" in msg:
+        _chunk(msg)
     else:
-        _log.info("received config: {!s}".format(msg), local_only=True)
-        # saving components
-        _saveComponentsFile(msg)
-        global _config
-        _config = json.dumps(msg)
-        global _has_succeeded
-        _has_succeeded = True
+        _received.set(msg)
+
+
+def _chunk(msg):
+    global _chunks, _chunks_changed, _seq, _accepted
+    if msg["seq"] == 0:
+        _discardChunks()  # a new transfer started
+        _chunks = {} if not _fs else []
+        _chunks_changed = False
+        _seq = 0
+        if _fs:
+            import os
+            try:
+                os.mkdir("components")
+            except OSError:
+                pass  # probably already there
+    if _chunks is None or msg["seq"] < _seq:
+        return  # duplicate or rest of a discarded transfer
+    if msg["seq"] > _seq:
+        _log.error("Config chunk {!s} missing, discarding transfer".format(_seq))
+        _discardChunks()
+        return
+    _seq += 1
+    _accepted += 1
+    if "_order" in msg:
+        if msg.get("count") != len(_chunks) or any(name not in _chunks for name in msg["_order"]):
+            _log.error("Chunked config incomplete, discarding transfer")
+            _discardChunks()
+        elif _fs:
+            _received.set(msg["_order"])
+        else:
+            _chunks["_order"] = msg["_order"]
+            _received.set(_chunks)
         return
+    name = msg["name"]
+    if not _fs:
+        _chunks[name] = msg["component"]
+        return
+    _chunks.append(name)
+    path = "components/{!s}.json".format(name)
+    content = json.dumps(msg["component"])
+    del msg
+    from pysmartnode.utils.files import sameContent
+    if not sameContent(path, content):
+        # not replacing the stored component yet as the local configuration might be loading
+        with open(path + ".new", "w") as f:
+            f.write(content)
+        _chunks_changed = True
 
 
-async def _receiveConfig(log):
-    global _awaiting_config
-    global _has_failed
-    _awaiting_config = True
-    log.info("Receiving config", local_only=True)
-    for i in range(1, 4):
-        await _mqtt.subscribe("{!s}/login/{!s}".format(_mqtt.mqtt_home, _mqtt.client_id), _awaitConfig, qos=1,
-                              check_retained_state_topic=False)
-        log.debug("waiting for config", local_only=True)
-        await _mqtt.publish("{!s}/login/{!s}/set".format(_mqtt.mqtt_home, _mqtt.client_id), _pyconfig.VERSION, qos=1)
-        t = time.ticks_ms()
-        while (time.ticks_ms() - t) < 10000:
-            if not _has_succeeded:
-                await asyncio.sleep_ms(200)
-            else:
-                _awaiting_config = False
-                return
-        await _mqtt.unsubscribe("{!s}/login/{!s}".format(_mqtt.mqtt_home, _mqtt.client_id))
-        # unsubscribing before resubscribing as otherwise it would result in multiple callbacks
-        # because mqttHandler and subscriptionHandler do not check if function already subscribed.
-    _has_failed = True
-    _awaiting_config = False
-    return
+def _discardChunks():
+    global _chunks
+    if _fs and _chunks:
+        import os
+        for name in _chunks:
+            try:
+                os.remove("components/{!s}.json.new".format(name))
+            except OSError:
+                pass
+    _chunks = None
+
+
+def _commitChunks(order):
+    """replaces the stored components by the received ones, returns True if the configuration changed"""
+    global _chunks
+    from pysmartnode.utils.files import rename
+    changed = _chunks_changed
+    for name in _chunks:
+        path = "components/{!s}.json".format(name)
+        try:
+            rename(path + ".new", path)
+        except OSError:
+            pass  # component unchanged
+    if _finishSplit(_chunks, order):
+        changed = True
+    _chunks = None
+    return changed
+
+
+def _chunked():
+    return hasattr(_pyconfig, "MQTT_RECEIVE_CONFIG_CHUNKED") and _pyconfig.MQTT_RECEIVE_CONFIG_CHUNKED
+
+
+def _option(name, default):
+    return getattr(_pyconfig, name) if hasattr(_pyconfig, name) else default
+
+
+def _sendHash():
+    return hasattr(_pyconfig, "MQTT_RECEIVE_CONFIG_HASH") and _pyconfig.MQTT_RECEIVE_CONFIG_HASH
+
+
+def _localHash():
+    from pysmartnode.utils import sys_vars
+    if not sys_vars.hasFilesystem():
+        return None
+    from pysmartnode.utils import transient
+    try:
+        return transient.acquire("pysmartnode.utils.componentsCache").localHash()
+    finally:
+        transient.release("pysmartnode.utils.componentsCache")
+
+
+def _removeCache():
+    from pysmartnode.utils import transient
+    try:
+        transient.acquire("pysmartnode.utils.componentsCache").remove()
+    finally:
+        transient.release("pysmartnode.utils.componentsCache")
 
 
 def _saveComponentsFile(msg):
+    """
+    Only writes added or changed components and removes deleted ones.
+    Returns True if the stored configuration changed.
+    """
     from pysmartnode.utils import sys_vars
     from sys import platform
     import os
     import gc
     if not sys_vars.hasFilesystem():
         _log.debug("Not saving components as filesystem is unavailable", local_only=True)
-        return
+        return False
+    from pysmartnode.utils.files import writeChanged
+    changed = False
     if platform == "esp8266":
-        tmp = json.dumps(msg["_order"])
-        f = open("_order.json", "w")
-        f.write(tmp)
-        f.close()
-        del tmp
         try:
             os.mkdir("components")
         except Exception as e:
-            # probably already there
-            f = os.listdir("components")
-            for file in f:
-                os.remove("components/" + file)
-            del f
-            gc.collect()
+            pass  # probably already there
         for component in msg:
             if component != "_order":
                 try:
-                    f = open("components/{!s}.json".format(component), "w")
-                    f.write(json.dumps(msg[component]))
-                    f.close()
+                    if writeChanged("components/{!s}.json".format(component), json.dumps(msg[component])):
+                        changed = True
                 except Exception as e:
                     _log.error("Can't save component {!s}, {!s}".format(component, e))
+                gc.collect()
+        if _finishSplit(msg, msg["_order"]):
+            changed = True
+    else:
+        if writeChanged("components.json", json.dumps(msg)):
+            changed = True
+    gc.collect()
+    return changed
+
+
+def _finishSplit(names, order):
+    """
+    Writes _order.json and removes all component files not in names.
+    Returns True if files changed.
+    """
+    import os
+    from pysmartnode.utils.files import writeChanged
+    changed = writeChanged("_order.json", json.dumps(order))
+    # removing components after _order.json does not reference them anymore
+    for file in os.listdir("components"):
+        if file.endswith(".tmp") or file.endswith(".new") or file[:-5] not in names:
+            os.remove("components/" + file)
+            changed = True
+    for file in ("components.json", "components.json.z"):
         try:
-            os.remove("components.json")
+            os.remove(file)
+            changed = True
         except Exception as e:
             pass
-    else:
-        tmp = json.dumps(msg)
-        f = open("components.json", "w")
-        f.write(tmp)
-        f.close()
+    return changed
@@ -0,0 +1,93 @@
+'''
+Created on 2026-10-18
+
+@author: Kevin Köck
+'''
+
+__version__ = "0.4"
+__updated__ = "2026-10-18"
+
+"""
+Boot profiler, only imported if BOOT_PROFILE = True in config.py.
+Records for every registered component the time needed to import its package, to create the object
+and to call its init_function, and how much the free heap and the largest free block changed.
+The load/unload statistics of transient modules (pysmartnode/utils/transient.py) are included.
+The report is published once per boot to <home>/<device-id>/boot_profile as a compact json:
+{"c": {component: [import ms, constructor ms, init ms, heap delta B, largest block delta B, start ms], ...},
+ "t": {module: [loads, load ms, unload ms], ...}, "w": [wifi start ms, wifi connected ms],
+ "f": free heap, "b": largest free block}
+Negative deltas mean RAM was used by the component.
+The largest free block is only measured if BOOT_PROFILE_BLOCKS = True as the measurement needs many
+allocations and collections per component, otherwise it is null.
+Start times are ms after boot and show the boot timeline, e.g. which components were registered
+while the wifi was still connecting.
+"""
+
+import gc
+import time
+from pysmartnode import config
+
+_BLOCKS = hasattr(config, "BOOT_PROFILE_BLOCKS") and config.BOOT_PROFILE_BLOCKS
+_components = {}
+_wifi = None
+_published = False
+
+
+def largestFreeBlock():
+    """returns the largest allocatable block in bytes by binary search, takes a few ms"""
+    gc.collect()
+    lo = 0
+    hi = gc.mem_free()
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        try:
+            b = bytearray(mid)
+            del b
+            gc.collect()  # freed memory is only available again after collection
+            lo = mid
+        except MemoryError:
+            hi = mid - 1
+    gc.collect()
+    return lo
+
+
+def snapshot():
+    """returns (ticks_ms, free heap, largest free block), ticks are taken after measuring the RAM"""
+    gc.collect()
+    free = gc.mem_free()
+    block = largestFreeBlock() if _BLOCKS else None
+    return time.ticks_ms(), free, block
+
+
+def elapsed(t):
+    return time.ticks_diff(time.ticks_ms(), t)
+
+
+def component(name, start, t_import, t_ctor, t_init):
+    """start: snapshot() taken before importing the component's package"""
+    gc.collect()
+    _components[name] = [t_import, t_ctor, t_init, gc.mem_free() - start[1],
+                         largestFreeBlock() - start[2] if _BLOCKS else None, start[0]]
+
+
+def wifi(started, connected):
+    """ticks_ms when connecting to the wifi started and when it was connected"""
+    global _wifi
+    _wifi = [started, connected]
+
+
+async def publish():
+    global _published
+    if _published:
+        return
+    _published = True
+    from pysmartnode.utils import transient
+    import json
+    await config.wifiConnected  # report includes the wifi connection time
+    gc.collect()
+    msg = json.dumps({"c": _components, "t": transient.stats(), "w": _wifi, "f": gc.mem_free(),
+                      "b": largestFreeBlock() if _BLOCKS else None})
+    _components.clear()
+    gc.collect()
+    mqtt = config.getMQTT()
+    await mqtt.publish(mqtt.getDeviceTopic("boot_profile"), msg, qos=1, retain=True)
@@ -0,0 +1,244 @@
+'''
+Created on 2026-10-18
+
+@author: Kevin Köck
+'''
+
+__version__ = "0.4"
+__updated__ = "2026-10-18"
+
+"""
+Binary cache of the local component configuration, so the json files don't have to be parsed on every boot.
+The cache is written after the configuration has been loaded successfully and contains the components
+in the order they were registered (dependencies resolved) with the package already resolved.
+It is only used if the content of the json files it was created from is unchanged, they are hashed in small
+chunks which is much faster and needs less RAM than parsing them. If name, size or modification time of the
+json files changed, the cache is rejected without hashing them. An unchanged size and modification time is not
+trusted as the modification time is not reliable without a synchronized clock.
+
+File format (components.bin):
+header: b"PSNC", version byte, sha256 of name, size and mtime of the source files (32B),
+        sha256 of the content of the source files (32B, also used as the hash of the local configuration)
+records: length (2B), name, component dict
+values are stored with a 1B type tag:
+s: str (2B length), i: int (4B), f: float (8B), T/F: bool, N: None, l: list (2B count, values),
+d: dict (2B count, key and value pairs), j: any other value as json string (2B length)
+"""
+
+import gc
+import os
+import json
+import ustruct
+import uhashlib
+import ubinascii
+
+CACHE_FILE = "components.bin"
+_TMP_FILE = "components.bin.tmp"
+_MAGIC = b"PSNC\x02"
+_CHUNK = 256
+
+
+def sourceHash(files):
+    """returns the sha256 of the content of all files, None if a file can't be read"""
+    h = uhashlib.sha256()
+    try:
+        for file in files:
+            with open(file, "rb") as f:
+                while True:
+                    b = f.read(_CHUNK)
+                    if not b:
+                        break
+                    h.update(b)
+                    del b
+    except OSError:
+        return None
+    return h.digest()
+
+
+def sourceKey(files):
+    """returns the sha256 of name, size and modification time of all files, None if a file is missing"""
+    h = uhashlib.sha256()
+    try:
+        for file in files:
+            st = os.stat(file)
+            h.update("{!s}:{!s}:{!s};".format(file, st[6], st[8]).encode())
+    except OSError:
+        return None
+    return h.digest()
+
+
+def sources():
+    """returns the list of json files of the local configuration in the order they are used, None if there are none"""
+    for file in ("components.json", "components.json.z"):
+        try:
+            os.stat(file)
+            return [file]
+        except OSError:
+            pass
+    try:
+        with open("_order.json", "r") as f:
+            order = json.loads(f.read())
+    except Exception:
+        return None
+    return ["_order.json"] + ["components/{!s}.json".format(c) for c in order]
+
+
+def localHash():
+    """returns the sha256 of the local json configuration as hex string or None if there is none"""
+    files = sources()
+    if files is None:
+        return None
+    digest = sourceHash(files)
+    return ubinascii.hexlify(digest).decode() if digest is not None else None
+
+
+def remove():
+    """removes the cache, e.g. because the json files were replaced"""
+    try:
+        os.remove(CACHE_FILE)
+    except OSError:
+        pass
+
+
+def read(key, files):
+    """
+    Generator returning (name, component dict) of every cached component.
+    Returns without any component if the cache does not exist or is outdated.
+    key: sourceKey() of the files, files: json files of the configuration
+    """
+    try:
+        f = open(CACHE_FILE, "rb")
+    except OSError:
+        return
+    try:
+        if f.read(len(_MAGIC)) != _MAGIC or f.read(32) != key:
+            return  # files changed, no need to hash them
+        if f.read(32) != sourceHash(files):
+            return
+        while True:
+            b = f.read(2)
+            if len(b) < 2:
+                return
+            length = ustruct.unpack("<H", b)[0]
+            record = f.read(length)
+            if len(record) != length:
+                raise ValueError("truncated record")
+            name, i = _decode(record, 0)
+            component, i = _decode(record, i)
+            del record
+            gc.collect()
+            yield name, component
+    finally:
+        f.close()
+
+
+def _decode(b, i):
+    """returns the value starting at position i of b and the position after it"""
+    t = b[i:i + 1]
+    i += 1
+    if t == b"s" or t == b"j":
+        l = ustruct.unpack_from("<H", b, i)[0]
+        v = b[i + 2:i + 2 + l].decode()
+        return (v if t == b"s" else json.loads(v)), i + 2 + l
+    if t == b"i":
+        return ustruct.unpack_from("<i", b, i)[0], i + 4
+    if t == b"f":
+        return ustruct.unpack_from("<d", b, i)[0], i + 8
+    if t == b"T":
+        return True, i
+    if t == b"F":
+        return False, i
+    if t == b"N":
+        return None, i
+    if t == b"l" or t == b"d":
+        n = ustruct.unpack_from("<H", b, i)[0]
+        i += 2
+        if t == b"l":
+            v = []
+            for _ in range(n):
+                item, i = _decode(b, i)
+                v.append(item)
+        else:
+            v = {}
+            for _ in range(n):
+                key, i = _decode(b, i)
+                v[key], i = _decode(b, i)
+        return v, i
+    raise ValueError("unknown type {!s}".format(t))
+
+
+def _encode(buf, v):
+    """appends the value v to the bytearray buf"""
+    t = type(v)
+    if t == str:
+        b = v.encode()
+        buf.extend(b"s")
+        buf.extend(ustruct.pack("<H", len(b)))
+        buf.extend(b)
+    elif t == bool:
+        buf.extend(b"T" if v else b"F")
+    elif t == int and -0x80000000 <= v <= 0x7fffffff:
+        buf.extend(b"i")
+        buf.extend(ustruct.pack("<i", v))
+    elif t == float:
+        buf.extend(b"f")
+        buf.extend(ustruct.pack("<d", v))
+    elif v is None:
+        buf.extend(b"N")
+    elif t == list or t == tuple:
+        buf.extend(b"l")
+        buf.extend(ustruct.pack("<H", len(v)))
+        for item in v:
+            _encode(buf, item)
+    elif t == dict:
+        buf.extend(b"d")
+        buf.extend(ustruct.pack("<H", len(v)))
+        for key in v:
+            _encode(buf, key)
+            _encode(buf, v[key])
+    else:
+        b = json.dumps(v).encode()
+        buf.extend(b"j")
+        buf.extend(ustruct.pack("<H", len(b)))
+        buf.extend(b)
+
+
+class Writer:
+    """
+    Writes the cache record by record to a temporary file, replacing the cache on close().
+    files: json files of the configuration, their content is hashed once for localHash()
+    """
+
+    def __init__(self, key, files):
+        digest = sourceHash(files)
+        if digest is None:
+            raise OSError("source files not readable")
+        self._f = open(_TMP_FILE, "wb")
+        self._f.write(_MAGIC)
+        self._f.write(key)
+        self._f.write(digest)
+
+    def write(self, name, component):
+        package = component["package"]
+        if package.startswith("."):
+            package = "pysmartnode.components" + package
+        resolved = {}
+        for key in component:
+            resolved[key] = component[key]
+        resolved["package"] = package
+        buf = bytearray()
+        _encode(buf, name)
+        _encode(buf, resolved)
+        del resolved
+        if len(buf) > 0xffff:
+            raise ValueError("component too big for cache")
+        self._f.write(ustruct.pack("<H", len(buf)))
+        self._f.write(buf)
+
+    def close(self, success=True):
+        self._f.close()
+        if success:
+            remove()
+            os.rename(_TMP_FILE, CACHE_FILE)
+        else:
+            os.remove(_TMP_FILE)
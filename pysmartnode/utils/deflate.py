@@ -0,0 +1,43 @@
+'''
+Created on 2026-10-18
+
+@author: Kevin Köck
+'''
+
+__version__ = "0.2"
+__updated__ = "2026-10-18"
+
+"""
+Decompression of deflate (zlib) compressed configurations and mqtt payloads using uzlib.
+The data is decompressed as a stream directly into the json parser, so the decompressed text
+is never completely in RAM. The decompressor allocates a window of the size stated in the
+zlib header, so compress with a small window (tools/compress_config.py uses 1kB).
+"""
+
+import json
+import uzlib
+import uio
+
+
+def isCompressed(data):
+    """True if bytes data start with a valid zlib header"""
+    return len(data) > 2 and data[0] & 0x0F == 8 and data[0] >> 4 <= 7 and not data[1] & 0x20 and (
+            data[0] * 256 + data[1]) % 31 == 0
+
+
+def stream(f):
+    """returns a stream of the decompressed data of a compressed stream, e.g. for jsonStream.items()"""
+    return uzlib.DecompIO(f)
+
+
+def load(stream):
+    """returns the json object of a compressed stream, e.g. a file opened in binary mode"""
+    return json.load(uzlib.DecompIO(stream))
+
+
+def loads(data):
+    """decompresses bytes data, returns the json object or the text if it is no json"""
+    try:
+        return load(uio.BytesIO(data))
+    except ValueError:
+        return uzlib.decompress(data).decode()
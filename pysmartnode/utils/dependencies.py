@@ -0,0 +1,58 @@
+'''
+Created on 2026-10-18
+
+@author: Kevin Köck
+'''
+
+__version__ = "0.2"
+__updated__ = "2026-10-18"
+
+"""
+Dependencies between components, used to register components after the components they reference.
+"""
+
+
+def dependencies(component, names):
+    """
+    returns the names of components in names referenced by constructor_args or init_args.
+    If names is None, every string argument is returned as possible reference.
+    """
+    deps = []
+    if type(component) != dict:
+        return deps
+    for key in ("constructor_args", "init_args"):
+        args = component[key] if key in component else None
+        if type(args) == dict:
+            args = args.values()
+        elif type(args) != list:
+            continue
+        for arg in args:
+            if type(arg) == str and (names is None or arg in names) and arg not in deps:
+                deps.append(arg)
+    return deps
+
+
+def resolveOrder(order, deps, _log):
+    """
+    Sorts order so that every component is registered after the components it references.
+    Components keep their position in order if their dependencies are already before them.
+    deps: dict of component name: list of names returned by dependencies()
+    """
+    pending = [c for c in order]
+    order = []
+    while pending:
+        ready = None
+        for c in pending:
+            for dep in deps[c]:
+                if dep in pending and dep != c:
+                    break
+            else:
+                ready = c
+                break
+        if ready is None:
+            _log.error("Circular dependency in components {!s}, using _order".format(pending))
+            order += pending
+            break
+        pending.remove(ready)
+        order.append(ready)
+    return order
@@ -4,16 +4,27 @@ Created on 10.08.2017
 @author: Kevin Kck
 '''
 
-__updated__ = "2018-07-14"
+__updated__ = "2026-10-18"
+__version__ = "1.1"
 
+"""
+Event waiting without polling: a waiting task is parked outside the runq and waitq of the
+uasyncio loop and only scheduled again when the event is set. It can be used with asyncio.wait_for
+and the waiting task can be cancelled, both wake the parked task with the exception.
+set() must not be called from an interrupt, use irq_set() instead.
+"""
+
+import micropython
 import uasyncio as asyncio
 
 
 class Event:
-    def __init__(self, poll_ms=20):
-        self.__poll_ms = poll_ms
+    def __init__(self, poll_ms=None):
+        """poll_ms: unused, waiting tasks are woken by set()"""
         self._flag = False
         self._data = None
+        self._waiting = []  # parked tasks
+        self._irq_set = self.set  # preallocated, creating a bound method in an interrupt allocates RAM
 
     def clear(self):
         self._flag = False
@@ -21,7 +32,27 @@ class Event:
 
     def __await__(self):
         while self._flag is not True:
-            yield from asyncio.sleep_ms(self.__poll_ms)
+            loop = asyncio.get_event_loop()
+            task = loop.cur_task
+            self._waiting.append(task)
+            loop.call_soon(self._park, task)
+            try:
+                yield False  # loop does not reschedule the task
+            except BaseException:  # timeout or cancelled
+                if task in self._waiting:
+                    self._waiting.remove(task)
+                raise
+
+    def _park(self, task):
+        # A generator can only be marked after it yielded, micropython resets the pending
+        # exception on every yield and pend_throw fails before the first yield of a task.
+        if task not in self._waiting:  # set() before the task was parked
+            asyncio.get_event_loop().call_soon(task)
+            return
+        prev = task.pend_throw(False)  # marks the task as parked, see asyncio.cancel
+        if prev is not None:  # timeout or cancellation before the task was parked
+            task.pend_throw(prev)
+            asyncio.get_event_loop().call_soon(task)
 
     __iter__ = __await__
 
@@ -31,6 +62,23 @@ class Event:
     def set(self, data=None):
         self._flag = True
         self._data = data
+        if self._waiting:
+            loop = asyncio.get_event_loop()
+            for task in self._waiting:
+                prev = task.pend_throw(None)
+                if prev is False:
+                    loop.call_soon(task)
+                elif prev is not None:  # already scheduled with a timeout or cancellation
+                    task.pend_throw(prev)
+                # None: not parked yet, _park schedules it
+            self._waiting = []
+
+    def irq_set(self, data=None):
+        """set() for interrupt handlers, the event is set as soon as the interpreter runs scheduled functions"""
+        try:
+            micropython.schedule(self._irq_set, data)
+        except RuntimeError:
+            pass  # schedule queue full
 
     def value(self):
         return self._data
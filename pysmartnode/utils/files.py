@@ -0,0 +1,64 @@
+'''
+Created on 2026-10-18
+
+@author: Kevin Köck
+'''
+
+__version__ = "0.2"
+__updated__ = "2026-10-18"
+
+"""
+Helpers for writing files with as little flash wear as possible.
+"""
+
+import os
+
+_CHUNK = 128
+
+
+def sameContent(path, content):
+    """compares the file with content (str or bytes) in small chunks, False if the file does not exist"""
+    if type(content) == str:
+        content = content.encode()
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return False
+    i = 0
+    try:
+        while True:
+            b = f.read(_CHUNK)
+            if not b:
+                return i == len(content)
+            if content[i:i + len(b)] != b:
+                return False
+            i += len(b)
+    finally:
+        f.close()
+
+
+def writeAtomic(path, content):
+    """writes content to a temporary file that replaces path once it is complete"""
+    tmp = path + ".tmp"
+    with open(tmp, "wb" if type(content) != str else "w") as f:
+        f.write(content)
+    rename(tmp, path)
+
+
+def rename(src, dst):
+    """renames src to dst, replacing dst if it exists"""
+    try:
+        os.rename(src, dst)
+    except OSError:
+        # some filesystems can't rename to an existing file
+        os.stat(src)  # raises OSError if src does not exist
+        os.remove(dst)
+        os.rename(src, dst)
+
+
+def writeChanged(path, content):
+    """writes content only if it differs from the file, returns True if the file was written"""
+    if sameContent(path, content):
+        return False
+    writeAtomic(path, content)
+    return True
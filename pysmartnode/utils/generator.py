@@ -0,0 +1,10 @@
+'''
+Created on 2026-10-18
+
+@author: Kevin Köck
+'''
+
+__version__ = "0.1"
+__updated__ = "2026-10-18"
+
+type_gen = type((lambda: (yield))())  # Generator type, also the type of coroutines in micropython
@@ -0,0 +1,95 @@
+'''
+Created on 2026-10-18
+
+@author: Kevin Köck
+'''
+
+__version__ = "0.1"
+__updated__ = "2026-10-18"
+
+"""
+Import tracer, only imported if IMPORT_TRACE = True in config.py.
+Replaces builtins.__import__ (needs a firmware built with MICROPY_CAN_OVERRIDE_BUILTINS) and records
+every module imported during boot with the time and RAM its import took, including its own imports.
+The trace ends with the first mqtt publish and is published once to <home>/<device-id>/import_trace
+as a compact json: {"i": [[module, depth, ms, heap delta B], ...], "p": ms from boot to the first publish}.
+The list is in import order, modules imported by a module follow it with a higher depth.
+Times do not include the garbage collections done by the tracer.
+"""
+
+import builtins
+import gc
+import sys
+import time
+
+_import = None
+_trace = []
+_depth = 0
+_gc_ms = 0  # time spent collecting garbage for the trace
+
+
+def install():
+    global _import
+    if _import is None:
+        _import = builtins.__import__
+        builtins.__import__ = _tracedImport
+
+
+def uninstall():
+    global _import
+    if _import is not None:
+        builtins.__import__ = _import
+        _import = None
+
+
+def _collect():
+    global _gc_ms
+    st = time.ticks_ms()
+    gc.collect()
+    _gc_ms += time.ticks_diff(time.ticks_ms(), st)
+
+
+def _tracedImport(name, globals=None, locals=None, fromlist=(), level=0):
+    global _depth
+    # "from package import module" imports the module by the fromlist
+    names = [name] + [name + "." + f for f in fromlist] if fromlist else [name]
+    new = [n for n in names if n not in sys.modules]
+    if not new or level:
+        return _import(name, globals, locals, fromlist, level)
+    entry = [name, _depth, 0, 0]
+    _trace.append(entry)
+    _collect()
+    mem = gc.mem_free()
+    gc_ms = _gc_ms
+    st = time.ticks_ms()
+    _depth += 1
+    try:
+        return _import(name, globals, locals, fromlist, level)
+    finally:
+        _depth -= 1
+        entry[2] = time.ticks_diff(time.ticks_ms(), st) - (_gc_ms - gc_ms)
+        _collect()
+        entry[3] = gc.mem_free() - mem
+        new = [n for n in new if n in sys.modules]
+        if new:
+            entry[0] = ",".join(new)
+        else:
+            _trace.remove(entry)  # not a module, e.g. a function imported from a package
+
+
+def trace():
+    """returns the recorded imports as list of [module, depth, ms, heap delta]"""
+    return _trace
+
+
+async def publish(first_publish):
+    """ends the trace and publishes it, first_publish: ms from boot to the first publish"""
+    global _trace
+    uninstall()
+    from pysmartnode import config
+    import json
+    msg = json.dumps({"i": _trace, "p": first_publish})
+    _trace = []
+    gc.collect()
+    mqtt = config.getMQTT()
+    await mqtt.publish(mqtt.getDeviceTopic("import_trace"), msg, qos=1, retain=True)
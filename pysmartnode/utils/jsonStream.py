@@ -0,0 +1,113 @@
+'''
+Created on 2026-10-18
+
+@author: Kevin Köck
+'''
+
+__version__ = "0.2"
+__updated__ = "2026-10-18"
+
+"""
+Incremental reading of a big json object from a file without loading the whole file.
+index() reads the file in small chunks and returns the position of the value of every top-level key,
+load() then parses a single value. Peak RAM is bounded by the biggest single value instead of the file size.
+items() parses the top-level values one after another from a stream that can't seek, e.g. a decompressor.
+"""
+
+import json
+from micropython import const
+
+_QUOTE = const(34)  # "
+_BACKSLASH = const(92)
+_COLON = const(58)
+_COMMA = const(44)
+_OPEN = (123, 91)  # { [
+_CLOSE = (125, 93)  # } ]
+
+
+def index(f, chunk=128):
+    """
+    f: file opened in binary mode
+    Returns dict of top-level key: (start, end) position of its value in the file.
+    """
+    idx = {}
+    for name, start, end, _ in _scan(f, chunk, False):
+        idx[name] = (start, end)
+    return idx
+
+
+def items(f, chunk=128):
+    """
+    f: stream returning bytes, only read() is used
+    Generator returning (key, parsed value) of every top-level key in the order of the stream.
+    """
+    for name, _, _, value in _scan(f, chunk, True):
+        yield name, json.loads(bytes(value).decode())
+
+
+def _scan(f, chunk, collect):
+    """
+    Generator returning (key, start, end, value) of every top-level key,
+    value is the text of the value as bytearray if collect is True, else None.
+    """
+    pos = 0
+    depth = 0
+    in_str = False
+    esc = False
+    key = None  # bytearray while reading a top-level key
+    name = None  # current top-level key
+    start = None  # start of the value of name
+    value = bytearray() if collect else None
+    while True:
+        b = f.read(chunk)
+        if not b:
+            break
+        for c in b:
+            end = False
+            if in_str:
+                if esc:
+                    esc = False
+                elif c == _BACKSLASH:
+                    esc = True
+                elif c == _QUOTE:
+                    in_str = False
+                    if key is not None:
+                        key.append(c)
+                        name = json.loads(bytes(key).decode())  # resolves escaped characters
+                        key = None
+                        pos += 1
+                        continue
+                if key is not None:
+                    key.append(c)
+            elif c == _QUOTE:
+                in_str = True
+                if depth == 1 and name is None:
+                    key = bytearray(b'"')
+            elif c in _OPEN:
+                depth += 1
+            elif c in _CLOSE:
+                depth -= 1
+                end = depth == 0 and start is not None
+            elif depth == 1:
+                if c == _COLON and name is not None and start is None:
+                    start = pos + 1
+                elif c == _COMMA and start is not None:
+                    end = True
+            if end:
+                yield name, start, pos, value
+                name = start = None
+                if collect:
+                    value = bytearray()
+            elif collect and start is not None and pos >= start:
+                value.append(c)
+            pos += 1
+        del b
+    if depth != 0 or in_str:
+        raise ValueError("Incomplete json object")
+
+
+def load(f, idx, key):
+    """parses the value of a top-level key using the index of index()"""
+    start, end = idx[key]
+    f.seek(start)
+    return json.loads(f.read(end - start).decode())
@@ -0,0 +1,155 @@
+'''
+Created on 2026-10-18
+
+@author: Kevin Köck
+'''
+
+__version__ = "0.4"
+__updated__ = "2026-10-18"
+
+"""
+Lazy components, configured with "lazy": true.
+Instead of the component a small stub is stored in config.COMPONENTS that keeps the component configuration.
+The component is imported and created on first access by config.getComponent() or,
+if "lazy_topic" is configured, when the first message on this topic is received.
+The stub stays subscribed until the created component subscribes to the same topic (subscriptions are
+usually done in tasks, at most 1 second is waited). Then the stub is unsubscribed and the messages it
+received meanwhile are passed to the callbacks the component subscribed to exactly this topic.
+Retained messages are not passed on, the component receives them from the broker when it subscribes.
+
+Only components with a synchronous constructor can be lazy. A coroutine returned by the init_function
+is started as a task, so it might not be finished when getComponent() returns.
+"""
+
+import gc
+import uasyncio as asyncio
+from pysmartnode import config
+from pysmartnode import logging
+from pysmartnode.utils.event import Event
+
+_log = logging.getLogger("lazy")
+
+_SUBSCRIBE_TIMEOUT = 1000  # ms to wait for the component to subscribe to lazy_topic
+_pending = {}  # lazy_topic: LazyComponent created but not yet subscribed to it
+_subscribe = None  # subscribe of the mqtt client
+
+
+async def _watchedSubscribe(topic, callback_coro, *args, **kwargs):
+    lazy = _pending.pop(topic, None)
+    if lazy is not None:
+        lazy._cbs.append(callback_coro)
+        lazy._ready.set()  # messages received by the stub from now on also reach the component
+    handle = await _subscribe(topic, callback_coro, *args, **kwargs)
+    if lazy is not None:
+        await lazy._unsubscribe()
+    return handle
+
+
+def _watch():
+    """replaces subscribe of the mqtt client to notice when a created component subscribes to its lazy_topic"""
+    global _subscribe
+    if _subscribe is None:
+        mqtt = config.getMQTT()
+        _subscribe = mqtt.subscribe
+        mqtt.subscribe = _watchedSubscribe
+
+
+class LazyComponent:
+    def __init__(self, name, component):
+        self._name = name
+        self._component = component
+        self._topic = component["lazy_topic"] if "lazy_topic" in component else None
+        self._handle = None
+        self._ready = None  # set when the created component subscribed to lazy_topic
+        self._cbs = None  # callbacks the created component subscribed to lazy_topic
+        if self._topic is not None:
+            asyncio.get_event_loop().create_task(self._subscribe())
+
+    async def _subscribe(self):
+        self._handle = await config.getMQTT().subscribe(self._topic, self._onMessage,
+                                                        check_retained_state_topic=False)
+
+    async def _unsubscribe(self):
+        if self._handle is not None:
+            handle = self._handle
+            self._handle = None
+            await config.getMQTT().unsubscribe(handle)
+
+    async def _onMessage(self, topic, msg, retain):
+        if self._ready is not None and self._ready.is_set():
+            return  # component already subscribed and receives the message itself
+        self.materialize()
+        if self._component is not None:  # creating the component failed
+            await self._unsubscribe()
+            return
+        try:
+            await asyncio.wait_for_ms(self._ready, _SUBSCRIBE_TIMEOUT)
+        except asyncio.TimeoutError:
+            if _pending.get(self._topic) is self:
+                del _pending[self._topic]
+                _log.warn("Lazy component {!r} did not subscribe to {!s}".format(self._name, self._topic))
+                await self._unsubscribe()
+            return
+        if not retain:
+            for cb in self._cbs:
+                await cb(topic, msg, retain)
+
+    def materialize(self):
+        """creates the component, replaces the stub in config.COMPONENTS and returns the component or None"""
+        if config.COMPONENTS.get(self._name) is not self:
+            return config.COMPONENTS.get(self._name)  # already created
+        component = self._component
+        gc.collect()
+        if self._topic is not None:
+            _watch()
+            self._ready = Event()
+            self._cbs = []
+            _pending[self._topic] = self
+        try:
+            module = __import__(component["package"], globals(), locals(), [component["component"]], 0)
+            obj = getattr(module, component["component"])
+            obj = obj(*_getArgs(component, "constructor_args"), **_getKwargs(component, "constructor_args"))
+            if type(obj) == type(config.registerComponentsAsync):
+                raise TypeError("asynchronous constructor not supported")
+            if "init_function" in component and component["init_function"] is not None:
+                res = getattr(obj, component["init_function"])(*_getArgs(component, "init_args"),
+                                                               **_getKwargs(component, "init_args"))
+                if type(res) == type(config.registerComponentsAsync):
+                    asyncio.get_event_loop().create_task(res)
+            if "call_function_regularly" in component and component["call_function_regularly"] is not None:
+                from pysmartnode.utils import scheduler
+                scheduler.add(getattr(obj, component["call_function_regularly"]),
+                              component["call_interval"] if "call_interval" in component
+                              else config.INTERVAL_SEND_SENSOR)
+        except Exception as e:
+            _log.error("Error creating lazy component {!r}: {!s}".format(self._name, e))
+            if _pending.get(self._topic) is self:
+                del _pending[self._topic]
+            return None
+        if obj is None:  # probably function, not class
+            del config.COMPONENTS[self._name]
+            _log.info("Started lazy component {!r} as service".format(self._name))
+        else:
+            config.COMPONENTS[self._name] = obj
+            _log.info("Created lazy component {!r}".format(self._name))
+        self._component = None
+        gc.collect()
+        return obj
+
+
+def _getArgs(component, key):
+    args = component[key] if key in component else None
+    if type(args) != list:
+        return []
+    return [config.getComponent(arg) if type(arg) == str and arg in config.COMPONENTS else arg for arg in args]
+
+
+def _getKwargs(component, key):
+    kwargs = component[key] if key in component else None
+    res = {}
+    if type(kwargs) != dict:
+        return res
+    for k in kwargs:
+        arg = kwargs[k]
+        res[k] = config.getComponent(arg) if type(arg) == str and arg in config.COMPONENTS else arg
+    return res
@@ -0,0 +1,192 @@
+'''
+Created on 2026-10-18
+
+@author: Kevin Köck
+'''
+
+__version__ = "0.4"
+__updated__ = "2026-10-18"
+
+"""
+Component lifecycle, only used if COMPONENT_LIFECYCLE = True in config.py.
+Tracks the tasks, subscriptions and scheduler jobs of every component so components can be stopped,
+started and replaced at runtime without rebooting.
+A task belongs to a component if it is created while the component is registered (constructor,
+init_function). Subscriptions and scheduler jobs belong to a component if they are added while
+the component is registered or by one of its tasks. Tasks created later by the component's tasks
+are not tracked as they are usually short-lived (e.g. publishing) and would only fill the RAM.
+
+Components are changed by publishing a json dictionary to <home>/<device-id>/components/set:
+{"<name>": {component configuration}} starts or replaces a component, {"<name>": null} stops it.
+Retained messages are ignored so a change is not applied again after a reboot.
+Change the stored configuration as well if the change should be permanent.
+
+Tracked tasks are removed from the component when they finish. Stopping a component wakes its cancelled
+tasks, so they end immediately, and waits for them before the component is started again.
+Tasks that did not run yet end when they run the first time.
+"""
+
+import time
+import uasyncio as asyncio
+from pysmartnode import config
+from pysmartnode import logging
+from pysmartnode.utils import scheduler
+
+_log = logging.getLogger("lifecycle")
+
+_components = {}  # name: [tasks, subscription handles, scheduler jobs, stopped]
+_current = None  # (name, task) of the component being registered
+_create_task = None
+_subscribe = None
+_schedule = None
+_STOP_TIMEOUT = 1000  # ms to wait for the cancelled tasks of a component
+
+
+def _registering():
+    """returns the name of the component being registered if called by the registering task"""
+    if _current is not None and asyncio.get_event_loop().cur_task is _current[1]:
+        return _current[0]
+    return None
+
+
+def _owner():
+    name = _registering()
+    if name is not None:
+        return name
+    cur = asyncio.get_event_loop().cur_task
+    for name in _components:
+        if cur in _components[name][0]:
+            return name
+    return None
+
+
+def _add(name, index, obj):
+    if name not in _components:
+        _components[name] = [[], [], [], False]
+    _components[name][index].append(obj)
+
+
+def _trackedCreateTask(coro):
+    name = _registering()
+    if name is not None:
+        _add(name, 0, None)
+        component = _components[name]
+        coro = _run(coro, component)
+        component[0][-1] = coro
+    _create_task(coro)
+
+
+async def _run(coro, component):
+    """runs a task of a component and removes it from the tracked tasks when it is finished"""
+    tasks = component[0]
+    try:
+        if component[3]:
+            return  # component stopped before the task ran, it can't be cancelled before its first yield
+        await coro
+    finally:
+        task = asyncio.get_event_loop().cur_task
+        if task in tasks:
+            tasks.remove(task)
+
+
+async def _trackedSubscribe(topic, callback_coro, *args, **kwargs):
+    name = _owner()
+    handle = await _subscribe(topic, callback_coro, *args, **kwargs)
+    if name is not None and type(handle) == tuple:
+        _add(name, 1, handle)
+    return handle
+
+
+def _trackedSchedule(func, interval, phase=0):
+    name = _owner()
+    job = _schedule(func, interval, phase)
+    if name is not None:
+        _add(name, 2, job)
+    return job
+
+
+def install():
+    global _create_task, _subscribe, _schedule
+    if _create_task is not None:
+        return
+    loop = asyncio.get_event_loop()
+    _create_task = loop.create_task
+    loop.create_task = _trackedCreateTask
+    _schedule = scheduler.add
+    scheduler.add = _trackedSchedule
+    mqtt = config.getMQTT()
+    _subscribe = mqtt.subscribe
+    mqtt.subscribe = _trackedSubscribe
+    mqtt.scheduleSubscribe(mqtt.getDeviceTopic("components", is_request=True), _changeComponents,
+                           check_retained_state_topic=False)
+
+
+def begin(name):
+    """called by registerComponents before a component is created"""
+    global _current
+    _current = (name, asyncio.get_event_loop().cur_task)
+
+
+def end():
+    global _current
+    _current = None
+
+
+async def stop(name):
+    """cancels all tasks, subscriptions and scheduler jobs of a component and removes it"""
+    if name in _components:
+        component = _components.pop(name)
+        component[3] = True
+        tasks, handles, jobs, _ = component
+        for job in jobs:
+            scheduler.remove(job)
+        loop = asyncio.get_event_loop()
+        for task in tasks:
+            try:
+                task.pend_throw(asyncio.CancelledError())
+            except Exception:
+                continue  # task did not run yet, it returns when it runs the first time
+            # also waking sleeping tasks, their remaining waitq entry resumes a finished task
+            loop.call_soon(task)
+        mqtt = config.getMQTT()
+        for handle in handles:
+            await mqtt.unsubscribe(handle)
+        st = time.ticks_ms()
+        while tasks and time.ticks_diff(time.ticks_ms(), st) < _STOP_TIMEOUT:
+            await asyncio.sleep_ms(0)  # the cancelled tasks remove themselves
+        if tasks:
+            _log.warn("{!s} tasks of component {!r} did not stop".format(len(tasks), name))
+    if name in config.COMPONENTS:
+        obj = config.COMPONENTS.pop(name)
+        if hasattr(obj, "deinit"):
+            try:
+                obj.deinit()
+            except Exception as e:
+                _log.error("Error in deinit of component {!r}: {!s}".format(name, e))
+    _log.info("Stopped component {!r}".format(name))
+
+
+async def start(name, component):
+    await config.registerComponentsAsync({"_order": [name], name: component})
+
+
+async def replace(name, component):
+    await stop(name)
+    await start(name, component)
+
+
+async def _changeComponents(topic, msg, retain):
+    if retain:
+        return
+    if type(msg) != dict:
+        _log.error("Component change is no dict: {!s}".format(msg))
+        return
+    for name in msg:
+        if name == "mqtt":
+            _log.error("Component mqtt can't be changed")
+        elif msg[name] is None:
+            await stop(name)
+        elif name in config.COMPONENTS or name in _components:
+            await replace(name, msg[name])
+        else:
+            await start(name, msg[name])
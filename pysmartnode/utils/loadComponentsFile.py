@@ -4,14 +4,14 @@ Created on 2018-09-25
 @author: Kevin Köck
 '''
 
-__version__ = "0.1"
-__updated__ = "2018-09-25"
+__version__ = "0.9"
+__updated__ = "2026-10-18"
 
 from pysmartnode.utils import sys_vars
 import json
-from sys import platform
 import gc
-import uasyncio as asyncio
+from pysmartnode.utils.pacing import pace
+from pysmartnode.utils import componentsCache
 
 
 def _importComponents(_log):
@@ -31,6 +31,87 @@ def _importComponents(_log):
         return True
 
 
+def _fileOrder(order, _log):
+    """
+    Returns the order of the component files with every component after the components it references.
+    Every file is parsed twice, here only its references are kept.
+    """
+    from pysmartnode.utils.dependencies import dependencies, resolveOrder
+    deps = {}
+    for component in order:
+        try:
+            with open("components/{!s}.json".format(component), "r") as f:
+                deps[component] = dependencies(json.loads(f.read()), order)
+        except Exception:
+            deps[component] = []  # error is logged when the component is loaded
+        gc.collect()
+    return resolveOrder(order, deps, _log)
+
+
+async def _loadCache(key, files, registerComponentsAsync, _log):
+    """
+    Registers all components of the binary cache.
+    Returns True if all were registered, False if the cache is not usable or if it failed partway,
+    the names of the components that were already registered.
+    """
+    if key is None:
+        return False
+    registered = []
+    try:
+        for name, component in componentsCache.read(key, files):
+            registered.append(name)
+            await registerComponentsAsync({"_order": [name], name: component})
+            del component
+            await pace()
+    except Exception as e:
+        _log.error("Error loading components cache, {!s}".format(e))
+        componentsCache.remove()
+        return registered or False
+    if registered:
+        _log.info("Loaded components from cache", local_only=True)
+        return True
+    return False
+
+
+def _cacheWriter(key, files, _log):
+    if key is None:
+        return None
+    try:
+        return componentsCache.Writer(key, files)
+    except Exception as e:
+        _log.error("Can't create components cache, {!s}".format(e))
+        return None
+
+
+def _cache(cache, name, component, _log):
+    """writes the component to the cache, returns None if the cache had to be discarded"""
+    if cache is None:
+        return None
+    try:
+        cache.write(name, component)
+        return cache
+    except Exception as e:
+        _log.error("Can't cache component {!s}, {!s}".format(name, e))
+        cache.close(success=False)
+        return None
+
+
+async def _register(name, component, skip, cache, registerComponentsAsync, _log):
+    """
+    Registers the component unless it is in skip (already registered from the cache) and caches it.
+    Returns the cache writer or None if the cache had to be discarded.
+    """
+    if name not in skip:
+        try:
+            await registerComponentsAsync({"_order": [name], name: component})
+        except Exception as e:
+            _log.error("Error loading component {!s}, {!s}".format(name, e))
+            if cache is not None:
+                cache.close(success=False)
+            return None
+    return _cache(cache, name, component, _log)
+
+
 async def loadComponentsFile(_log, registerComponentsAsync):
     if not sys_vars.hasFilesystem():
         comps = _importComponents(_log)
@@ -44,6 +125,13 @@ async def loadComponentsFile(_log, registerComponentsAsync):
     except OSError:
         components_found = False
     if components_found is False:
+        files = ["components.json.z"]
+        key = componentsCache.sourceKey(files)
+        if key is not None:
+            skip = await _loadCache(key, files, registerComponentsAsync, _log)
+            if skip is True:
+                return True
+            return await _loadCompressed(key, files, skip or (), registerComponentsAsync, _log)
         try:
             f = open("_order.json", "r")
         except Exception as e:
@@ -57,30 +145,148 @@ async def loadComponentsFile(_log, registerComponentsAsync):
         order = json.loads(f.read())
         f.close()
         gc.collect()
+        files = ["_order.json"] + ["components/{!s}.json".format(c) for c in order]
+        key = componentsCache.sourceKey(files)
+        skip = await _loadCache(key, files, registerComponentsAsync, _log)
+        if skip is True:
+            return True
+        skip = skip or ()
+        if len(order) > 1:
+            order = _fileOrder(order, _log)
+        cache = _cacheWriter(key, files, _log)
+        del files
         for component in order:
-            tmp = {"_order": [component]}
             try:
                 f = open("components/{!s}.json".format(component), "r")
-                tmp[component] = json.loads(f.read())
+                tmp = json.loads(f.read())
                 f.close()
-                await registerComponentsAsync(tmp)
             except Exception as e:
                 _log.error("Error loading component file {!s}, {!s}".format(component, e))
-            gc.collect()
-            if platform == "esp8266":
-                await asyncio.sleep(1)
-                # gives time to get retained topic and settle ram, important on esp8266
-            else:
-                await asyncio.sleep_ms(100)
-            gc.collect()
+                if cache is not None:
+                    cache.close(success=False)
+                    cache = None
+                continue
+            cache = await _register(component, tmp, skip, cache, registerComponentsAsync, _log)
+            del tmp
+            await pace()
+            # gives time to get retained topic and settle ram, important on esp8266
+        if cache is not None:
+            cache.close()
         return True
     else:
-        c = f.read()
         f.close()
+        files = ["components.json"]
+        key = componentsCache.sourceKey(files)
+        skip = await _loadCache(key, files, registerComponentsAsync, _log)
+        if skip is True:
+            return True
+        return await _loadStream(key, files, skip or (), registerComponentsAsync, _log)
+
+
+async def _loadStream(key, files, skip, registerComponentsAsync, _log):
+    """
+    Registers the components of components.json one by one without parsing the whole file,
+    so peak RAM is bounded by the biggest component.
+    skip: components already registered from the cache, they are only written to the new cache
+    """
+    from pysmartnode.utils import jsonStream
+    from pysmartnode.utils.dependencies import dependencies, resolveOrder
+    f = open("components.json", "rb")
+    try:
+        idx = jsonStream.index(f)
+        order = jsonStream.load(f, idx, "_order") if "_order" in idx else [c for c in idx]
+        deps = {}
+        for component in order:
+            deps[component] = dependencies(jsonStream.load(f, idx, component), order) if component in idx else []
+        gc.collect()
+        order = resolveOrder(order, deps, _log)
+        del deps
+    except Exception as e:
+        f.close()
+        _log.critical("components.json parsing error {!s}".format(e))
+        return False
+    cache = _cacheWriter(key, files, _log)
+    for component in order:
         try:
-            c = json.loads(c)
-            gc.collect()
-            return c
+            tmp = jsonStream.load(f, idx, component)
         except Exception as e:
-            _log.critical("components.json parsing error {!s}".format(e))
-            return False
+            _log.error("Error loading component {!s}, {!s}".format(component, e))
+            if cache is not None:
+                cache.close(success=False)
+                cache = None
+            continue
+        cache = await _register(component, tmp, skip, cache, registerComponentsAsync, _log)
+        del tmp
+        gc.collect()
+        await pace()
+    f.close()
+    if cache is not None:
+        cache.close()
+    return True
+
+
+async def _loadCompressed(key, files, skip, registerComponentsAsync, _log):
+    """
+    Registers the components of the deflate compressed components.json.z. The file is decompressed twice
+    as a stream into the json parser, first to resolve the dependencies, then to register the components
+    one by one. Peak RAM is bounded by the biggest component if the file is sorted by dependencies,
+    components needed later are kept until their turn.
+    skip: components already registered from the cache, they are only written to the new cache
+    """
+    from pysmartnode.utils import deflate
+    from pysmartnode.utils import jsonStream
+    from pysmartnode.utils.dependencies import dependencies, resolveOrder
+    order = None
+    deps = {}
+    try:
+        with open("components.json.z", "rb") as f:
+            for component, data in jsonStream.items(deflate.stream(f)):
+                if component == "_order":
+                    order = data
+                else:
+                    deps[component] = dependencies(data, None)  # every string might reference a component
+                del data
+                gc.collect()
+        if order is None:
+            order = [c for c in deps]
+        for component in order:
+            if component not in deps:
+                deps[component] = []
+        order = resolveOrder(order, deps, _log)
+        del deps
+    except Exception as e:
+        _log.critical("components.json.z parsing error {!s}".format(e))
+        return False
+    gc.collect()
+    cache = _cacheWriter(key, files, _log)
+    pending = {}
+    i = 0
+    try:
+        with open("components.json.z", "rb") as f:
+            for component, data in jsonStream.items(deflate.stream(f)):
+                if component != "_order" and component in order:
+                    pending[component] = data
+                del data
+                while i < len(order) and order[i] in pending:
+                    cache = await _register(order[i], pending.pop(order[i]), skip, cache, registerComponentsAsync,
+                                            _log)
+                    i += 1
+                    gc.collect()
+                    await pace()
+    except Exception as e:
+        _log.error("Error loading components.json.z, {!s}".format(e))
+        if cache is not None:
+            cache.close(success=False)
+            cache = None
+    for component in order[i:]:
+        if component in pending:
+            cache = await _register(component, pending.pop(component), skip, cache, registerComponentsAsync, _log)
+            await pace()
+        else:
+            _log.error("Error loading component {!s}, not in configuration".format(component))
+            if cache is not None:
+                cache.close(success=False)
+                cache = None
+    if cache is not None:
+        cache.close()
+    return True
@@ -0,0 +1,71 @@
+'''
+Created on 2026-10-18
+
+@author: Kevin Köck
+'''
+
+__version__ = "0.3"
+__updated__ = "2026-10-18"
+
+"""
+Pacing of the component registration. Instead of sleeping a fixed time after every component,
+pace() only waits while the free RAM is below a threshold or other tasks are waiting in the runq
+(e.g. retained messages of the last component being processed).
+The waiting time is capped so a low RAM situation can't stop the registration.
+
+Can be changed in config.py:
+REGISTER_MIN_FREE_RAM: free RAM needed to continue (default 10000 on esp8266, else 30000)
+REGISTER_MAX_RUNQ: amount of waiting tasks and callbacks tolerated (default 0)
+REGISTER_MAX_WAIT: maximum time in ms waited after a component (default 1000 on esp8266, else 200)
+"""
+
+import gc
+import time
+import uasyncio as asyncio
+from sys import platform
+from pysmartnode import config
+from pysmartnode.utils.generator import type_gen
+
+_MIN_FREE = config.REGISTER_MIN_FREE_RAM if hasattr(config, "REGISTER_MIN_FREE_RAM") else (
+    10000 if platform == "esp8266" else 30000)
+_MAX_RUNQ = config.REGISTER_MAX_RUNQ if hasattr(config, "REGISTER_MAX_RUNQ") else 0
+_MAX_WAIT = config.REGISTER_MAX_WAIT if hasattr(config, "REGISTER_MAX_WAIT") else (
+    1000 if platform == "esp8266" else 200)
+_STEP = 20
+
+
+def _waiting(runq):
+    """
+    Returns the amount of tasks and callbacks in the runq. A callback uses 2 entries (callback, args),
+    a task 1. The deque can't be iterated, so it is rotated once which keeps the order of the entries.
+    """
+    n = 0
+    i = len(runq)
+    while i:
+        entry = runq.popleft()
+        runq.append(entry)
+        i -= 1
+        if not isinstance(entry, type_gen):
+            runq.append(runq.popleft())  # args of the callback
+            i -= 1
+        n += 1
+    return n
+
+
+def _busy(loop):
+    return gc.mem_free() < _MIN_FREE or (len(loop.runq) > _MAX_RUNQ and _waiting(loop.runq) > _MAX_RUNQ)
+
+
+async def pace():
+    """
+    Yields at least once and waits while RAM is low or the runq is busy, at most REGISTER_MAX_WAIT ms.
+    Returns the time waited in ms.
+    """
+    loop = asyncio.get_event_loop()
+    st = time.ticks_ms()
+    await asyncio.sleep_ms(0)
+    gc.collect()
+    while _busy(loop) and time.ticks_diff(time.ticks_ms(), st) < _MAX_WAIT:
+        await asyncio.sleep_ms(_STEP)
+        gc.collect()
+    return time.ticks_diff(time.ticks_ms(), st)
@@ -1,7 +1,7 @@
 import gc
-import uasyncio as asyncio
-from sys import platform
+import time
 from pysmartnode import config
+from pysmartnode.utils.pacing import pace
 
 if config.DEBUG:
     def __printRAM(start, info=""):
@@ -9,6 +9,16 @@ if config.DEBUG:
 else:
     __printRAM = lambda *_: None
 
+if hasattr(config, "BOOT_PROFILE") and config.BOOT_PROFILE:
+    from pysmartnode.utils import bootProfile as _profile
+else:
+    _profile = None
+
+if hasattr(config, "COMPONENT_LIFECYCLE") and config.COMPONENT_LIFECYCLE:
+    from pysmartnode.utils import lifecycle as _lifecycle
+else:
+    _lifecycle = None
+
 
 def _checkArgs(d, _log):
     required = ("package", "component")
@@ -23,23 +33,20 @@ def _getKwargs(kwargs):
     if type(kwargs) != dict:
         return {}
     COMPONENTS = config.COMPONENTS
+    res = {}
     for key in kwargs:
         arg = kwargs[key]
-        if type(arg) == str:
-            if arg in COMPONENTS:
-                kwargs[key] = COMPONENTS[arg]
-    return kwargs
+        res[key] = config.getComponent(arg) if type(arg) == str and arg in COMPONENTS else arg
+    return res
 
 
 def _getArgs(args):
     if type(args) != list:
         return []
     COMPONENTS = config.COMPONENTS
-    for i in range(0, len(args)):
-        if type(args[i]) == str:
-            if args[i] in COMPONENTS:
-                args[i] = COMPONENTS[args[i]]
-    return args
+    # new list/dict so the configuration is not changed and can be cached,
+    # getComponent creates lazy components
+    return [config.getComponent(arg) if type(arg) == str and arg in COMPONENTS else arg for arg in args]
 
 
 def _checkPackage(data):
@@ -47,15 +54,27 @@ def _checkPackage(data):
         data["package"] = "pysmartnode.components" + data["package"]
 
 
+def _resolveOrder(data, _log):
+    from pysmartnode.utils.dependencies import dependencies, resolveOrder
+    order = data["_order"]
+    deps = {}
+    for c in order:
+        deps[c] = dependencies(data[c] if c in data else None, order)
+    return resolveOrder(order, deps, _log)
+
+
 async def registerComponentsAsync(data, _log):
-    for component in data["_order"]:
+    """data["_order"] is replaced by the order the components are registered in"""
+    order = _resolveOrder(data, _log) if len(data["_order"]) > 1 else data["_order"]
+    data["_order"] = order
+    gc.collect()
+    for component in order:
         tmp = {"_order": [component]}
-        tmp[component] = data[component]
+        if component in data:
+            tmp[component] = data[component]
         await _registerComponents(tmp, _log)
         del tmp
-        gc.collect()
-        await asyncio.sleep_ms(750 if platform == "esp8266" else 200)
-        gc.collect()
+        await pace()
 
 
 async def _registerComponents(data, _log):
@@ -67,7 +86,6 @@ async def _registerComponents(data, _log):
     # makes only sense if only a single component is being registered at a time
     order = data["_order"] if "_order" in data else list(data.keys())
     COMPONENTS = config.COMPONENTS
-    loop = asyncio.get_event_loop()
     for i in range(0, len(order)):
         if order[i] not in data:
             await _log.asyncLog("error", "component {!r} of order is not in component dict".format(data["_order"][i]))
@@ -79,8 +97,20 @@ async def _registerComponents(data, _log):
                 # False will be returned as res = False if only one component is added
             else:
                 component = data[componentname]
-                if _checkArgs(data[componentname], _log):
-                    _checkPackage(data[componentname])
+                valid = _checkArgs(component, _log)
+                if valid and "lazy" in component and component["lazy"] is True:
+                    _checkPackage(component)
+                    from pysmartnode.utils.lazy import LazyComponent
+                    COMPONENTS[componentname] = LazyComponent(componentname, component)
+                    await _log.asyncLog("info", "Added component {!r} as lazy component".format(componentname))
+                    res = True
+                elif valid:
+                    _checkPackage(component)
+                    if _lifecycle:
+                        _lifecycle.begin(componentname)  # tracks tasks and subscriptions of component
+                    if _profile:
+                        prof = _profile.snapshot()
+                        t_import = t_ctor = t_init = 0
                     try:
                         tmp = __import__(component["package"], globals(),
                                          locals(), [component["component"]], 0)
@@ -88,6 +118,8 @@ async def _registerComponents(data, _log):
                         await _log.asyncLog("critical", "Error importing package {!s}, error: {!s}".format(
                             component["package"], e))
                         tmp = None
+                    if _profile:
+                        t_import = _profile.elapsed(prof[0])
                     gc.collect()
                     err = False
                     if tmp is not None:
@@ -100,6 +132,8 @@ async def _registerComponents(data, _log):
                             args = _getArgs(
                                 component["constructor_args"]) if "constructor_args" in component and type(
                                 component["constructor_args"]) == list else []
+                            if _profile:
+                                t = time.ticks_ms()
                             try:
                                 obj = getattr(tmp, component["component"])
                                 if str(type(obj)) == "<class 'generator'>":
@@ -112,6 +146,8 @@ async def _registerComponents(data, _log):
                                                         component["component"], componentname, version, e))
                                 obj = None
                                 err = True
+                            if _profile:
+                                t_ctor = _profile.elapsed(t)
                             if obj is not None:
                                 err = False
                                 if "init_function" in component and component["init_function"] is not None:
@@ -120,6 +156,8 @@ async def _registerComponents(data, _log):
                                     args = _getArgs(component["init_args"]) if "init_args" in component and type(
                                         component["init_args"]) == list else []
                                     if "init_function" in component and hasattr(obj, component["init_function"]):
+                                        if _profile:
+                                            t = time.ticks_ms()
                                         init = getattr(obj, component["init_function"])
                                         if type(init) == type(registerComponentsAsync):
                                             from pysmartnode.utils.wrappers.callAsyncSafe import \
@@ -136,6 +174,8 @@ async def _registerComponents(data, _log):
                                                                         component["init_function"], componentname,
                                                                         version, e))
                                                 err = True
+                                        if _profile:
+                                            t_init = _profile.elapsed(t)
                                     else:
                                         await _log.asyncLog("critical",
                                                             "init function {!r} does not exist for object {!r}, version {!s}".format(
@@ -147,10 +187,10 @@ async def _registerComponents(data, _log):
                                         await _log.asyncLog("critical", "obj has no function {!r}".format(
                                             component["call_function_regularly"]))
                                     else:
-                                        func = getattr(obj, component["call_function_regularly"])
-                                        from pysmartnode.utils.wrappers.callRegular import callRegular
-                                        loop.create_task(callRegular(func, component[
-                                            "call_interval"] if "call_interval" in component else None))
+                                        from pysmartnode.utils import scheduler
+                                        scheduler.add(getattr(obj, component["call_function_regularly"]),
+                                                      component["call_interval"] if "call_interval" in component
+                                                      else config.INTERVAL_SEND_SENSOR)
                                 if err is False:
                                     COMPONENTS[componentname] = obj
                                     await _log.asyncLog("info", "Added component {!r}, version {!s}".format(
@@ -166,6 +206,10 @@ async def _registerComponents(data, _log):
                             await _log.asyncLog("critical",
                                                 "error during import of module {!s}".format(component["component"]))
                             res = False
+                    if _lifecycle:
+                        _lifecycle.end()
+                    if _profile:
+                        _profile.component(componentname, prof, t_import, t_ctor, t_init)
             gc.collect()
             __printRAM(mem_start)
     return res
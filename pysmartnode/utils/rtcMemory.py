@@ -0,0 +1,56 @@
+'''
+Created on 2026-10-18
+
+@author: Kevin Köck
+'''
+
+__version__ = "0.1"
+__updated__ = "2026-10-18"
+
+"""
+Layout of the RTC memory of the esp8266, which is shared by the state store (pysmartnode/utils/state.py)
+and the reset reasons written by main.py and the watchdog, so none of them overwrites the other.
+Format: [b"PSS", length (2B), state json] [reset reason]
+Both parts are optional, the reset reason is everything after the state record.
+"""
+
+import machine
+
+_MAGIC = b"PSS"
+SIZE = 492  # RTC user memory of the esp8266
+
+_rtc = machine.RTC()
+
+
+def _split(data):
+    """returns the state record and the reset reason"""
+    if data.startswith(_MAGIC) and len(data) >= 5:
+        end = 5 + (data[3] | data[4] << 8)
+        return data[:end], data[end:]
+    return b"", data
+
+
+def state():
+    """returns the json of the state store or None"""
+    record = _split(_rtc.memory())[0]
+    return record[5:] if record else None
+
+
+def setState(data):
+    """stores the json of the state store, keeps the reset reason"""
+    reason = _split(_rtc.memory())[1]
+    record = _MAGIC + bytes((len(data) & 0xff, len(data) >> 8)) + data
+    if len(record) > SIZE:
+        raise ValueError("state too big for RTC memory: {!s}B".format(len(record)))
+    _rtc.memory(record + reason[:SIZE - len(record)])
+
+
+def reason():
+    """returns the reset reason, b"" if there is none"""
+    return _split(_rtc.memory())[1]
+
+
+def setReason(msg):
+    """stores the reset reason (bytes), keeps the state. An empty msg removes the reason"""
+    record = _split(_rtc.memory())[0]
+    _rtc.memory(record + msg[:SIZE - len(record)])
@@ -0,0 +1,135 @@
+'''
+Created on 2026-10-18
+
+@author: Kevin Köck
+'''
+
+__version__ = "0.4"
+__updated__ = "2026-10-18"
+
+"""
+Central scheduler for periodic jobs, e.g. reading and publishing a sensor every 10 minutes.
+One task serves all jobs instead of every component running its own loop, which saves RAM and
+keeps the uasyncio queues short.
+Jobs are kept in a list sorted by their due time (ticks_ms) and are called one after another.
+A job is a function or coroutine function without arguments and has to return, it must not run forever.
+A coroutine job runs as its own task. The scheduler waits for it at most SCHEDULER_JOB_TIMEOUT seconds
+(config.py, default 1) before running the next jobs, so a slow job (e.g. publishing while mqtt is
+disconnected) does not delay the others. It is scheduled again when it is finished.
+
+Jobs added with the same interval are staggered by SCHEDULER_STAGGER seconds (config.py, default 5,
+at most a quarter of the interval) so sensors with the same interval don't publish at the same time.
+If a job is late by more than its interval, missed runs are skipped.
+Between jobs the scheduler sleeps until the next job is due, adding an earlier job wakes it.
+"""
+
+import time
+import uasyncio as asyncio
+from pysmartnode import config
+from pysmartnode import logging
+from pysmartnode.utils.wakeableSleep import WakeableSleep
+from pysmartnode.utils.generator import type_gen
+
+_log = logging.getLogger("scheduler")
+
+_STAGGER = int((config.SCHEDULER_STAGGER if hasattr(config, "SCHEDULER_STAGGER") else 5) * 1000)
+
+_JOB_TIMEOUT = int((config.SCHEDULER_JOB_TIMEOUT if hasattr(config, "SCHEDULER_JOB_TIMEOUT") else 1) * 1000)
+
+_jobs = []  # [due ticks_ms, interval ms, func], sorted by due time
+_intervals = {}  # interval ms: amount of jobs added with this interval
+_started = False
+_sleep = WakeableSleep()
+
+
+def _insert(job):
+    now = time.ticks_ms()
+    d = time.ticks_diff(job[0], now)
+    i = 0
+    while i < len(_jobs) and time.ticks_diff(_jobs[i][0], now) <= d:
+        i += 1
+    _jobs.insert(i, job)
+
+
+def add(func, interval, phase=0):
+    """
+    Calls func every interval seconds, the first time after phase seconds and its stagger offset.
+    Returns the job which can be removed with remove(job).
+    """
+    global _started
+    interval = max(int(interval * 1000), 1)
+    n = _intervals[interval] if interval in _intervals else 0
+    _intervals[interval] = n + 1
+    delay = int(phase * 1000) + (n * min(_STAGGER, interval // 4)) % interval
+    job = [time.ticks_add(time.ticks_ms(), delay), interval, func]
+    _insert(job)
+    if _jobs[0] is job:
+        _sleep.wake()  # sleeping until a later job
+    if not _started and not config.DUTY_CYCLE:  # duty cycle samples the sensors itself
+        _started = True
+        # not create_task as the scheduler does not belong to the component adding the first job
+        asyncio.get_event_loop().call_soon(_run())
+    return job
+
+
+def remove(job):
+    if job[2] is None:
+        return  # already removed
+    job[2] = None  # a running job is not scheduled again
+    if _intervals[job[1]] > 1:
+        _intervals[job[1]] -= 1
+    else:
+        del _intervals[job[1]]
+    for i in range(len(_jobs)):
+        if _jobs[i] is job:
+            _jobs.pop(i)
+            return
+
+
+async def _run():
+    while True:
+        if not _jobs:
+            await _sleep.sleep_ms()  # until a job is added
+            continue
+        wait = time.ticks_diff(_jobs[0][0], time.ticks_ms())
+        if wait > 0:
+            await _sleep.sleep_ms(wait)
+            continue
+        job = _jobs.pop(0)
+        try:
+            res = job[2]()
+        except Exception as e:
+            _log.error("Job {!s} failed: {!s}".format(job[2], e))
+            res = None
+        if type(res) == type_gen:
+            done = [False]
+            asyncio.get_event_loop().call_soon(_finish(job, res, done))
+            st = time.ticks_ms()
+            wait = _JOB_TIMEOUT
+            while not done[0] and wait > 0:
+                await _sleep.sleep_ms(wait)  # woken when the job is finished
+                wait = _JOB_TIMEOUT - time.ticks_diff(time.ticks_ms(), st)
+            # a slow job keeps running on its own and is scheduled again when it is finished
+        else:
+            _reschedule(job)
+
+
+async def _finish(job, coro, done):
+    try:
+        await coro
+    except Exception as e:
+        _log.error("Job {!s} failed: {!s}".format(job[2], e))
+    done[0] = True
+    _reschedule(job)
+    _sleep.wake()
+
+
+def _reschedule(job):
+    if job[2] is None:
+        return  # removed while running
+    due = time.ticks_add(job[0], job[1])
+    now = time.ticks_ms()
+    if time.ticks_diff(due, now) < 0:
+        due = time.ticks_add(now, job[1])
+    job[0] = due
+    _insert(job)
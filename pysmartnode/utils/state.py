@@ -0,0 +1,103 @@
+'''
+Created on 2026-10-18
+
+@author: Kevin Köck
+'''
+
+__version__ = "0.2"
+__updated__ = "2026-10-18"
+
+"""
+Small key-value store for the last applied state of components, only used if STATE_PERSIST = True in config.py.
+After a reboot the state is restored immediately instead of waiting for retained mqtt messages,
+which are then only corrections.
+Changes are kept in RAM and written behind: the store is written STATE_WRITE_DELAY seconds after the
+first change (default 60 for a file, 1 for the RTC memory), so many changes only cause one write.
+Backends (STATE_BACKEND):
+- "file": state.json, only written if the content changed. Default if a filesystem is available.
+- "rtc": RTC memory, survives resets and deep sleep but not a power loss (esp8266: max 487 Bytes).
+  The RTC memory is shared with the reset reason, see pysmartnode/utils/rtcMemory.py.
+"""
+
+import json
+import uasyncio as asyncio
+from pysmartnode import config
+from pysmartnode import logging
+
+_log = logging.getLogger("state")
+
+_FILE = "state.json"
+
+_state = None
+_dirty = False
+_rtc = None
+
+
+def _backend():
+    if hasattr(config, "STATE_BACKEND"):
+        return config.STATE_BACKEND
+    from pysmartnode.utils import sys_vars
+    return "file" if sys_vars.hasFilesystem() else "rtc"
+
+
+def _load():
+    global _state, _rtc
+    if _state is not None:
+        return _state
+    _state = {}
+    try:
+        if _backend() == "rtc":
+            from pysmartnode.utils import rtcMemory
+            _rtc = rtcMemory
+            data = _rtc.state()
+            if data is not None:
+                _state = json.loads(data)
+        else:
+            with open(_FILE, "r") as f:
+                _state = json.loads(f.read())
+    except Exception:
+        pass  # nothing stored yet or invalid
+    return _state
+
+
+def get(key, default=None):
+    state = _load()
+    return state[key] if key in state else default
+
+
+def set(key, value):
+    """value has to be json serializable"""
+    global _dirty
+    state = _load()
+    if key in state and state[key] == value:
+        return
+    state[key] = value
+    if not _dirty:
+        _dirty = True
+        asyncio.get_event_loop().create_task(_writeBehind())
+
+
+async def _writeBehind():
+    if hasattr(config, "STATE_WRITE_DELAY"):
+        delay = config.STATE_WRITE_DELAY
+    else:
+        delay = 1 if _rtc is not None else 60
+    await asyncio.sleep(delay)
+    flush()
+
+
+def flush():
+    """writes the state immediately if it changed"""
+    global _dirty
+    if not _dirty:
+        return
+    _dirty = False
+    data = json.dumps(_state)
+    try:
+        if _rtc is not None:
+            _rtc.setState(data.encode())
+        else:
+            from pysmartnode.utils.files import writeChanged
+            writeChanged(_FILE, data)
+    except Exception as e:
+        _log.error("Can't save state, {!s}".format(e))
@@ -5,44 +5,78 @@ Created on 11.03.2018
 @author: Kevin Kck
 '''
 
-__version__ = "0.4"
-__updated__ = "2018-09-22"
+__version__ = "0.6"
+__updated__ = "2026-10-18"
 
 import os
 import gc
 
 
 class SubscriptionHandler:
-    def __init__(self):
+    def __init__(self, cache_size=4):
+        """
+        cache_size: number of topic lookups kept in a small LRU cache in RAM to
+            speed up frequently used topics. Each entry costs ~60B, 0 disables the cache.
+        """
         # not using structure
         self._subscription_file = "_subscriptions.txt"
         f = open(self._subscription_file, "w")
         f.close()
-        self._functions = []  # [(cb1,cb2),(cb1),...]
+        self._functions = []  # [[cb1,cb2],[cb1],...]
+        self._cache_size = cache_size
+        self._cache = []  # [(identifier, index),...], most recently used last
+        self._hits = 0
+        self._misses = 0
 
     def getFunctions(self, identifier, index=False, ignore_error=False, ignore_wildcard=False):
-        cbs = None
+        if ignore_wildcard is False and self._cache_size > 0:
+            i = self._getCached(identifier)
+        else:
+            i = self._getIndex(identifier, ignore_wildcard)
+        if i is None:
+            if ignore_error is False:
+                raise IndexError("Object {!s} does not exist".format(identifier))
+            if index:
+                return None, None
+            return None
+        if index:
+            return self._functions[i], i
+        return self._functions[i]
+
+    def _getIndex(self, identifier, ignore_wildcard=False):
+        found = None
         i = 0
         with open(self._subscription_file, "r") as f:
             for line in f:
                 line = line[:-1]
                 gc.collect()
                 if identifier == line:
-                    cbs = (self._functions[i], i)
-                    break
-                elif ignore_wildcard is False and self.matchesSubscription(identifier, line):
-                    if cbs is None:
-                        cbs = (self._functions[i], i)
+                    return i
+                elif ignore_wildcard is False and found is None and self.matchesSubscription(identifier, line):
+                    found = i
                 i += 1
-        if cbs is None:
-            if ignore_error is False:
-                raise IndexError("Object {!s} does not exist".format(identifier))
-            i = None
-        if index:
-            if cbs is None:
-                return None, i
-            return cbs
-        return cbs[0]
+        return found
+
+    def _getCached(self, identifier):
+        cache = self._cache
+        for j in range(len(cache)):
+            if cache[j][0] == identifier:
+                self._hits += 1
+                if j != len(cache) - 1:
+                    cache.append(cache.pop(j))
+                return cache[-1][1]
+        self._misses += 1
+        i = self._getIndex(identifier)
+        # lookups of unknown topics are cached too as they would need a full file scan
+        if len(cache) >= self._cache_size:
+            cache.pop(0)
+        cache.append((identifier, i))
+        return i
+
+    def cacheStats(self):
+        """returns (hits, misses, hit ratio) of the lookup cache"""
+        total = self._hits + self._misses
+        return self._hits, self._misses, self._hits / total if total > 0 else 0
 
     @staticmethod
     def matchesSubscription(topic, subscription):
@@ -58,39 +92,33 @@ class SubscriptionHandler:
         return False
 
     def setFunctions(self, identifier, cbs):
-        _, i = self.getFunctions(identifier, index=True)
-        if type(cbs) == list:
-            self._functions[i] = tuple(cbs)
-        else:
-            self._functions[i] = cbs
+        functions, _ = self.getFunctions(identifier, index=True)
+        # changed in place to keep subscription handles valid
+        functions.clear()
+        functions.extend(cbs if type(cbs) in (list, tuple) else [cbs])
 
     def addObject(self, identifier, cb):
+        """
+        Adds a callback to a topic if it is not already subscribed with this callback.
+        Returns the list of callbacks of the topic, used as a subscription handle.
+        """
+        self._cache.clear()  # new subscription could match cached topics
         _, i = self.getFunctions(identifier, index=True, ignore_error=True, ignore_wildcard=True)
+        cbs = cb if type(cb) in (list, tuple) else [cb]
         if i is None:
-            if type(cb) == list:
-                self._functions.append(tuple(cb))
-            else:
-                self._functions.append(cb)
+            self._functions.append(list(cbs))
             with open(self._subscription_file, "a") as f:
                 f.write(identifier)
                 f.write("\n")
-        else:
-            if type(cb) == list or type(cb) == tuple:
-                if type(self._functions[i]) == tuple:
-                    self._functions[i] = tuple(list(self._functions[i]) +
-                                               cb if type(cb) == list else list(cb))
-                else:
-                    self._functions[i] = tuple([self._functions[i]] +
-                                               cb if type(cb) == list else list(cb))
-            else:
-                if type(self._functions[i]) == tuple:
-                    l = list(self._functions[i])
-                else:
-                    l = [self._functions[i]]
-                l.append(cb)
-                self._functions[i] = tuple(l)
+            return self._functions[-1]
+        functions = self._functions[i]
+        for cb in cbs:
+            if cb not in functions:
+                functions.append(cb)
+        return functions
 
     def removeObject(self, identifier):
+        self._cache.clear()  # indexes change
         i = 0
         foundi = None
         with open("_subs_temp.txt", "w") as tmp:
@@ -103,7 +131,7 @@ class SubscriptionHandler:
                         tmp.write(line)
                     i += 1
         if foundi is not None:
-            self._functions.pop(foundi)
+            self._functions.pop(foundi).clear()  # invalidates subscription handles
         os.remove(self._subscription_file)
         os.rename("_subs_temp.txt", self._subscription_file)
         gc.collect()
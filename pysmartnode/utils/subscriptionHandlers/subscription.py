@@ -5,8 +5,8 @@ Created on 17.02.2018
 @author: Kevin Kck
 '''
 
-__version__ = "1.3"
-__updated__ = "2018-09-22"
+__version__ = "1.5"
+__updated__ = "2026-10-18"
 
 
 # supports wildcards since 1.0
@@ -60,7 +60,10 @@ class SubscriptionHandler:
         return self.get(identifier, 1)
 
     def setFunctions(self, identifier, value):
-        return self.set(identifier, 1, value)
+        cbs = self.get(identifier, 1)
+        # changed in place to keep subscription handles valid
+        cbs.clear()
+        cbs.extend(value if type(value) in (list, tuple) else [value])
 
     @staticmethod
     def matchesSubscription(topic, subscription):
@@ -77,62 +80,72 @@ class SubscriptionHandler:
 
     def __getObject(self, identifier, get=True):
         iObject = self.ifirst
+        wildcard = None
         while iObject is not None:
             obj_val = iObject.values[0]
             if obj_val == identifier:
                 return iObject
-            elif get and obj_val.endswith("/#"):
+            elif get and wildcard is None and obj_val.endswith("/#"):
                 # check if identifier is found in subscription
                 if identifier[:len(obj_val) - 2] == obj_val[:-2]:
                     if len(identifier) == len(obj_val) - 2 or \
                             identifier[len(obj_val) - 2] == "/":
                         # check if identifier matches subscription or has sublevel
                         # (home/test/# does not listen to home/testing)
-                        return iObject
+                        wildcard = iObject
+                        # exact subscription has priority, keep searching
             iObject = iObject.next
-        return None
+        return wildcard
 
     def addObject(self, identifier, *args):
+        """
+        Every value is stored in a list, adding a value to an existing identifier
+        appends it to the list if it is not already in there.
+        Returns the list of the first value (the callbacks) to be used as a subscription handle.
+        """
         if len(args) + 1 > self.__values:
             raise IndexError("More arguements than structure allows")
         obj = self.__getObject(identifier, get=False)
         if obj is None:
-            attribs = (identifier,) + args
+            obj = _subscription((identifier,) + tuple([arg] for arg in args))
             iObject = self.ifirst
             if iObject is None:
-                self.ifirst = _subscription(attribs)
-                return
-            while iObject.next is not None:
-                iObject = iObject.next
-            iObject.next = _subscription(attribs)
+                self.ifirst = obj
+            else:
+                while iObject.next is not None:
+                    iObject = iObject.next
+                iObject.next = obj
         else:
             # raise IndexError("Object with identifier already exists")
             self._set(obj, (identifier,) + args)
+        return obj.values[1] if len(obj.values) > 1 else None
 
     def _set(self, obj, values):
-        values_obj = list(obj.values or [None] * self.__values)
+        values_obj = obj.values
         for i in range(1, len(values)):
             if values_obj[i] is None:
-                values_obj[i] = values[i]
-            elif type(values_obj[i]) != list:
-                values_obj[i] = [values_obj[i]]
+                values_obj = list(values_obj)
+                values_obj[i] = [values[i]]
+                obj.values = tuple(values_obj)
+            elif values[i] not in values_obj[i]:
                 values_obj[i].append(values[i])
-            else:
-                values_obj[i].append(values[i])
-        obj.values = values_obj
 
     def removeObject(self, identifier):
         obj = self.__getObject(identifier, get=False)
+        if obj is None:
+            return
+        for value in obj.values[1:]:
+            if type(value) == list:
+                value.clear()  # invalidates subscription handles
         if obj == self.ifirst:
-            self.ifirst = None
+            self.ifirst = obj.next
             del obj
             return
-        if obj is not None:
-            iObject = self.ifirst
-            while iObject.next != obj:
-                iObject = iObject.next
-            iObject.next = obj.next
-            del obj
+        iObject = self.ifirst
+        while iObject.next != obj:
+            iObject = iObject.next
+        iObject.next = obj.next
+        del obj
 
     def print(self):
         for obj in self:
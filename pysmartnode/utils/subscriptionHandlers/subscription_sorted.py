@@ -0,0 +1,146 @@
+# Author: Kevin Köck
+# Copyright Kevin Köck 2019 Released under the MIT license
+# Created on 2026-10-18
+
+__updated__ = "2026-10-18"
+__version__ = "0.3"
+
+"""
+Subscription backend storing all topics in one sorted list with a parallel list of callbacks.
+Exact topics are found by binary search, wildcard subscriptions ("/#") are kept in a short
+separate list, longest subscription first so the most specific wildcard matches.
+Needs only 2 list slots per subscription instead of an object and a tuple per topic.
+
+Optionally a precompiled sorted tuple of topics can be given (see tools/compile_subscriptions.py).
+Those topic strings are frozen into the firmware, only one callback slot per topic is allocated.
+Topics not in the precompiled table are stored in RAM as usual.
+"""
+
+
+def _bisect(topics, identifier):
+    lo = 0
+    hi = len(topics)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if topics[mid] < identifier:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+class SubscriptionHandler:
+    def __init__(self, frozen=None):
+        """
+        frozen: sorted tuple of topics precompiled into the firmware
+        """
+        self._ftopics = frozen or ()  # precompiled topics, never changed
+        self._fcbs = [None] * len(self._ftopics)  # callbacks of _ftopics, None if not subscribed
+        self._topics = []  # sorted exact topics
+        self._cbs = []  # callbacks of _topics, same index
+        self._wtopics = []  # wildcard subscriptions, longest first
+        self._wcbs = []  # callbacks of _wtopics, same index
+
+    def _find(self, identifier):
+        """returns (list of topics, list of callbacks, index) of an identifier or None"""
+        if identifier.endswith("/#"):
+            topics = self._wtopics
+            for i in range(len(topics)):
+                if topics[i] == identifier:
+                    return topics, self._wcbs, i
+            return None
+        if self._ftopics:
+            i = _bisect(self._ftopics, identifier)
+            if i < len(self._ftopics) and self._ftopics[i] == identifier:
+                return self._ftopics, self._fcbs, i
+        i = _bisect(self._topics, identifier)
+        if i < len(self._topics) and self._topics[i] == identifier:
+            return self._topics, self._cbs, i
+        return None
+
+    def getFunctions(self, identifier):
+        obj = self._find(identifier)
+        if obj is not None and obj[1][obj[2]] is not None:
+            return obj[1][obj[2]]
+        topics = self._wtopics
+        for i in range(len(topics)):
+            if self.matchesSubscription(identifier, topics[i]):
+                return self._wcbs[i]
+        raise IndexError("Object {!s} does not exist".format(identifier))
+
+    def setFunctions(self, identifier, cbs):
+        obj = self._find(identifier)
+        if obj is None or obj[1][obj[2]] is None:
+            raise IndexError("Object {!s} does not exist".format(identifier))
+        functions = obj[1][obj[2]]
+        # changed in place to keep subscription handles valid
+        functions.clear()
+        functions.extend(cbs if type(cbs) in (list, tuple) else [cbs])
+
+    @staticmethod
+    def matchesSubscription(topic, subscription):
+        if topic == subscription:
+            return True
+        if subscription.endswith("/#"):
+            lens = len(subscription)
+            if topic[:lens - 2] == subscription[:-2]:
+                if len(topic) == lens - 2 or topic[lens - 2] == "/":
+                    # check if identifier matches subscription or has sublevel
+                    # (home/test/# does not listen to home/testing)
+                    return True
+        return False
+
+    def addObject(self, identifier, cb):
+        """
+        Adds a callback to a topic if it is not already subscribed with this callback.
+        Returns the list of callbacks of the topic, used as a subscription handle.
+        """
+        cbs = cb if type(cb) in (list, tuple) else [cb]
+        obj = self._find(identifier)
+        if obj is not None:
+            functions = obj[1][obj[2]]
+            if functions is None:  # precompiled topic, not subscribed yet
+                functions = obj[1][obj[2]] = []
+            for cb in cbs:
+                if cb not in functions:
+                    functions.append(cb)
+            return functions
+        functions = list(cbs)
+        if identifier.endswith("/#"):
+            topics = self._wtopics
+            i = 0
+            while i < len(topics) and len(topics[i]) >= len(identifier):
+                i += 1
+            topics.insert(i, identifier)
+            self._wcbs.insert(i, functions)
+        else:
+            i = _bisect(self._topics, identifier)
+            self._topics.insert(i, identifier)
+            self._cbs.insert(i, functions)
+        return functions
+
+    def removeObject(self, identifier):
+        obj = self._find(identifier)
+        if obj is None or obj[1][obj[2]] is None:
+            return
+        obj[1][obj[2]].clear()  # invalidates subscription handles
+        if obj[0] is self._ftopics:
+            self._fcbs[obj[2]] = None
+        else:
+            obj[0].pop(obj[2])
+            obj[1].pop(obj[2])
+
+    def print(self):
+        for obj in self.__iter__(with_path=True):
+            print(obj)
+
+    def __iter__(self, with_path=False):
+        # with_path only for compatibility to tree
+        for topics, cbs in ((self._ftopics, self._fcbs), (self._topics, self._cbs), (self._wtopics, self._wcbs)):
+            for i in range(len(topics)):
+                if cbs[i] is None:
+                    continue
+                if with_path:
+                    yield cbs[i], topics[i]
+                else:
+                    yield topics[i]
@@ -0,0 +1,98 @@
+'''
+Created on 2026-10-18
+
+@author: Kevin Köck
+'''
+
+__version__ = "0.2"
+__updated__ = "2026-10-18"
+
+"""
+Modules that are only needed sometimes (e.g. registerComponents) are imported with acquire() and
+given back with release(). Released modules stay loaded while enough RAM is free, so they don't have to
+be imported and compiled again. If the free RAM drops below TRANSIENT_MIN_FREE_RAM (config.py, default
+16384 on esp8266, else 32768), the least recently used modules that are not in use are unloaded.
+How often a module has been loaded and how long loading and unloading took is available by stats().
+"""
+
+import gc
+import sys
+import time
+from sys import platform
+
+_lru = []  # loaded modules, least recently used first
+_refs = {}  # module: number of users
+_stats = {}  # module: [loads, load ms, unload ms]
+_min_free = None
+
+
+def _minFree():
+    global _min_free
+    if _min_free is None:
+        from pysmartnode import config
+        _min_free = config.TRANSIENT_MIN_FREE_RAM if hasattr(config, "TRANSIENT_MIN_FREE_RAM") else (
+            16384 if platform == "esp8266" else 32768)
+    return _min_free
+
+
+def acquire(name):
+    """imports a module and returns it, has to be given back with release()"""
+    if name in _lru:
+        _lru.remove(name)
+        _lru.append(name)
+        _refs[name] += 1
+        return sys.modules[name]
+    st = time.ticks_ms()
+    module = __import__(name, globals(), locals(), [name.split(".")[-1]], 0)
+    gc.collect()
+    if name not in _stats:
+        _stats[name] = [0, 0, 0]
+    _stats[name][0] += 1
+    _stats[name][1] += time.ticks_diff(time.ticks_ms(), st)
+    _lru.append(name)
+    _refs[name] = 1
+    return module
+
+
+def release(name, unload=False):
+    """
+    Gives a module back. It stays loaded until RAM is needed.
+    unload: unload the module immediately (e.g. if it only executes code on import).
+    """
+    if name not in _refs:
+        return
+    _refs[name] -= 1
+    if unload and _refs[name] == 0:
+        _unload(name)
+    evict()
+
+
+def _unload(name):
+    st = time.ticks_ms()
+    _lru.remove(name)
+    del _refs[name]
+    pos = name.rfind(".")
+    if pos > 0 and name[:pos] in sys.modules and hasattr(sys.modules[name[:pos]], name[pos + 1:]):
+        # parent package keeps a reference to the module, "del pkg.mod" as delattr is not available on every port
+        root = name[:name.find(".")]
+        exec("del " + name, {root: sys.modules[root]})
+    del sys.modules[name]
+    gc.collect()
+    _stats[name][2] += time.ticks_diff(time.ticks_ms(), st)
+
+
+def evict(min_free=None):
+    """unloads unused modules, least recently used first, until min_free bytes of RAM are free"""
+    min_free = min_free or _minFree()
+    gc.collect()
+    i = 0
+    while gc.mem_free() < min_free and i < len(_lru):
+        if _refs[_lru[i]] == 0:
+            _unload(_lru[i])
+        else:
+            i += 1
+
+
+def stats():
+    """returns dict of module: [loads, load ms, unload ms]"""
+    return _stats
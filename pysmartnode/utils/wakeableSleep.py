@@ -0,0 +1,116 @@
+'''
+Created on 2026-10-18
+
+@author: Kevin Köck
+'''
+
+__version__ = "0.2"
+__updated__ = "2026-10-18"
+
+"""
+Sleep that can be ended early by wake() or changed by reschedule() from another task, e.g. when
+the interval of a component is changed by mqtt. Instead of sleeping in short steps and checking
+for changes, the task sleeps until its deadline without any wakeups in between.
+The sleeping task is parked outside the uasyncio queues like a task waiting for an Event
+(see pysmartnode/utils/event.py) and a loop callback wakes it at the deadline. As callbacks can't be removed from the waitq, a pending callback
+that fires before a new deadline is reused, so rescheduling doesn't fill the waitq.
+Only one task can sleep on an object at the same time. The sleeping task can be cancelled.
+
+Usage:
+    self._sleep = WakeableSleep()
+    await self._sleep.sleep_ms(1000)   # in the task, None sleeps until woken
+    self._sleep.wake()                 # in another task
+"""
+
+import time
+import uasyncio as asyncio
+
+
+class WakeableSleep:
+    def __init__(self):
+        self._task = None  # sleeping task
+        self._deadline = None  # ticks_ms, None: sleeps until woken
+        self._timers = []  # ticks_ms of pending loop callbacks
+
+    def sleep_ms(self, ms=None):
+        """await it to sleep ms milliseconds or until wake() is called if ms is None"""
+        loop = asyncio.get_event_loop()
+        task = loop.cur_task
+        self._task = task
+        loop.call_soon(self._park, task)
+        self._setDeadline(ms)
+        try:
+            yield False  # loop does not reschedule the task
+        finally:
+            self._task = None
+            self._deadline = None
+
+    def _park(self, task):
+        # runs after the task yielded, see Event._park
+        if self._task is not task:  # woken before it was parked
+            asyncio.get_event_loop().call_soon(task)
+            return
+        prev = task.pend_throw(False)  # marks the task as parked, see asyncio.cancel
+        if prev is not None:  # timeout or cancellation before the task was parked
+            task.pend_throw(prev)
+            asyncio.get_event_loop().call_soon(task)
+
+    def sleep(self, s=None):
+        return self.sleep_ms(None if s is None else int(s * 1000))
+
+    def sleeping(self):
+        return self._task is not None
+
+    def wake(self):
+        """ends the sleep immediately, returns False if no task is sleeping"""
+        task = self._task
+        if task is None:
+            return False
+        self._task = None
+        self._deadline = None
+        prev = task.pend_throw(None)
+        if prev is False:
+            asyncio.get_event_loop().call_soon(task)
+        elif prev is not None:  # already scheduled with a cancellation
+            task.pend_throw(prev)
+        # None: not parked yet, _park schedules it
+        return True
+
+    def reschedule(self, ms):
+        """changes the remaining sleep time to ms, returns False if no task is sleeping"""
+        if self._task is None:
+            return False
+        if ms <= 0:
+            return self.wake()
+        self._setDeadline(ms)
+        return True
+
+    def _setDeadline(self, ms):
+        if ms is None:
+            self._deadline = None
+            return
+        self._deadline = time.ticks_add(time.ticks_ms(), ms)
+        self._arm()
+
+    def _arm(self):
+        """makes sure a loop callback fires at or before the deadline"""
+        for t in self._timers:
+            if time.ticks_diff(t, self._deadline) <= 0:
+                return
+        self._timers.append(self._deadline)
+        delay = time.ticks_diff(self._deadline, time.ticks_ms())
+        asyncio.get_event_loop().call_later_ms(delay if delay > 0 else 0, self._timeout)
+
+    def _timeout(self):
+        # callbacks fire in order, so the earliest one has fired
+        i = 0
+        for j in range(1, len(self._timers)):
+            if time.ticks_diff(self._timers[j], self._timers[i]) < 0:
+                i = j
+        self._timers.pop(i)
+        if self._task is None or self._deadline is None:
+            return
+        if time.ticks_diff(self._deadline, time.ticks_ms()) <= 0:
+            self.wake()
+        else:
+            self._arm()  # deadline was moved
@@ -1,25 +1,21 @@
-import uasyncio as asyncio
 from pysmartnode import config
-from pysmartnode.utils.wrappers.callAsyncSafe import callAsyncSafe as _callAsyncSafe
+from pysmartnode.utils import scheduler
+from pysmartnode.utils.generator import type_gen
 
 
 async def callRegular(func, interval=None):
-    interval = interval or config.INTERVAL_SEND_SENSOR
-    while True:
-        if type(func) == type(_callAsyncSafe):
-            await func()
-        else:
-            func()
-        await asyncio.sleep(interval)
+    """calls func regularly using the central scheduler, returns immediately"""
+    return scheduler.add(func, interval or config.INTERVAL_SEND_SENSOR)
 
 
 async def callRegularPublish(func, topic, interval=None, retain=None, qos=None):
-    interval = interval or config.INTERVAL_SEND_SENSOR
+    """publishes the result of func regularly using the central scheduler, returns immediately"""
     mqtt = config.getMQTT()
-    while True:
-        if type(func) == type(_callAsyncSafe):
-            res = await func()
-        else:
-            res = func()
+
+    async def publish():
+        res = func()
+        if type(res) == type_gen:
+            res = await res
         await mqtt.publish(topic, res, qos, retain)
-        await asyncio.sleep(interval)
+
+    return scheduler.add(publish, interval or config.INTERVAL_SEND_SENSOR)
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# Author: Kevin Köck
+# Copyright Kevin Köck 2019 Released under the MIT license
+# Created on 2026-10-18
+
+__updated__ = "2026-10-18"
+__version__ = "0.3"
+
+"""
+Host tool compiling the subscription topics of a node into a module "_subscriptions_frozen.py"
+that can be frozen into the firmware (put it into the "modules" directory before building).
+If this module is available and SUBSCRIPTION_BACKEND = "sorted" is configured, MQTTHandler uses the
+precompiled table: the topic strings are stored in flash and only one callback slot per topic is
+allocated in RAM. Topics that are not in the table (e.g. added later or by a changed configuration) are stored in RAM
+as usual, so an outdated table only costs performance, never correctness.
+
+Topics are collected from:
+- the component configuration (components.json or _order.json + components/), every string
+  constructor/init argument whose name contains "topic"
+- the login topic used to receive the configuration
+- the source code of the configured components (and the component modules they import): topics of
+  subscribe() calls that can be resolved statically, e.g. default topics built with getDeviceTopic()
+  like "heater/mode" + "/set"
+- optional topic dumps of a running node, e.g. the "_subscriptions.txt" of the file backend
+  (needed for topics built from runtime values, the tool reports how many it could not resolve)
+
+Usage:
+python3 tools/compile_subscriptions.py --components components.json --id 3c71bf1234 \
+    --topics _subscriptions.txt -o modules/_subscriptions_frozen.py
+"""
+
+import argparse
+import ast
+import json
+import os
+import sys
+
+
+def loadConfiguration(components=None, order=None, directory="components"):
+    """returns the component configuration dictionary"""
+    if components is not None:
+        with open(components, "rb") as f:
+            return json.loads(f.read().decode())
+    with open(order, "rb") as f:
+        data = {"_order": json.loads(f.read().decode())}
+    for name in data["_order"]:
+        with open(os.path.join(directory, "{!s}.json".format(name)), "rb") as f:
+            data[name] = json.loads(f.read().decode())
+    return data
+
+
+def _topicArgs(args):
+    if type(args) == dict:
+        for key in args:
+            if "topic" in key.lower() and type(args[key]) == str:
+                yield args[key]
+
+
+def configTopics(data):
+    topics = set()
+    for name in data.get("_order", [key for key in data if key != "_order"]):
+        component = data.get(name)
+        if type(component) != dict:
+            continue
+        for key in ("constructor_args", "init_args"):
+            for topic in _topicArgs(component.get(key)):
+                topics.add(topic)
+    return topics
+
+
+_SUBSCRIBE = ("subscribe", "scheduleSubscribe")
+
+
+def _callName(node):
+    if isinstance(node.func, ast.Attribute):
+        return node.func.attr
+    if isinstance(node.func, ast.Name):
+        return node.func.id
+    return None
+
+
+def _key(node):
+    """
+    Variables and attributes are matched by name (self.__topic and topic of other objects alike),
+    calls by the name of the function or method with "()" appended.
+    """
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    if isinstance(node, ast.Call) and not node.args and _callName(node):
+        return _callName(node) + "()"
+    return None
+
+
+def _evaluate(node, names):
+    """returns the set of topics an expression can evaluate to or None if it depends on runtime values"""
+    if isinstance(node, ast.Constant) and type(node.value) == str:
+        return {node.value}
+    if isinstance(node, ast.Call) and _callName(node) == "getDeviceTopic" and node.args:
+        attribs = _evaluate(node.args[0], names)
+        if attribs is None:
+            return None
+        request = len(node.args) > 1 and node.args[1]
+        for keyword in node.keywords:
+            if keyword.arg == "is_request":
+                request = keyword.value
+        request = isinstance(request, ast.Constant) and request.value is True
+        return {"." + attrib + ("/set" if request else "") for attrib in attribs}
+    if isinstance(node, ast.BoolOp) and isinstance(node.op, ast.Or):
+        # "mqtt_topic or getDeviceTopic(...)", topics given by the configuration are found by configTopics
+        topics = set()
+        for value in node.values:
+            topics.update(_evaluate(value, names) or ())
+        return topics or None
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        left = _evaluate(node.left, names)
+        right = _evaluate(node.right, names)
+        if left is None or right is None:
+            return None
+        return {a + b for a in left for b in right}
+    key = _key(node)
+    if key is not None and key in names:
+        return names[key]
+    return None
+
+
+def subscribedTopics(sources):
+    """
+    returns (topics subscribed by the modules, number of subscribe() calls that could not be resolved).
+    Names are shared by all modules, e.g. a plugin subscribing to HEATER.getPowerTopic() + "/set".
+    """
+    trees = [ast.parse(source) for source in sources]
+    names = {}
+    for _ in range(3):  # values assigned from other variables or returned by getters
+        for tree in trees:
+            for node in ast.walk(tree):
+                if isinstance(node, ast.Assign) and len(node.targets) == 1:
+                    key, value = _key(node.targets[0]), node.value
+                elif isinstance(node, ast.FunctionDef) and isinstance(node.body[-1], ast.Return):
+                    key, value = node.name + "()", node.body[-1].value
+                else:
+                    continue
+                topics = _evaluate(value, names) if key and value is not None else None
+                if topics is not None:
+                    names.setdefault(key, set()).update(topics)
+    topics = set()
+    unresolved = 0
+    for tree in trees:
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Call) and _callName(node) in _SUBSCRIBE and node.args:
+                res = _evaluate(node.args[0], names)
+                if res is None:
+                    unresolved += 1
+                else:
+                    topics.update(res)
+    return topics, unresolved
+
+
+def sourceTopics(data):
+    """returns (topics subscribed in the source of the configured components, unresolved subscriptions)"""
+    from freeze_manifest import componentPackages, resolve, _readSource  # imports this module
+    found, _ = resolve(componentPackages(data))
+    return subscribedTopics(_readSource(os.path.join(*found[name])) for name in sorted(found)
+                            if name.startswith("pysmartnode.components."))
+
+
+def deviceTopic(topic, home, device_id):
+    """converts topics of the device to the ".topic" form used by MQTTHandler"""
+    prefix = "{!s}/{!s}/".format(home, device_id)
+    if device_id is not None and topic.startswith(prefix):
+        return "." + topic[len(prefix):]
+    return topic
+
+
+def compileTopics(topics, home, device_id):
+    table = set()
+    for topic in topics:
+        topic = deviceTopic(topic.strip(), home, device_id)
+        if not topic or topic.endswith("/#"):
+            continue  # wildcards are kept in RAM by the backend
+        table.add(topic)
+        if topic.endswith("/set"):
+            table.add(topic[:-4])  # retained state topic subscribed during subscribe()
+    if device_id is not None:
+        table.add("{!s}/login/{!s}".format(home, device_id))
+    return sorted(table)
+
+
+def render(table):
+    lines = ["# Generated by tools/compile_subscriptions.py, do not edit",
+             "# Precompiled subscription table, used by MQTTHandler with SUBSCRIPTION_BACKEND = \"sorted\"",
+             "",
+             "TOPICS = ("]
+    for topic in table:
+        lines.append("    {!r},".format(topic))
+    lines.append(")")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile the subscription table of a node")
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument("--components", help="components.json of the node")
+    src.add_argument("--order", help="_order.json of the node, component files are read from --dir")
+    parser.add_argument("--dir", default="components", help="directory of the component files")
+    parser.add_argument("--topics", action="append", default=[],
+                        help="file with one subscribed topic per line, can be given multiple times")
+    parser.add_argument("--home", default="home", help="MQTT_HOME of the node")
+    parser.add_argument("--id", dest="device_id", default=None, help="device id of the node")
+    parser.add_argument("-o", "--output", default="_subscriptions_frozen.py")
+    args = parser.parse_args(argv)
+
+    data = loadConfiguration(args.components, args.order, args.dir)
+    topics = configTopics(data)
+    found, unresolved = sourceTopics(data)
+    topics.update(found)
+    for path in args.topics:
+        with open(path) as f:
+            topics.update(line for line in f if line.strip())
+    table = compileTopics(topics, args.home, args.device_id)
+    with open(args.output, "w") as f:
+        f.write(render(table))
+    print("Wrote {!s} topics to {!s}".format(len(table), args.output))
+    if unresolved:
+        print("{!s} subscriptions of the components use runtime values, add a topic dump of the node "
+              "with --topics to include them".format(unresolved))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
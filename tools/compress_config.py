@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# Author: Kevin Köck
+# Copyright Kevin Köck 2019 Released under the MIT license
+# Created on 2026-10-18
+
+__updated__ = "2026-10-18"
+__version__ = "0.2"
+
+"""
+Host tool compressing a component configuration with deflate (zlib format) for pysmartnode.
+The result can be stored as "components.json.z" on the device or published as mqtt payload,
+e.g. as answer to the login request. The device decompresses it as a stream into the json parser.
+A small window (1kB by default) is used as the device has to allocate a buffer of the window size.
+
+With --benchmark, realistic configurations with 20, 30 and 40 components are generated and the size
+and the time for parsing plain and compressed json are compared. If the unix port of MicroPython
+("micropython") is available, the times are measured with it as well, which are closer to a device.
+
+Usage:
+python3 tools/compress_config.py --components components.json -o components.json.z
+python3 tools/compress_config.py --benchmark
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from compile_subscriptions import loadConfiguration
+
+WBITS = 10  # 1kB window, the zlib header tells the device which window to allocate
+
+# templates of common components, values are randomized per instance
+_TEMPLATES = (
+    (".sensors.htu21d", "HTU21D", {"i2c": "i2c", "precision_temp": 2, "precision_humid": 1, "temp_offset": -2.0,
+                                   "humid_offset": 10.0, "mqtt_topic": "home/{room}/htu", "interval": 600}),
+    (".sensors.dht22", "DHT22", {"pin": "D{pin}", "precision_temp": 1, "precision_humid": 1, "offset_temp": 0,
+                                 "offset_humid": 0, "mqtt_topic": "home/{room}/dht22", "interval": 300}),
+    (".sensors.ds18", "DS18", {"pin": "D{pin}", "precision_temp": 2, "offset_temp": -0.5,
+                               "mqtt_topic": "home/{room}/ds18", "interval": 600}),
+    (".sensors.moisture", "Moisture", {"adc_pin": "amux", "water_voltage": 1.5, "air_voltage": 3.0,
+                                       "sensor_types": [0, 1, 1], "mqtt_topic": "home/{room}/moisture",
+                                       "power_pin": "D{pin}", "interval": 600}),
+    (".sensors.battery", "Battery", {"adc": "adc", "voltage_max": 14.4, "voltage_min": 10.5,
+                                     "multiplier_adc": 5.68, "cutoff_pin": "D{pin}", "interval": 600}),
+    (".listeners.switch", "Switch", {"pin": "D{pin}", "mqtt_topic": "home/{room}/switch/set",
+                                     "instance_name": "switch_{room}"}),
+    (".listeners.bell", "Bell", {"pin": "D{pin}", "debounce_time": 20, "on_time": 500, "irq_direction": None,
+                                 "mqtt_topic": "home/{room}/bell"}),
+    (".devices.led", "LEDNotification", {"pin": "D{pin}", "on_time": 50, "off_time": 50, "iters": 20,
+                                         "mqtt_topic": "home/{room}/led/set"}),
+    (".machine.gpio", "GPIO", {"pin": "D{pin}", "mqtt_topic": "home/{room}/gpio/set"}),
+)
+_ROOMS = ("living_room", "kitchen", "bedroom", "bathroom", "garden", "garage", "office", "basement")
+
+
+def compress(raw, level=9, wbits=WBITS):
+    c = zlib.compressobj(level, zlib.DEFLATED, wbits)
+    return c.compress(raw) + c.flush()
+
+
+def generate(count, seed=0):
+    """returns a realistic configuration dictionary with count components"""
+    rnd = random.Random(seed)
+    data = {"_order": ["i2c", "adc", "amux"],
+            "i2c": {"package": ".machine.i2c", "component": "I2C", "constructor_args": ["D6", "D5"]},
+            "adc": {"package": ".machine.adc", "component": "ADC", "constructor_args": [0]},
+            "amux": {"package": ".multiplexer.amux", "component": "Amux",
+                     "constructor_args": {"s0": "D0", "s1": "D1", "s2": "D2", "adc": "adc"}}}
+    for i in range(count - len(data["_order"])):
+        package, component, args = rnd.choice(_TEMPLATES)
+        room = rnd.choice(_ROOMS)
+        name = "{!s}_{!s}".format(component.lower(), i)
+        ctor = {}
+        for key in args:
+            value = args[key]
+            if type(value) == str:
+                value = value.format(room=room, pin=rnd.randint(0, 8))
+            elif type(value) == float:
+                value = round(value * rnd.uniform(0.9, 1.1), 2)
+            ctor[key] = value
+        data[name] = {"package": package, "component": component, "constructor_args": ctor}
+        data["_order"].append(name)
+    return data
+
+
+def _timeit(func, runs):
+    st = time.perf_counter()
+    for _ in range(runs):
+        func()
+    return (time.perf_counter() - st) / runs * 1000
+
+
+_MP_SCRIPT = """
+import json, uzlib, uio, time, gc
+for name in {names!r}:
+    with open(name + ".json", "rb") as f:
+        raw = f.read()
+    with open(name + ".json.z", "rb") as f:
+        z = f.read()
+    gc.collect()
+    st = time.ticks_us()
+    for _ in range({runs}):
+        json.loads(raw)
+    t_plain = time.ticks_diff(time.ticks_us(), st) / {runs} / 1000
+    st = time.ticks_us()
+    for _ in range({runs}):
+        json.load(uzlib.DecompIO(uio.BytesIO(z)))
+    t_z = time.ticks_diff(time.ticks_us(), st) / {runs} / 1000
+    print(name, t_plain, t_z)
+"""
+
+
+def _micropython(micropython, files, runs):
+    """returns dict of name: (plain ms, compressed ms) measured with the MicroPython unix port"""
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in files:
+            with open(os.path.join(tmp, name + ".json"), "wb") as f:
+                f.write(files[name][0])
+            with open(os.path.join(tmp, name + ".json.z"), "wb") as f:
+                f.write(files[name][1])
+        with open(os.path.join(tmp, "bench.py"), "w") as f:
+            f.write(_MP_SCRIPT.format(names=list(files), runs=runs))
+        res = subprocess.run([micropython, "bench.py"], cwd=tmp, capture_output=True, text=True)
+    if res.returncode != 0:
+        print("MicroPython benchmark failed: {!s}".format(res.stderr.strip()), file=sys.stderr)
+        return {}
+    times = {}
+    for line in res.stdout.splitlines():
+        name, plain, z = line.split()
+        times[name] = (float(plain), float(z))
+    return times
+
+
+def benchmark(sizes=(20, 30, 40), runs=200, micropython=None):
+    files = {}
+    print("{:>10} {:>8} {:>8} {:>8} {:>8} {:>6} {:>10} {:>10}".format(
+        "components", "json B", "min B", "z B", "z15 B", "ratio", "parse ms", "z+parse ms"))
+    for size in sizes:
+        data = generate(size, seed=size)
+        pretty = json.dumps(data, indent=2).encode()
+        raw = json.dumps(data, separators=(",", ":")).encode()
+        z = compress(raw)
+        z15 = compress(raw, wbits=15)
+        assert json.loads(zlib.decompress(z).decode()) == data
+        t_plain = _timeit(lambda: json.loads(raw.decode()), runs)
+        t_z = _timeit(lambda: json.loads(zlib.decompressobj(WBITS).decompress(z).decode()), runs)
+        print("{:>10} {:>8} {:>8} {:>8} {:>8} {:>6.2f} {:>10.3f} {:>10.3f}".format(
+            size, len(pretty), len(raw), len(z), len(z15), len(z) / len(raw), t_plain, t_z))
+        files["config_{!s}".format(size)] = (raw, z)
+    print("json B: indented json, min B: compact json, z B: compressed with {!s}B window, "
+          "z15 B: compressed with 32kB window (too big for a device), times measured with CPython".format(
+        1 << WBITS))
+    if micropython:
+        times = _micropython(micropython, files, max(runs // 10, 1))
+        if times:
+            print("MicroPython unix port: parse ms, decompress and parse ms (streamed)")
+            for name in times:
+                print("{:>10} {:>10.3f} {:>10.3f}".format(name[7:], times[name][0], times[name][1]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compress a component configuration with deflate")
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument("--components", help="components.json of the node or any json file to publish")
+    src.add_argument("--order", help="_order.json of the node, component files are read from --dir")
+    src.add_argument("--benchmark", action="store_true", help="compare plain and compressed configurations")
+    parser.add_argument("--dir", default="components", help="directory of the component files")
+    parser.add_argument("--wbits", type=int, default=WBITS, help="window size as power of 2 (9-15)")
+    parser.add_argument("--micropython", default=shutil.which("micropython"),
+                        help="path of the MicroPython unix port used by --benchmark")
+    parser.add_argument("-o", "--output", default="components.json.z")
+    args = parser.parse_args(argv)
+    if args.benchmark:
+        benchmark(micropython=args.micropython)
+        return 0
+    data = loadConfiguration(args.components, args.order, args.dir)
+    raw = json.dumps(data, separators=(",", ":")).encode()
+    z = compress(raw, wbits=args.wbits)
+    with open(args.output, "wb") as f:
+        f.write(z)
+    print("{!s}: {!s}B json, {!s}B compressed ({:.0%})".format(args.output, len(raw), len(z), len(z) / len(raw)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
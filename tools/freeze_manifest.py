@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# Author: Kevin Köck
+# Copyright Kevin Köck 2019 Released under the MIT license
+# Created on 2026-10-18
+
+__updated__ = "2026-10-18"
+__version__ = "0.3"
+
+"""
+Host tool creating a minimal manifest.py for building a firmware with all modules a node needs frozen.
+The modules are found by resolving the "package" of every component in the configuration
+(".sensors.dht22" becomes "pysmartnode.components.sensors.dht22" like in registerComponents)
+and walking their imports transitively, starting from main.py and pysmartnode.config.
+Conditional imports are always followed (e.g. mqtt_direct and mqtt_iot), use --exclude to drop
+modules that are never used on the node.
+Modules imported by name with transient.acquire("pysmartnode.utils.registerComponents") are followed
+like imports. Names built for the platform like "pysmartnode.networking.wifi_" + sys.platform are
+followed for every platform given with --platform (default all).
+
+Additionally a report shows the RAM that is saved by freezing each module instead of importing it
+from the filesystem. If mpy-cross is available, the size of the compiled bytecode is used,
+otherwise it is estimated from the source without comments and docstrings.
+RAM needed temporarily by the compiler during an import from .py files is not included.
+
+Usage:
+python3 tools/freeze_manifest.py --components components.json -o manifest.py
+python3 tools/freeze_manifest.py --order _order.json --dir components --exclude pysmartnode.networking.mqtt_iot \
+    --platform esp8266
+"""
+
+import argparse
+import ast
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from compile_subscriptions import loadConfiguration
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEARCH_PATHS = (BASE, os.path.join(BASE, "external_modules"))
+ENTRY_MODULES = ("main", "pysmartnode.config")
+PLATFORMS = ("esp8266", "esp32", "esp32_lobo")
+HEURISTIC_FACTOR = 0.6  # bytecode size relative to source without comments and docstrings
+
+
+def componentPackages(data):
+    packages = []
+    for name in data.get("_order", [key for key in data if key != "_order"]):
+        component = data.get(name)
+        if type(component) != dict or "package" not in component:
+            continue
+        package = component["package"]
+        if package.startswith("."):
+            package = "pysmartnode.components" + package  # same as registerComponents._checkPackage
+        packages.append(package)
+    return packages
+
+
+def findModule(name, search_paths=SEARCH_PATHS):
+    """returns (search path, relative file) of a module or None if it is not a source module"""
+    parts = name.split(".")
+    for path in search_paths:
+        for rel in (os.path.join(*parts) + ".py", os.path.join(*(parts + ["__init__.py"]))):
+            if os.path.isfile(os.path.join(path, rel)):
+                return path, rel
+    return None
+
+
+def _readSource(file):
+    with open(file, "rb") as f:
+        raw = f.read()
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return raw.decode("iso-8859-15")
+
+
+def _string(node):
+    if isinstance(node, ast.Constant) and type(node.value) == str:
+        return node.value
+    return None
+
+
+def _imports(name, file, platforms=PLATFORMS):
+    """yields the names of all modules imported by a module"""
+    tree = ast.parse(_readSource(file))
+    is_package = file.endswith("__init__.py")
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and \
+                node.func.attr == "acquire" and isinstance(node.func.value, ast.Name) and \
+                node.func.value.id == "transient" and node.args and _string(node.args[0]):
+            yield _string(node.args[0])  # transient.acquire("pysmartnode.utils.registerComponents")
+        elif isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add) and _string(node.left) and \
+                _string(node.left).startswith("pysmartnode.") and _string(node.left).endswith("_"):
+            for platform in platforms:  # "pysmartnode.networking.wifi_" + sys.platform
+                yield _string(node.left) + platform
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                yield alias.name
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base = name.split(".")
+                base = base[:len(base) - node.level + (1 if is_package else 0)]
+                module = ".".join(base + ([node.module] if node.module else []))
+            else:
+                module = node.module
+            yield module
+            for alias in node.names:
+                yield module + "." + alias.name  # could be a submodule, ignored if not found
+
+
+def resolve(roots, exclude=(), search_paths=SEARCH_PATHS, platforms=PLATFORMS):
+    """returns ({module: (search path, file)}, [missing modules])"""
+    found = {}
+    missing = set()
+    todo = list(roots)
+    while todo:
+        name = todo.pop()
+        if name in found or name in missing or name in exclude:
+            continue
+        res = findModule(name, search_paths)
+        if res is None:
+            top = name.split(".")[0]
+            if findModule(top, search_paths) is None:
+                missing.add(top)  # firmware module (machine, uos, ...) or not available
+            # else an attribute imported by "from module import name"
+            continue
+        found[name] = res
+        parts = name.split(".")
+        for i in range(1, len(parts)):
+            todo.append(".".join(parts[:i]))  # parent packages
+        todo.extend(_imports(name, os.path.join(*res), platforms))
+    return found, sorted(missing)
+
+
+def _strippedSize(file):
+    tree = ast.parse(_readSource(file))
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Module, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            body = node.body
+            if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) and \
+                    isinstance(body[0].value.value, str):
+                body[0].value.value = ""
+    return len(ast.unparse(tree))
+
+
+def estimateRAM(files, mpy_cross=None):
+    """returns ({module: bytes}, method)"""
+    sizes = {}
+    if mpy_cross:
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, (path, rel) in files.items():
+                out = os.path.join(tmp, name + ".mpy")
+                res = subprocess.run([mpy_cross, "-o", out, os.path.join(path, rel)], capture_output=True)
+                sizes[name] = os.path.getsize(out) if res.returncode == 0 else None
+        return sizes, "mpy-cross"
+    for name, (path, rel) in files.items():
+        sizes[name] = int(_strippedSize(os.path.join(path, rel)) * HEURISTIC_FACTOR)
+    return sizes, "heuristic"
+
+
+def renderManifest(files):
+    lines = ["# Generated by tools/freeze_manifest.py", "# Modules needed by the node's component configuration", ""]
+    by_path = {}
+    for name in sorted(files):
+        path, rel = files[name]
+        by_path.setdefault(path, []).append(rel.replace(os.sep, "/"))
+    for path in by_path:
+        lines.append("freeze({!r}, (".format(path))
+        for rel in by_path[path]:
+            lines.append("    {!r},".format(rel))
+        lines.append("))")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def report(sizes, method, missing):
+    lines = ["Estimated RAM saved by freezing ({!s}):".format(method)]
+    total = 0
+    for name in sorted(sizes, key=lambda n: -(sizes[n] or 0)):
+        lines.append("{:>8s}  {!s}".format(str(sizes[name]) if sizes[name] is not None else "error", name))
+        total += sizes[name] or 0
+    lines.append("{:>8d}  total, {!s} modules".format(total, len(sizes)))
+    if missing:
+        lines.append("Not found, must be part of the firmware: {!s}".format(", ".join(missing)))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create a manifest.py with the modules a node needs")
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument("--components", help="components.json of the node or a config dump of the server")
+    src.add_argument("--order", help="_order.json of the node, component files are read from --dir")
+    parser.add_argument("--dir", default="components", help="directory of the component files")
+    parser.add_argument("--exclude", action="append", default=[], help="module not to freeze, can be repeated")
+    parser.add_argument("--platform", action="append", choices=PLATFORMS,
+                        help="platform of the firmware, can be repeated, default all")
+    parser.add_argument("--mpy-cross", default=shutil.which("mpy-cross"),
+                        help="path of mpy-cross, empty to estimate the size from the source")
+    parser.add_argument("-o", "--output", default="manifest.py")
+    args = parser.parse_args(argv)
+
+    data = loadConfiguration(args.components, args.order, args.dir)
+    roots = list(ENTRY_MODULES) + componentPackages(data)
+    files, missing = resolve(roots, args.exclude, platforms=args.platform or PLATFORMS)
+    with open(args.output, "w") as f:
+        f.write(renderManifest(files))
+    sizes, method = estimateRAM(files, args.mpy_cross)
+    print(report(sizes, method, missing))
+    print("Wrote {!s} modules to {!s}".format(len(files), args.output))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())